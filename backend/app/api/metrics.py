@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import render_latest
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of request, DB pool, hashing and cache metrics"""
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4")
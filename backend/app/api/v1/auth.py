@@ -1,24 +1,36 @@
 from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 from fastapi import APIRouter, Depends, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
+from slowapi.util import get_remote_address
 from starlette import status
 
 from app.models.auth import Token, RegisterUserRequest
 from app.services.auth_service import AuthService
-from app.db.core import get_db
+from app.db.core import get_db, get_sessionmaker
 from app.core.rate_limiter import limiter
 from app.core.settings import settings
+from app.core.middleware import TimedRoute
+from app.core.responses import trusted_response
+from app.exceptions.auth import AuthenticationError
 
 router = APIRouter(
     prefix='/api/v1/auth',
-    tags=['auth']
+    tags=['auth'],
+    route_class=TimedRoute,
 )
 
 async def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
     return AuthService(session=db)
 
 
+def require_refresh_cookie(request: Request) -> None:
+    # Route dependencies resolve first, so requests without a cookie never open a session
+    if not request.cookies.get(settings.REFRESH_TOKEN_COOKIE_NAME):
+        raise AuthenticationError("Refresh token missing")
+
+
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/hour")
 async def register_user(request: Request, register_user_request: RegisterUserRequest, service: AuthService = Depends(get_auth_service)):
@@ -26,22 +38,26 @@ async def register_user(request: Request, register_user_request: RegisterUserReq
 
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], response: Response, service: AuthService = Depends(get_auth_service)):
-    auth_tokens = await service.login_for_access_token(form_data)
+async def login_for_access_token(request: Request, form_data: Annotated[OAuth2PasswordRequestForm, Depends()], response: Response, service: AuthService = Depends(get_auth_service)):
+    auth_tokens = await service.login_for_access_token(form_data, get_remote_address(request))
     service.set_refresh_cookie(response, auth_tokens.refresh_token)
-    return Token(access_token=auth_tokens.access_token, token_type=auth_tokens.token_type)    
+    return trusted_response(Token(access_token=auth_tokens.access_token, token_type=auth_tokens.token_type), response)
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout(response: Response, service: AuthService = Depends(get_auth_service)):
-    service.clear_refresh_cookie(response)
- 
+async def logout(request: Request, response: Response, session_factory: sessionmaker = Depends(get_sessionmaker)):
+    # Only a refresh cookie has a session to revoke; logging out without one needs no database
+    if request.cookies.get(settings.REFRESH_TOKEN_COOKIE_NAME):
+        async with session_factory() as db:
+            await AuthService(session=db).logout(request)
+    AuthService.clear_refresh_cookie(response)
+
 
-@router.post("/refresh-token", response_model=Token)
+@router.post("/refresh-token", response_model=Token, dependencies=[Depends(require_refresh_cookie)])
 async def refresh_access_token(request: Request, response: Response, service: AuthService = Depends(get_auth_service)):    
     auth_tokens = await service.refresh_access_token(request)
     service.set_refresh_cookie(response, auth_tokens.refresh_token)
-    return Token(access_token=auth_tokens.access_token, token_type=auth_tokens.token_type)
+    return trusted_response(Token(access_token=auth_tokens.access_token, token_type=auth_tokens.token_type), response)
 
 
 
@@ -0,0 +1,206 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, File, Form, Header, Path, Query, Response, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.core import get_db
+from app.models.dataset import DatasetForm, DatasetPage, DatasetProfile, DatasetRead, DatasetStatus, ExportFormat, FileType
+from app.services.dataset_service import DatasetService
+from app.services.export import MEDIA_TYPES
+from app.services.auth_service import CurrentUser
+from app.core.middleware import BodyLimitRoute, TimedRoute
+from app.core.settings import settings
+from app.core.responses import etag_matches, http_date, not_modified, trusted_response, weak_etag
+from app.exceptions.dataset import DatasetTooLargeError, DatasetValidationError
+
+router = APIRouter(
+    prefix="/api/v1/datasets",
+    tags=["Datasets"],
+    route_class=TimedRoute,
+)
+
+def get_dataset_service(db: AsyncSession = Depends(get_db)) -> DatasetService:
+    return DatasetService(session=db)
+
+def get_dataset_form(
+    title: Annotated[str, Form()],
+    file_type: Annotated[FileType, Form()],
+    description: Annotated[str | None, Form()] = None,
+    tags: Annotated[str | None, Form()] = None,
+    category_ids: Annotated[str | None, Form()] = None,
+) -> DatasetForm:
+    return DatasetForm(title=title, description=description, tags=tags, category_ids=category_ids, file_type=file_type)
+
+
+class DatasetUploadRoute(BodyLimitRoute):
+    """Stops uploads over DATASET_MAX_UPLOAD_BYTES while they are received, not once spooled"""
+
+    @property
+    def max_body_bytes(self) -> int:
+        return settings.DATASET_MAX_UPLOAD_BYTES + settings.UPLOAD_FORM_OVERHEAD_BYTES
+
+    def too_large(self) -> Exception:
+        return DatasetTooLargeError(settings.DATASET_MAX_UPLOAD_BYTES)
+
+
+async def create_dataset(
+    current_user: CurrentUser,
+    form: Annotated[DatasetForm, Depends(get_dataset_form)],
+    file: Annotated[UploadFile, File()],
+    service: DatasetService = Depends(get_dataset_service),
+):
+    # The exact file size is still enforced while the file is copied to storage
+    return await service.create_dataset(current_user.get_id(), form, file)
+
+
+router.add_api_route(
+    "",
+    create_dataset,
+    methods=["POST"],
+    response_model=DatasetRead,
+    status_code=status.HTTP_201_CREATED,
+    route_class_override=DatasetUploadRoute,
+)
+
+
+@router.get("", response_model=DatasetPage)
+async def list_datasets(
+    current_user: CurrentUser,
+    limit: Annotated[int, Query(ge=1, le=settings.DATASETS_MAX_PAGE_SIZE)] = settings.DATASETS_PAGE_SIZE,
+    cursor: Annotated[str | None, Query(description="`next_cursor` of the previous page")] = None,
+    tag: str | None = None,
+    category_id: int | None = None,
+    file_type: FileType | None = None,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    return trusted_response(
+        await service.list_datasets(current_user.get_id(), limit, cursor, tag, category_id, file_type)
+    )
+
+
+@router.get("/search", response_model=DatasetPage)
+async def search_datasets(
+    current_user: CurrentUser,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=settings.DATASETS_MAX_PAGE_SIZE)] = settings.DATASETS_PAGE_SIZE,
+    cursor: Annotated[str | None, Query(description="`next_cursor` of the previous page")] = None,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    return trusted_response(await service.search_datasets(current_user.get_id(), q, limit, cursor))
+
+
+@router.get("/{dataset_id}/status", response_model=DatasetStatus)
+async def get_dataset_status(
+    dataset_id: int,
+    current_user: CurrentUser,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    # Polled while the dataset is ingested; unchanged polls are answered from the version lookup
+    headers = {"ETag": weak_etag(*await service.status_version(current_user.get_id(), dataset_id)), "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return await service.get_status(current_user.get_id(), dataset_id)
+
+
+@router.get("/{dataset_id}/profile", response_model=DatasetProfile)
+async def get_dataset_profile(
+    dataset_id: int,
+    current_user: CurrentUser,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    headers = {"ETag": weak_etag(await service.dataset_version(current_user.get_id(), dataset_id)), "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return trusted_response(await service.get_profile(current_user.get_id(), dataset_id), response)
+
+
+@router.delete("/{dataset_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_dataset(
+    dataset_id: int,
+    current_user: CurrentUser,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    await service.delete_dataset(current_user.get_id(), dataset_id)
+
+
+@router.get("/{dataset_id}/features", response_class=Response)
+async def query_dataset_features(
+    dataset_id: int,
+    current_user: CurrentUser,
+    bbox: Annotated[str, Query(description="min_x,min_y,max_x,max_y")],
+    limit: Annotated[int, Query(ge=1, le=settings.FEATURES_MAX_PAGE_SIZE)] = settings.FEATURES_PAGE_SIZE,
+    after: Annotated[int, Query(ge=0, description="`next` cursor of the previous page")] = 0,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    body = await service.query_features(current_user.get_id(), dataset_id, bbox, limit, after)
+    return Response(content=body, media_type="application/geo+json")
+
+
+@router.get("/{dataset_id}/tiles/{z}/{x}/{y}.mvt", response_class=Response)
+async def get_dataset_tile(
+    dataset_id: int,
+    z: Annotated[int, Path(ge=0, le=settings.TILE_MAX_ZOOM)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+    current_user: CurrentUser,
+    if_none_match: Annotated[str | None, Header()] = None,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    if x >= 2 ** z or y >= 2 ** z:
+        raise DatasetValidationError("Tile coordinates out of range for zoom level")
+    version = await service.tile_version(current_user.get_id(), dataset_id)
+    headers = {
+        "ETag": f'"{version}-{z}-{x}-{y}"',
+        "Cache-Control": f"private, max-age={settings.TILE_CACHE_MAX_AGE}",
+    }
+    # Revalidation only needs the version lookup, the tile itself is never loaded
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    tile = await service.get_tile(dataset_id, version, z, x, y)
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile", headers=headers)
+
+
+@router.get("/{dataset_id}/export", response_class=StreamingResponse)
+async def export_dataset(
+    dataset_id: int,
+    current_user: CurrentUser,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.ndjson,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    # The session stays open while streaming: dependencies with yield exit after the response is sent
+    chunks = await service.export_features(current_user.get_id(), dataset_id, export_format)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="dataset-{dataset_id}.{export_format}"'},
+    )
+
+
+@router.get("/{dataset_id}/download", response_class=FileResponse)
+async def download_dataset(
+    dataset_id: int,
+    current_user: CurrentUser,
+    accept_encoding: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
+    service: DatasetService = Depends(get_dataset_service),
+):
+    download = await service.get_download(current_user.get_id(), dataset_id, accept_encoding)
+    headers = {
+        "ETag": download.etag,
+        "Last-Modified": http_date(download.last_modified),
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if not_modified(if_none_match, if_modified_since, download.etag, download.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if download.content_encoding:
+        headers["Content-Encoding"] = download.content_encoding
+    # Range and If-Range are handled by FileResponse; the file is read in chunks, never buffered whole
+    return FileResponse(download.path, media_type=download.media_type, filename=download.filename, headers=headers)
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, status, Depends
+from typing import Annotated
+from fastapi import APIRouter, status, Depends, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.core import get_db
 from app.models.user import UserResponse, PasswordChange
 from app.services.user_service import UserService
 from app.services.auth_service import CurrentUser
+from app.core.middleware import TimedRoute
+from app.core.responses import etag_matches, trusted_response, weak_etag
 
 router = APIRouter(
     prefix="/api/v1/users",
-    tags=["Users"]
+    tags=["Users"],
+    route_class=TimedRoute,
 )
 
 def get_user_service(db: AsyncSession = Depends(get_db))  -> UserService:
@@ -15,8 +19,19 @@ def get_user_service(db: AsyncSession = Depends(get_db))  -> UserService:
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(current_user: CurrentUser, service: UserService = Depends(get_user_service)):
-    return await service.get_user_by_id(current_user.get_id())
+async def get_current_user(
+    current_user: CurrentUser,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+    service: UserService = Depends(get_user_service),
+):
+    user_id = current_user.get_id()
+    headers = {"ETag": weak_etag(await service.get_user_version(user_id)), "Cache-Control": "private, no-cache"}
+    # Revalidation only needs the version lookup, the profile is never loaded or serialized
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return trusted_response(await service.get_user_by_id(user_id), response)
 
 
 @router.put("/change-password", status_code=status.HTTP_200_OK)
@@ -0,0 +1,37 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a bounded false positive rate.
+
+    Sized for `capacity` keys at `error_rate`; adding more keys only raises
+    the false positive rate. Positions come from one blake2b digest split
+    into two 64-bit hashes (Kirsch-Mitzenmacher double hashing). Keys cannot
+    be removed, rebuild the filter instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+
+@dataclass
+class CacheStats:
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache where every entry carries its own expiry.
+
+    Not thread safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._data),
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+
+class RedisCache:
+    """
+    Optional shared cache backend over the Redis protocol (`redis` package).
+
+    Values are bytes; callers handle serialization. Every method swallows
+    connection errors and behaves like a miss, so a Redis outage only costs
+    cache hits.
+    """
+
+    def __init__(self, url: str, prefix: str = "cache:"):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._errors = (redis.RedisError, OSError)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self._client.get(self.prefix + key)
+        except self._errors:
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            await self._client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+        except self._errors:
+            pass
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._client.delete(self.prefix + key)
+        except self._errors:
+            pass
@@ -0,0 +1,82 @@
+"""
+Picks Argon2 cost parameters for this machine.
+
+Measures verification latency of Argon2id hashes and searches for the
+strongest parameters within a target latency: the memory cost starts at
+`--max-memory` and is halved until one pass fits, then passes (time cost)
+are added while they still fit. Prints the settings to put in the
+environment; existing hashes are upgraded on each user's next login.
+
+Run it on the deployment hardware, with the app's hashing concurrency in
+mind: HASHING_MAX_CONCURRENCY verifications can run at once, each using
+the chosen memory.
+
+    python -m app.core.calibrate_hashing --target-ms 250 --max-memory 65536
+"""
+import argparse
+import os
+import statistics
+import time
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from app.core.settings import settings
+
+MIN_MEMORY_COST = 19_456  # KiB, the OWASP floor for Argon2id
+MAX_TIME_COST = 10
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, repeat: int = 5) -> float:
+    """Median seconds of one verification with these parameters"""
+    hasher = Argon2Hasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hashed = hasher.hash("calibration-password")
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        hasher.verify("calibration-password", hashed)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def calibrate(target: float, max_memory: int, parallelism: int, repeat: int = 5) -> tuple[int, int, float]:
+    """(time_cost, memory_cost, seconds) of the strongest parameters verifying within `target` seconds"""
+    memory_cost = max_memory
+    seconds = measure(1, memory_cost, parallelism, repeat)
+    while seconds > target and memory_cost // 2 >= MIN_MEMORY_COST:
+        memory_cost //= 2
+        seconds = measure(1, memory_cost, parallelism, repeat)
+
+    time_cost = 1
+    while time_cost < MAX_TIME_COST:
+        candidate = measure(time_cost + 1, memory_cost, parallelism, repeat)
+        if candidate > target:
+            break
+        time_cost, seconds = time_cost + 1, candidate
+    return time_cost, memory_cost, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target-ms", type=float, default=250, help="verification latency to stay within")
+    parser.add_argument("--max-memory", type=int, default=settings.ARGON2_MEMORY_COST, help="KiB per hash")
+    parser.add_argument("--parallelism", type=int, default=min(settings.ARGON2_PARALLELISM, os.cpu_count() or 1))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    current = measure(settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM, args.repeat)
+    print(
+        f"current: time_cost={settings.ARGON2_TIME_COST} memory_cost={settings.ARGON2_MEMORY_COST} "
+        f"parallelism={settings.ARGON2_PARALLELISM} verify={current * 1000:.1f}ms"
+    )
+    time_cost, memory_cost, seconds = calibrate(args.target_ms / 1000, args.max_memory, args.parallelism, args.repeat)
+    if seconds > args.target_ms / 1000:
+        print(f"warning: the cheapest parameters take {seconds * 1000:.1f}ms, above the target")
+    print(f"calibrated: verify={seconds * 1000:.1f}ms, "
+          f"peak memory {memory_cost * settings.HASHING_MAX_CONCURRENCY // 1024}MiB at HASHING_MAX_CONCURRENCY")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,13 @@
+from app.exceptions.auth import AuthError, AuthenticationError, RegistrationError, LoginThrottledError
+from app.exceptions.user import UserError, UserNotFoundError, PasswordMismatchError, InvalidPasswordError
 
-
+__all__ = [
+    "AuthError",
+    "AuthenticationError",
+    "RegistrationError",
+    "LoginThrottledError",
+    "UserError",
+    "UserNotFoundError",
+    "PasswordMismatchError",
+    "InvalidPasswordError",
+]
@@ -0,0 +1,176 @@
+import asyncio
+import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import StrEnum
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from app.core.settings import settings
+from app.core.metrics import record_phase
+
+password_hash = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+))
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hash.verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verifies, and returns a new hash when the stored one uses other Argon2 parameters"""
+    return password_hash.verify_and_update(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return password_hash.hash(password)
+
+
+class ExecutorKind(StrEnum):
+    thread = "thread"
+    process = "process"
+    inline = "inline"
+
+
+@dataclass
+class HashingStats:
+    kind: str
+    max_concurrency: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+    completed: int
+    total_wait_seconds: float
+    total_run_seconds: float
+
+
+class HashingExecutor:
+    """
+    Runs Argon2 hashing/verification off the event loop.
+
+    Argon2 releases the GIL, so a thread pool gives real parallelism; a process
+    pool isolates the CPU work completely. At most `max_concurrency` calls run at
+    once, the rest wait on a semaphore and are reported as queue depth.
+    `inline` runs on the event loop and is only meant for tests and benchmarks.
+    """
+
+    def __init__(self, kind: str = ExecutorKind.thread, max_workers: int = 4, max_concurrency: int = 4):
+        self.kind = ExecutorKind(kind)
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._completed = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._dummy_hash: str | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == ExecutorKind.process:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hashing")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, func, *args):
+        if self.kind == ExecutorKind.inline:
+            started_at = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                record_phase("hashing", time.perf_counter() - started_at)
+
+        semaphore = self._get_semaphore()
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        self._wait_seconds += started_at - queued_at
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            semaphore.release()
+            self._in_flight -= 1
+            self._completed += 1
+            self._run_seconds += time.perf_counter() - started_at
+            record_phase("hashing", time.perf_counter() - queued_at)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_dummy(self, plain_password: str) -> bool:
+        """Verification against the hash of a random password: same cost as a real one, always False"""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe(16))
+        await self.verify(plain_password, self._dummy_hash)
+        return False
+
+    def stats(self) -> HashingStats:
+        return HashingStats(
+            kind=self.kind.value,
+            max_concurrency=self.max_concurrency,
+            in_flight=self._in_flight,
+            queue_depth=self._waiting,
+            max_queue_depth=self._max_waiting,
+            completed=self._completed,
+            total_wait_seconds=self._wait_seconds,
+            total_run_seconds=self._run_seconds,
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+
+_hashing_executor = HashingExecutor(
+    kind=settings.HASHING_EXECUTOR,
+    max_workers=settings.HASHING_MAX_WORKERS,
+    max_concurrency=settings.HASHING_MAX_CONCURRENCY,
+)
+
+
+def get_hashing_executor() -> HashingExecutor:
+    return _hashing_executor
+
+
+def configure_hashing_executor(kind: str, max_workers: int | None = None, max_concurrency: int | None = None) -> HashingExecutor:
+    """Replace the process-wide executor (benchmarks, tests, startup overrides)."""
+    global _hashing_executor
+    _hashing_executor.shutdown()
+    _hashing_executor = HashingExecutor(
+        kind=kind,
+        max_workers=max_workers or settings.HASHING_MAX_WORKERS,
+        max_concurrency=max_concurrency or settings.HASHING_MAX_CONCURRENCY,
+    )
+    return _hashing_executor
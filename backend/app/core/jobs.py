@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+JobHandler = Callable[[int, int], Awaitable[None]]
+FailureHandler = Callable[[int, int, BaseException, bool], Awaitable[None]]
+
+
+@dataclass
+class JobStats:
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    retried: int
+
+
+class JobScheduler:
+    """
+    In-process asyncio job queue with a process pool for CPU-bound work.
+
+    `max_concurrent_jobs` worker tasks pull job ids from the queue and await
+    `handler(job_id, attempt)`; handlers offload heavy work with `run_cpu`.
+    A failing job is retried with exponential backoff up to `max_attempts`,
+    `on_failure` is told about each failure and whether it was the last one.
+    Exceptions listed in `permanent_errors` are never retried.
+    If a pool process dies, the pool is broken for good. `run_cpu` then
+    replaces it and runs the call once more.
+    Job state itself lives wherever the handlers persist it (the DB), so the
+    queue can be rebuilt on startup.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        on_failure: FailureHandler | None = None,
+        max_workers: int = 2,
+        max_concurrent_jobs: int = 2,
+        max_attempts: int = 3,
+        retry_delay: float = 2.0,
+        permanent_errors: tuple[type[BaseException], ...] = (),
+        executor_factory: Callable[[int], Executor] = ProcessPoolExecutor,
+    ):
+        self.handler = handler
+        self.on_failure = on_failure
+        self.max_workers = max_workers
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.permanent_errors = permanent_errors
+        self._executor_factory = executor_factory
+        self._executor: Executor | None = None
+        self._queue: asyncio.Queue[tuple[int, int]] | None = None
+        self._pending: list[tuple[int, int]] = []
+        self._queued: set[int] = set()
+        self._workers: list[asyncio.Task] = []
+        self._timers: set[asyncio.TimerHandle] = set()
+        # Queued, running and retry-pending jobs; `_idle` is set when there are none
+        self._outstanding = 0
+        self._idle: asyncio.Event | None = None
+        self._running = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._retried = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        self._queue = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        for item in self._pending:
+            self._add_work()
+            self._queue.put_nowait(item)
+        self._pending.clear()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_concurrent_jobs)]
+
+    async def stop(self) -> None:
+        for timer in self._timers:
+            timer.cancel()
+        self._timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._queued.clear()
+        self._outstanding = 0
+        if self._idle is not None:
+            self._idle.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, job_id: int, attempt: int = 1) -> None:
+        if job_id in self._queued:
+            return
+        self._queued.add(job_id)
+        if self._queue is None:
+            # Not started yet (tests, CLI); picked up on start()
+            self._pending.append((job_id, attempt))
+        else:
+            self._add_work()
+            self._queue.put_nowait((job_id, attempt))
+
+    async def run_cpu(self, func, *args):
+        for retry in (True, False):
+            if self._executor is None:
+                self._executor = self._executor_factory(self.max_workers)
+            executor = self._executor
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                # Concurrent calls fail together, only the first one replaces the pool
+                if self._executor is executor:
+                    logging.warning("Process pool broken, a worker process died; recreating it")
+                    self._executor = None
+                    executor.shutdown(wait=False, cancel_futures=True)
+                if not retry:
+                    raise
+
+    async def join(self) -> None:
+        """Wait until the queue is drained and no retry is pending (tests and benchmarks)."""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    def _add_work(self) -> None:
+        self._outstanding += 1
+        self._idle.clear()
+
+    def _finish_work(self) -> None:
+        self._outstanding -= 1
+        if not self._outstanding:
+            self._idle.set()
+
+    async def _work(self) -> None:
+        while True:
+            job_id, attempt = await self._queue.get()
+            self._queued.discard(job_id)
+            self._running += 1
+            try:
+                await self.handler(job_id, attempt)
+                self._succeeded += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                final = attempt >= self.max_attempts or isinstance(e, self.permanent_errors)
+                logging.warning("Job %s failed on attempt %s: %s", job_id, attempt, e)
+                if self.on_failure is not None:
+                    try:
+                        await self.on_failure(job_id, attempt, e, final)
+                    except Exception:
+                        logging.exception("Failure handler for job %s raised", job_id)
+                if final:
+                    self._failed += 1
+                else:
+                    self._retried += 1
+                    self._retry_later(job_id, attempt + 1)
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+                self._finish_work()
+
+    def _retry_later(self, job_id: int, attempt: int) -> None:
+        delay = self.retry_delay * 2 ** (attempt - 2)
+
+        def resubmit():
+            self._timers.discard(timer)
+            # Queued before the retry stops counting, so join() never sees a gap
+            self.submit(job_id, attempt)
+            self._finish_work()
+
+        self._add_work()
+        timer = asyncio.get_running_loop().call_later(delay, resubmit)
+        self._timers.add(timer)
+
+    def stats(self) -> JobStats:
+        return JobStats(
+            queued=self._queue.qsize() if self._queue is not None else len(self._pending),
+            running=self._running,
+            succeeded=self._succeeded,
+            failed=self._failed,
+            retried=self._retried,
+        )
@@ -1,8 +1,19 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import uuid
+from contextvars import ContextVar
 from enum import StrEnum
+from logging.handlers import QueueHandler, QueueListener
 
 
 LOG_FORMAT_DEBUG = "%(levelname)s:%(message)s:%(pathname)s:%(funcName)s:%(lineno)d"
+LOG_FORMAT = "%(levelname)s:%(name)s:%(request_id)s:%(message)s"
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+_listener: QueueListener | None = None
 
 
 class LogLevels(StrEnum):
@@ -12,16 +23,124 @@ class LogLevels(StrEnum):
     debug = "DEBUG"
 
 
-def configure_logging(log_level: str = LogLevels.error):
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the correlation id of the request being served."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every 1/rate records for the given message templates.
+
+    Templates are matched against the unformatted `record.msg`, so callers must
+    log with %-style arguments (`logging.info("... %s", user_id)`).
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.every = {msg: max(1, round(1 / rate)) for msg, rate in rates.items() if rate > 0}
+        self.dropped = {msg for msg, rate in rates.items() if rate <= 0}
+        self.seen: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        msg = record.msg
+        if msg in self.dropped:
+            return False
+        every = self.every.get(msg)
+        if every is None:
+            return True
+        seen = self.seen.get(msg, 0)
+        self.seen[msg] = seen + 1
+        return seen % every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves the formatting to the listener thread.
+
+    The stdlib handler fully formats the record in `prepare()`, i.e. on the
+    event loop. Only the %-merge of the arguments happens here, so later
+    changes to mutable arguments don't show up in the log; timestamps, JSON
+    and tracebacks are formatted by the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def new_request_id(incoming: str | None = None) -> str:
+    if incoming and len(incoming) <= 128 and incoming.isprintable():
+        return incoming
+    return uuid.uuid4().hex
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(
+    log_level: str = LogLevels.error,
+    json_format: bool = False,
+    use_queue: bool = False,
+    sampling: dict[str, float] | None = None,
+    stream=None,
+    force: bool = False,
+):
+    global _listener
     log_level = str(log_level).upper()
     log_levels = [level.value for level in LogLevels]
 
     if log_level not in log_levels:
-        logging.basicConfig(level=LogLevels.error)
-        return
+        log_level = LogLevels.error
+
+    if json_format:
+        formatter = JsonFormatter()
+    elif log_level == LogLevels.debug:
+        formatter = logging.Formatter(LOG_FORMAT_DEBUG)
+    else:
+        formatter = logging.Formatter(LOG_FORMAT)
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(formatter)
+
+    stop_logging()
+    handler = DeferredQueueHandler(queue.SimpleQueue()) if use_queue else output
+
+    # Filters run on the emitting side: dropped records never reach the queue
+    # and the request id is read from the caller's context.
+    if sampling:
+        handler.addFilter(SamplingFilter(sampling))
+    handler.addFilter(RequestIdFilter())
+
+    logging.basicConfig(level=log_level, handlers=[handler], force=force)
+
+    # basicConfig does nothing when the root logger already has handlers (unless forced)
+    if use_queue and handler in logging.getLogger().handlers:
+        _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
 
-    if log_level == LogLevels.debug:
-        logging.basicConfig(level=log_level, format=LOG_FORMAT_DEBUG)
-        return
 
-    logging.basicConfig(level=log_level)
+atexit.register(stop_logging)
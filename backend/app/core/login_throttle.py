@@ -0,0 +1,76 @@
+import math
+import time
+
+from limits import RateLimitItem, parse
+from limits.storage import MemoryStorage, Storage, storage_from_string
+from limits.strategies import STRATEGIES
+from starlette.concurrency import run_in_threadpool
+
+from app.core import rate_limit_storage  # noqa: F401 -- registers the sqlite:// storage scheme
+from app.core.settings import settings
+from app.exceptions.auth import LoginThrottledError
+
+
+class LoginThrottle:
+    """
+    Login attempt counters per account and per client IP, in sliding windows.
+
+    Counters live in the same kind of storage as the request rate limits
+    (RATE_LIMIT_STORAGE_URI and RATE_LIMIT_STRATEGY), so with a shared storage
+    every worker sees the same counts. `acquire` counts the attempt before
+    any password hashing and rejects it once either counter is exhausted.
+    Counting and checking are one atomic hit, so concurrent guesses cannot
+    all pass before any of them is counted. A successful login clears its
+    account's counter, leaving only failures there; the IP counter keeps
+    every attempt. Storages that do I/O are used from the threadpool, as in
+    app.core.rate_limiter.
+    """
+
+    def __init__(
+        self,
+        storage: Storage | None = None,
+        strategy: str = settings.RATE_LIMIT_STRATEGY,
+        account_limit: str = settings.LOGIN_ACCOUNT_FAILURE_LIMIT,
+        ip_limit: str = settings.LOGIN_IP_FAILURE_LIMIT,
+    ) -> None:
+        self._storage = storage or storage_from_string(settings.RATE_LIMIT_STORAGE_URI)
+        self._limiter = STRATEGIES[strategy](self._storage)
+        self.account_limit = parse(account_limit)
+        self.ip_limit = parse(ip_limit)
+
+    def _keys(self, email: str, client_ip: str | None) -> list[tuple[RateLimitItem, str, str]]:
+        keys = [(self.account_limit, "login-account", email.strip().lower())]
+        if client_ip:
+            keys.append((self.ip_limit, "login-ip", client_ip))
+        return keys
+
+    def _acquire(self, email: str, client_ip: str | None) -> int | None:
+        """Counts the attempt; returns seconds to wait when a counter is exhausted"""
+        for limit, scope, key in self._keys(email, client_ip):
+            if not self._limiter.hit(limit, scope, key):
+                reset_at = self._limiter.get_window_stats(limit, scope, key).reset_time
+                return max(1, math.ceil(reset_at - time.time()))
+        return None
+
+    def _record_success(self, email: str) -> None:
+        self._limiter.clear(self.account_limit, "login-account", email.strip().lower())
+
+    async def _call(self, func, *args):
+        if isinstance(self._storage, MemoryStorage):
+            return func(*args)
+        return await run_in_threadpool(func, *args)
+
+    async def acquire(self, email: str, client_ip: str | None) -> None:
+        """Counts a login attempt; raises LoginThrottledError when the account or the IP has too many"""
+        retry_after = await self._call(self._acquire, email, client_ip)
+        if retry_after is not None:
+            raise LoginThrottledError(retry_after)
+
+    async def record_success(self, email: str) -> None:
+        await self._call(self._record_success, email)
+
+    def reset(self) -> None:
+        self._storage.reset()
+
+
+login_throttle = LoginThrottle()
@@ -0,0 +1,216 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values (Prometheus semantics)."""
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # per-bucket counts, sum, count
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, labels: tuple[str, ...]) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self._series.items():
+            base = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            prefix = f"{base}," if base else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+    def reset(self) -> None:
+        self._series.clear()
+
+
+def render_gauges(name: str, help: str, values: dict[str, float], label: str) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    lines.extend(f'{name}{{{label}="{key}"}} {value}' for key, value in values.items())
+    return lines
+
+
+@dataclass
+class RequestTimings:
+    """Per-request accumulator for time spent in each instrumented phase."""
+    started: float = field(default_factory=time.perf_counter)
+    phases: dict[str, float] = field(default_factory=dict)
+    handler_started: float | None = None
+    endpoint_started: float | None = None
+    nested_before_endpoint: float = 0.0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+phase_duration = Histogram(
+    "http_request_phase_seconds", "Time spent per request in dependencies, DB, hashing and JWT.", ("route", "phase")
+)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed_phase(phase: str):
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def mark_handler_started() -> None:
+    timings = request_timings.get()
+    if timings is not None:
+        timings.handler_started = time.perf_counter()
+
+
+def mark_endpoint_started() -> None:
+    timings = request_timings.get()
+    if timings is not None and timings.endpoint_started is None:
+        timings.endpoint_started = time.perf_counter()
+        timings.nested_before_endpoint = sum(timings.phases.values())
+
+
+def observe_request(method: str, route: str, status: int, timings: RequestTimings) -> None:
+    request_duration.observe((method, route, str(status)), time.perf_counter() - timings.started)
+    if timings.handler_started is not None and timings.endpoint_started is not None:
+        # Dependency resolution minus the JWT/DB work already counted in its own phase
+        dependencies = timings.endpoint_started - timings.handler_started - timings.nested_before_endpoint
+        timings.add("dependencies", max(dependencies, 0.0))
+    for phase, seconds in timings.phases.items():
+        phase_duration.observe((route, phase), seconds)
+
+
+def render_latest() -> str:
+    from app.core.hashing import get_hashing_executor
+    from app.db.core import pool_status
+    from app.services.auth_service import token_cache
+    from app.services.user_cache import user_cache
+    from app.services.tile_cache import tile_cache
+    from app.services.revocation_store import revocation_store
+    from app.core.singleflight import singleflight_stats
+
+    hashing = get_hashing_executor().stats()
+    tokens = token_cache.stats()
+    users = user_cache.stats()
+    tiles = tile_cache.stats()
+    revocations = revocation_store.stats()
+    flights = singleflight_stats()
+    lines = request_duration.render() + phase_duration.render()
+    lines += render_gauges("db_pool", "Connection pool checkouts and occupancy.", pool_status(), "stat")
+    lines += render_gauges(
+        "password_hashing",
+        "Password hashing executor load.",
+        {
+            "in_flight": hashing.in_flight,
+            "queue_depth": hashing.queue_depth,
+            "max_queue_depth": hashing.max_queue_depth,
+            "completed": hashing.completed,
+        },
+        "stat",
+    )
+    lines += render_gauges(
+        "token_cache", "Verified access token cache.", {"hits": tokens.hits, "misses": tokens.misses, "size": tokens.size}, "stat"
+    )
+    lines += render_gauges(
+        "user_cache",
+        "User profile cache.",
+        {"hits": users.hits, "misses": users.misses, "size": users.size, "hit_ratio": users.hit_ratio},
+        "stat",
+    )
+    lines += render_gauges(
+        "tile_cache",
+        "In-memory vector tile cache.",
+        {"hits": tiles.hits, "misses": tiles.misses, "size": tiles.size, "hit_ratio": tiles.hit_ratio},
+        "stat",
+    )
+    lines += render_gauges(
+        "token_revocations",
+        "Refresh token revocation checks and the lookups the Bloom filter could not avoid.",
+        {"checks": revocations.checks, "lookups": revocations.lookups, "filter_size": revocations.filter_size},
+        "stat",
+    )
+    lines += render_gauges(
+        "singleflight_calls",
+        "Calls through each single-flight group.",
+        {name: f.calls for name, f in flights.items()},
+        "group",
+    )
+    lines += render_gauges(
+        "singleflight_coalesced",
+        "Calls that shared another in-flight call's result instead of querying.",
+        {name: f.coalesced for name, f in flights.items()},
+        "group",
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    record_phase("db", time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; its start time is popped
+    # here, or the next query on the connection would be timed from it
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        started = conn.info["query_started"].pop()
+        record_phase("db", time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """
+    Attribute cursor execution time on `engine` to the current request's `db` phase.
+    Instrumenting the same engine again is a no-op.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
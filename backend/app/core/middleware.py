@@ -0,0 +1,151 @@
+import asyncio
+import functools
+from typing import Any, Callable
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging import new_request_id, request_id_var
+from app.core.metrics import (
+    RequestTimings,
+    mark_endpoint_started,
+    mark_handler_started,
+    observe_request,
+    request_timings,
+)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class RequestIdMiddleware:
+    """Binds a correlation id to the request's logging context and echoes it back."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = new_request_id(incoming)
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class MetricsMiddleware:
+    """Records per-route latency and the phase breakdown collected in `request_timings`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_timings.reset(token)
+            route = scope.get("route")
+            # Route templates, never raw paths, to keep label cardinality bounded
+            observe_request(scope["method"], getattr(route, "path", "unmatched"), status, timings)
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that marks when its handler and its endpoint start, so the metrics
+    middleware can tell dependency resolution apart from the endpoint body.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _mark_endpoint_start(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            mark_handler_started()
+            return await handler(request)
+
+        return timed_handler
+
+
+class BodyLimitRoute(TimedRoute):
+    """
+    TimedRoute that refuses request bodies over `max_body_bytes` while they
+    arrive: on the declared Content-Length before anything is read, or as soon
+    as a streamed body passes it. Form and file parameters are otherwise
+    received and spooled to disk in full before the endpoint can check them.
+    Subclasses set the limit and may raise their own error from `too_large`.
+    """
+
+    @property
+    def max_body_bytes(self) -> int:
+        raise NotImplementedError
+
+    def too_large(self) -> Exception:
+        return HTTPException(status_code=413, detail="Request body too large")
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.max_body_bytes
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                raise self.too_large()
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise self.too_large()
+            return message
+
+        await super().handle(scope, limited_receive, send)
+
+
+def _mark_endpoint_start(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_endpoint(*args, **kwargs):
+            mark_endpoint_started()
+            return await endpoint(*args, **kwargs)
+        return async_endpoint
+
+    @functools.wraps(endpoint)
+    def sync_endpoint(*args, **kwargs):
+        mark_endpoint_started()
+        return endpoint(*args, **kwargs)
+    return sync_endpoint
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Rate limit counters in a local SQLite file, shared by every worker on the host.
+
+    ``sqlite:///./ratelimit.db`` (relative) or ``sqlite:////var/run/app/ratelimit.db``
+    (absolute), as in SQLAlchemy URLs. The file runs in WAL mode and every
+    check-and-increment happens in one ``BEGIN IMMEDIATE`` transaction, so
+    workers never race on the same window. Expired counters are purged in
+    batches every ``purge_every`` writes.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = 5.0, purge_every: int = 1000, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri.split("://", 1)[1][1:] or ":memory:"
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+            "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_rate_limit_counters_expires_at ON rate_limit_counters (expires_at)"
+        )
+        self._lock = threading.Lock()
+        self._purge_every = purge_every
+        self._writes = 0
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return result
+
+    def _get(self, key: str, now: float) -> int:
+        row = self._conn.execute(
+            "SELECT value FROM rate_limit_counters WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _incr(self, key: str, expiry: float, amount: int, now: float) -> int:
+        self._conn.execute(
+            "INSERT INTO rate_limit_counters (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "value = CASE WHEN expires_at > ? THEN value + excluded.value ELSE excluded.value END, "
+            "expires_at = CASE WHEN expires_at > ? THEN expires_at ELSE excluded.expires_at END",
+            (key, amount, now + expiry, now, now),
+        )
+        self._writes += 1
+        if self._writes % self._purge_every == 0:
+            self._conn.execute(
+                "DELETE FROM rate_limit_counters WHERE key IN "
+                "(SELECT key FROM rate_limit_counters WHERE expires_at <= ? LIMIT 1000)",
+                (now,),
+            )
+        return self._get(key, now)
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return self._transaction(self._incr, key, expiry, amount, time.time())
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            return self._get(key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM rate_limit_counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_limit_counters").rowcount
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
+
+    def _sliding_window(self, key: str, expiry: int, now: float) -> tuple[int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get(previous_key, now)
+        current_count = self._get(current_key, now)
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def _acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int, now: float) -> bool:
+        previous_count, previous_ttl, current_count, _ = self._sliding_window(key, expiry, now)
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+        _, current_key = self.sliding_window_keys(key, expiry, now)
+        self._incr(current_key, 2 * expiry, amount, now)
+        return True
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        return self._transaction(self._acquire_sliding_window_entry, key, limit, expiry, amount, time.time())
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        with self._lock:
+            return self._sliding_window(key, expiry, time.time())
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        for window_key in self.sliding_window_keys(key, expiry, time.time()):
+            self.clear(window_key)
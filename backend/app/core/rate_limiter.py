@@ -1,4 +1,49 @@
-from slowapi import Limiter
+import asyncio
+import functools
+
+from limits.storage import MemoryStorage
+from slowapi import Limiter as _Limiter
 from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.core.settings import settings
+from app.core import rate_limit_storage  # noqa: F401 -- registers the sqlite:// storage scheme
+
+
+class Limiter(_Limiter):
+    """
+    slowapi Limiter whose checks run in the threadpool when the storage does I/O.
+
+    slowapi checks limits synchronously inside async endpoints, which would block
+    the event loop on a SQLite file or a Redis round trip. The check is done
+    here first, off the loop, and slowapi's own wrapper then sees
+    `_rate_limiting_complete` and skips it.
+    """
+
+    def limit(self, limit_value, *args, **kwargs):
+        decorator = super().limit(limit_value, *args, **kwargs)
+
+        def wrap(func):
+            limited = decorator(func)
+            if not asyncio.iscoroutinefunction(func) or isinstance(self._storage, MemoryStorage):
+                return limited
+
+            @functools.wraps(func)
+            async def offloaded(*f_args, **f_kwargs):
+                request = f_kwargs.get("request")
+                if self.enabled and isinstance(request, Request) and not getattr(request.state, "_rate_limiting_complete", False):
+                    await run_in_threadpool(self._check_request_limit, request, func, False)
+                    request.state._rate_limiting_complete = True
+                return await limited(*f_args, **f_kwargs)
+
+            return offloaded
+
+        return wrap
+
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+)
@@ -0,0 +1,90 @@
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from app.core.settings import settings
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that renders pydantic models with their compiled serializer and
+    everything else with orjson when it is installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+def trusted_response(content: BaseModel, sub_response: Response | None = None, status_code: int = 200) -> BaseModel | Response:
+    """
+    Serialize a model built by our own services straight to the response.
+
+    Returning a Response makes FastAPI skip re-validating the value against the
+    route's response_model. Headers and cookies already set on the injected
+    `sub_response` are carried over. With FAST_JSON off the model is returned
+    unchanged and goes through FastAPI's regular path.
+    """
+    if not settings.FAST_JSON:
+        return content
+    response = FastJSONResponse(content, status_code=status_code)
+    if sub_response is not None:
+        response.raw_headers.extend(header for header in sub_response.raw_headers if header[0] != b"content-length")
+    return response
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def version_tag(value: datetime.datetime) -> str:
+    """Short opaque tag of a naive UTC updated_at, independent of the server's time zone"""
+    return f"{int(value.replace(tzinfo=datetime.timezone.utc).timestamp() * 1_000_000):x}"
+
+
+def weak_etag(*versions: datetime.datetime) -> str:
+    """Weak ETag of a representation built from rows with these (naive UTC) updated_at values"""
+    return f'W/"{"-".join(version_tag(v) for v in versions)}"'
+
+
+def http_date(value: datetime.datetime) -> str:
+    """IMF-fixdate of a naive UTC datetime, as used by Last-Modified"""
+    return format_datetime(value.replace(tzinfo=datetime.timezone.utc, microsecond=0), usegmt=True)
+
+
+def not_modified(
+    if_none_match: str | None,
+    if_modified_since: str | None,
+    etag: str,
+    last_modified: datetime.datetime,
+) -> bool:
+    """Whether a GET can be answered with 304; If-Modified-Since only counts without If-None-Match (RFC 9110 13.2.2)"""
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified.replace(tzinfo=datetime.timezone.utc, microsecond=0) <= since
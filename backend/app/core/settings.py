@@ -6,22 +6,87 @@ load_dotenv()
 class Settings(BaseSettings):
     APP_NAME: str = "GIS DB"
     DEBUG: bool = False
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False
+    LOG_QUEUE: bool = True # format and write log records on a background thread
+    LOG_SAMPLING: dict[str, float] = {"Successfully retrieved user with ID: %s": 0.01}
     ENVIRONMENT: str = 'development'
     DB_HOST: str = "localhost"
     DB_PORT: int = 5432
     DB_USER: str = ""
     DB_PASS: str = ""
     DB_NAME: str = "test"
+    DB_BACKEND: str = "sqlite" # sqlite | postgresql
+    DB_POOL_SIZE: int = 5 # per uvicorn worker
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800 # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100 # asyncpg prepared statements per connection
+    DB_ECHO: bool = False
     ACCESS_TOKEN_SECRET: str = "mi_super_secreto_de_acceso"
     REFRESH_TOKEN_SECRET: str = "mi_super_secreto_de_refresco_largo"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_MINUTES:int = 7 * 24 * 60 # 7 días
     REFRESH_TOKEN_COOKIE_NAME: str = "app_refresh_token"
+    REFRESH_TOKEN_REUSE_GRACE: float = 10 # seconds a just-rotated token is refused without revoking its session (concurrent refreshes)
+    REVOCATION_FILTER_CAPACITY: int = 1_000_000 # revoked token ids the in-memory Bloom filter is sized for
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001 # false positives cost one DB lookup
+    REVOCATION_SYNC_INTERVAL: float = 5 # seconds, revocations made by other workers reach the filter within this
+    REVOCATION_CLEANUP_INTERVAL: float = 3600 # seconds between purges of expired revocations (and filter rebuilds)
+    REVOCATION_CLEANUP_BATCH_SIZE: int = 5000
+    DATASET_STORAGE_DIR: str = "./storage/datasets"
+    DATASET_MAX_UPLOAD_BYTES: int = 2 * 1024 ** 3
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_FORM_OVERHEAD_BYTES: int = 64 * 1024 # multipart framing and form fields allowed on top of DATASET_MAX_UPLOAD_BYTES
+    DOWNLOAD_COMPRESS_MIN_BYTES: int = 1024 # smaller files are always sent as stored
+    DOWNLOAD_GZIP_LEVEL: int = 6
+    DOWNLOAD_BROTLI_QUALITY: int = 9 # used when the optional brotli package is installed
+    BLOB_GC_INTERVAL: float = 300 # seconds between sweeps of unreferenced dataset files, 0 disables
+    BLOB_GC_GRACE: float = 3600 # seconds a file stays unreferenced before it is deleted
+    DATASETS_PAGE_SIZE: int = 50
+    DATASETS_MAX_PAGE_SIZE: int = 200
+    INGESTION_MAX_WORKERS: int = 2 # parser processes
+    INGESTION_MAX_CONCURRENT_JOBS: int = 2
+    INGESTION_MAX_ATTEMPTS: int = 3
+    INGESTION_RETRY_DELAY: float = 2 # seconds, doubled on every retry
+    INGESTION_FEATURE_BATCH_SIZE: int = 5000 # features per bulk INSERT
+    INGESTION_STALE_AFTER: int = 3600 # seconds a job may stay processing before start() takes it back
+    FEATURES_PAGE_SIZE: int = 1000
+    FEATURES_MAX_PAGE_SIZE: int = 10_000
+    EXPORT_BATCH_SIZE: int = 2000 # rows fetched from the server-side cursor per chunk
+    TILE_CACHE_SIZE: int = 1024 # tiles kept in memory, 0 disables
+    TILE_CACHE_DIR: str = "./storage/tiles" # empty disables the on-disk tile cache
+    TILE_CACHE_MAX_AGE: int = 60 # seconds, Cache-Control max-age for clients
+    TILE_MAX_ZOOM: int = 22
+    TILE_MAX_FEATURES: int = 20_000 # per tile, extra features are dropped
+    TILE_EXTENT: int = 4096
+    TILE_BUFFER: int = 64 # tile units drawn outside the tile edges
+    TILE_SIMPLIFY_TOLERANCE: float = 1.0 # tile units, so simplification follows the zoom level
+    FAST_JSON: bool = True # serialize trusted service outputs without response_model re-validation
+    METRICS_ENABLED: bool = True
+    RATE_LIMIT_STORAGE_URI: str = "memory://" # memory:// | sqlite:///./ratelimit.db | redis://localhost:6379
+    RATE_LIMIT_STRATEGY: str = "sliding-window-counter" # fixed-window | moving-window | sliding-window-counter
+    LOGIN_ACCOUNT_FAILURE_LIMIT: str = "10/15 minutes" # login attempts per email before rejecting without hashing, reset by a successful login
+    LOGIN_IP_FAILURE_LIMIT: str = "50/15 minutes" # login attempts per client IP, across emails
+    TOKEN_CACHE_SIZE: int = 10_000 # 0 disables the verified-token cache
+    USER_CACHE_SIZE: int = 10_000 # 0 disables the user profile cache
+    USER_CACHE_TTL: float = 60
+    USER_CACHE_URL: str | None = None # e.g. redis://localhost:6379/1 to share the cache between workers
+    HASHING_EXECUTOR: str = "thread" # thread | process | inline
+    HASHING_MAX_WORKERS: int = 4
+    HASHING_MAX_CONCURRENCY: int = 4
+    # Argon2id cost of new hashes; older hashes are upgraded on login. Pick them with
+    # `python -m app.core.calibrate_hashing`
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536 # KiB
+    ARGON2_PARALLELISM: int = 4
 
     @property
     def DB_URL(self):
-        #return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        if self.DB_BACKEND == "postgresql":
+            return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         return f"sqlite+aiosqlite:///./{self.DB_NAME}.db"
 
 settings = Settings()
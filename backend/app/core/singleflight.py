@@ -0,0 +1,84 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int
+    coalesced: int  # calls that waited for another call's result instead of running
+
+    @property
+    def coalesced_ratio(self) -> float:
+        return self.coalesced / self.calls if self.calls else 0.0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads within one worker.
+
+    The first caller of `do(key, fn)` runs `fn`; callers with the same key
+    arriving while it is in flight wait for its result (or exception)
+    instead of running their own. Nothing is kept once the call finishes,
+    so this is not a cache: later callers run `fn` again.
+
+    Opt-in per call site, one group per query with its parameters as the
+    key. Only for reads whose result does not depend on the caller's
+    transaction, since followers get the leader's result, and for results
+    that are not mutated, since they share one object. If the leader is
+    cancelled, a waiting follower runs `fn` itself.
+
+    Not thread safe; it is meant to be used from the event loop only.
+    """
+
+    groups: dict[str, "SingleFlight"] = {}
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+        SingleFlight.groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        while (future := self._calls.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The leader was cancelled, not us: retry, possibly as the new leader
+                continue
+            except BaseException:
+                self.coalesced += 1
+                raise
+            self.coalesced += 1
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marks it retrieved, there may be no follower to do it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(calls=self.calls, coalesced=self.coalesced)
+
+
+def singleflight_stats() -> dict[str, SingleFlightStats]:
+    return {name: group.stats() for name, group in SingleFlight.groups.items()}
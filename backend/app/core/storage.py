@@ -0,0 +1,193 @@
+import gzip
+import hashlib
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.settings import settings
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip variants are produced without it
+    brotli = None
+
+# Precompressed variants a stored file can have, by Content-Encoding, best first
+VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> list[str]:
+    return [encoding for encoding in VARIANT_SUFFIXES if encoding != "br" or brotli is not None]
+
+
+class UploadTooLargeError(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredFile:
+    key: str
+    size: int
+    checksum: str  # sha256 hex digest
+    created: bool = True  # False when identical content was already stored under `key`
+    upload_path: Path | None = None  # the upload's own copy, kept until settle() or discard()
+
+
+async def iter_upload(upload_file, chunk_size: int = settings.UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield an UploadFile's content in fixed-size chunks."""
+    while chunk := await upload_file.read(chunk_size):
+        yield chunk
+
+
+class FileStorage(ABC):
+    """Interface for dataset file storage backends."""
+
+    @abstractmethod
+    async def save(self, chunks: AsyncIterator[bytes], max_bytes: int | None = None) -> StoredFile:
+        ...
+
+    @abstractmethod
+    def path(self, key: str) -> Path:
+        ...
+
+    @abstractmethod
+    def variant_path(self, key: str, encoding: str) -> Path:
+        ...
+
+    @abstractmethod
+    async def compress(self, key: str, encoding: str) -> None:
+        ...
+
+    @abstractmethod
+    async def settle(self, stored: StoredFile) -> None:
+        ...
+
+    @abstractmethod
+    async def discard(self, stored: StoredFile) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class LocalFileStorage(FileStorage):
+    """
+    Content-addressed storage under a local directory.
+
+    Chunks are written to a temporary file while size and sha256 are computed
+    incrementally; the digest is the key. A new file is hard linked into
+    place, a duplicate is not, so every content is stored once. Only one
+    chunk is held in memory at a time, and the copy stops as soon as
+    `max_bytes` is passed. Callers track who references a key (see
+    BlobService).
+
+    The temporary file outlives `save`: until the caller's reference is
+    committed, garbage collection may still delete the stored file it found.
+    `settle` then puts it back from the upload and drops the temporary file;
+    `discard` only drops it.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def variant_path(self, key: str, encoding: str) -> Path:
+        return self.root / key[:2] / (key + VARIANT_SUFFIXES[encoding])
+
+    def _open_temp(self) -> tuple[Path, BinaryIO]:
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_dir / uuid.uuid4().hex
+        return tmp_path, open(tmp_path, "wb")
+
+    @staticmethod
+    def _write(handle: BinaryIO, digest, chunk: bytes) -> None:
+        handle.write(chunk)
+        digest.update(chunk)
+
+    def _commit(self, tmp_path: Path, key: str) -> bool:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(tmp_path, target)
+        except FileExistsError:
+            return False
+        return True
+
+    async def save(self, chunks: AsyncIterator[bytes], max_bytes: int | None = None) -> StoredFile:
+        tmp_path, handle = await run_in_threadpool(self._open_temp)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            try:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise UploadTooLargeError(max_bytes)
+                    await run_in_threadpool(self._write, handle, digest, chunk)
+            finally:
+                await run_in_threadpool(handle.close)
+            checksum = digest.hexdigest()
+            created = await run_in_threadpool(self._commit, tmp_path, checksum)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return StoredFile(key=checksum, size=size, checksum=checksum, created=created, upload_path=tmp_path)
+
+    def _settle(self, stored: StoredFile) -> None:
+        target = self.path(stored.key)
+        if target.exists():
+            stored.upload_path.unlink(missing_ok=True)
+        else:
+            os.replace(stored.upload_path, target)
+
+    async def settle(self, stored: StoredFile) -> None:
+        """Called once a reference to `stored.key` is committed: restores the file if it was deleted since `save`"""
+        await run_in_threadpool(self._settle, stored)
+
+    async def discard(self, stored: StoredFile) -> None:
+        """Drops the upload's temporary file when no reference to it was committed"""
+        await run_in_threadpool(stored.upload_path.unlink, True)
+
+    def _compress(self, key: str, encoding: str) -> None:
+        tmp_path, handle = self._open_temp()
+        try:
+            with open(self.path(key), "rb") as source, handle:
+                if encoding == "gzip":
+                    # mtime=0 keeps the output, and so its ETag, reproducible
+                    with gzip.GzipFile(fileobj=handle, mode="wb", compresslevel=settings.DOWNLOAD_GZIP_LEVEL, mtime=0) as target:
+                        shutil.copyfileobj(source, target, settings.UPLOAD_CHUNK_SIZE)
+                else:
+                    compressor = brotli.Compressor(quality=settings.DOWNLOAD_BROTLI_QUALITY)
+                    while chunk := source.read(settings.UPLOAD_CHUNK_SIZE):
+                        handle.write(compressor.process(chunk))
+                    handle.write(compressor.finish())
+            os.replace(tmp_path, self.variant_path(key, encoding))
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    async def compress(self, key: str, encoding: str) -> None:
+        """Writes the precompressed `encoding` variant of a stored file"""
+        await run_in_threadpool(self._compress, key, encoding)
+
+    def _delete(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+        for encoding in VARIANT_SUFFIXES:
+            self.variant_path(key, encoding).unlink(missing_ok=True)
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self._delete, key)
+
+
+dataset_storage: FileStorage = LocalFileStorage(settings.DATASET_STORAGE_DIR)
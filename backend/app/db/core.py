@@ -1,18 +1,123 @@
+import time
+from dataclasses import dataclass
 from typing import Annotated
 from fastapi import Depends
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from app.core.settings import settings
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.settings import Settings, settings
+
+
+@dataclass
+class PoolMetrics:
+    """Connection checkout counters, used to size DB_POOL_SIZE per worker."""
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def record(self, wait_seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+
+    def reset(self) -> None:
+        self.checkouts = self.timeouts = 0
+        self.total_wait_seconds = self.max_wait_seconds = 0.0
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long each checkout waited for a
+    connection. Every pool has its own `metrics`, kept when the pool is
+    recreated (engine.dispose()).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            # Connect errors are not timeouts, they propagate uncounted
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return entry
+
+
+def create_engine_from_settings(config: Settings = settings) -> AsyncEngine:
+    """Build the async engine for the configured backend with its pool settings."""
+    url = make_url(config.DB_URL)
+    options = {"echo": config.DB_ECHO}
+
+    if url.get_backend_name() == "postgresql":
+        url = url.update_query_dict({"prepared_statement_cache_size": str(config.DB_STATEMENT_CACHE_SIZE)})
+    elif url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection, keep SQLAlchemy's StaticPool
+        return create_async_engine(url, **options)
+
+    return create_async_engine(
+        url,
+        poolclass=MeteredQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        **options,
+    )
+
+
+def pool_status(engine: AsyncEngine | None = None) -> dict:
+    """Snapshot of pool occupancy and checkout wait times."""
+    pool = (engine or async_engine).pool
+    # Pools other than MeteredQueuePool (StaticPool for in-memory SQLite) are not metered
+    metrics = getattr(pool, "metrics", None) or PoolMetrics()
+    status = {
+        "checkouts": metrics.checkouts,
+        "timeouts": metrics.timeouts,
+        "mean_wait_seconds": metrics.mean_wait_seconds,
+        "max_wait_seconds": metrics.max_wait_seconds,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return status
+
 
 ASYNC_DATABASE_URL= settings.DB_URL 
-async_engine = create_async_engine(ASYNC_DATABASE_URL)
+async_engine = create_engine_from_settings(settings)
 async_session = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
-async def get_db():
-    """Dependency to get async database session"""
-    async with async_session() as session:
-        yield session
+def dialect_insert(session: AsyncSession, table):
+    """INSERT for the session's dialect, with on_conflict_do_nothing/on_conflict_do_update"""
+    insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}[session.get_bind().dialect.name]
+    return insert(table)
+
+
+def get_sessionmaker() -> sessionmaker:
+    """Dependency for routes that open a session only on some of their paths"""
+    return async_session
 
 
+async def get_db(session_factory: sessionmaker = Depends(get_sessionmaker)):
+    """Dependency to get async database session"""
+    async with session_factory() as session:
+        yield session
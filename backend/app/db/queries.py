@@ -0,0 +1,68 @@
+"""
+Column-projected reads that bypass the ORM identity map.
+
+Statements are built once at import; SQLAlchemy's compiled cache then reuses
+their compiled SQL for every execution. Rows come back as small `__slots__`
+DTOs instead of full `User` entities with `password_hash` and timestamps.
+"""
+import datetime
+from dataclasses import dataclass
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.schema import User
+
+
+@dataclass(slots=True, frozen=True)
+class UserProfileRow:
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    updated_at: datetime.datetime
+
+
+@dataclass(slots=True, frozen=True)
+class UserCredentialsRow:
+    id: int
+    email: str
+    password_hash: str
+
+
+@dataclass(slots=True, frozen=True)
+class UserIdentityRow:
+    id: int
+    email: str
+
+
+USER_PROFILE_BY_ID = select(User.id, User.email, User.first_name, User.last_name, User.updated_at).where(
+    User.id == bindparam("user_id")
+)
+USER_CREDENTIALS_BY_EMAIL = select(User.id, User.email, User.password_hash).where(
+    User.email == bindparam("email")
+)
+USER_VERSION_BY_ID = select(User.updated_at).where(User.id == bindparam("user_id"))
+USER_IDENTITY = select(User.id, User.email).where(
+    User.id == bindparam("user_id"), User.email == bindparam("email")
+)
+
+
+async def fetch_user_profile(session: AsyncSession, user_id: int) -> UserProfileRow | None:
+    row = (await session.execute(USER_PROFILE_BY_ID, {"user_id": user_id})).first()
+    return UserProfileRow(*row) if row else None
+
+
+async def fetch_user_version(session: AsyncSession, user_id: int) -> datetime.datetime | None:
+    """updated_at of a user, enough to revalidate a cached profile"""
+    return (await session.execute(USER_VERSION_BY_ID, {"user_id": user_id})).scalar_one_or_none()
+
+
+async def fetch_user_credentials(session: AsyncSession, email: str) -> UserCredentialsRow | None:
+    row = (await session.execute(USER_CREDENTIALS_BY_EMAIL, {"email": email})).first()
+    return UserCredentialsRow(*row) if row else None
+
+
+async def fetch_user_identity(session: AsyncSession, user_id: int, email: str) -> UserIdentityRow | None:
+    row = (await session.execute(USER_IDENTITY, {"user_id": user_id, "email": email})).first()
+    return UserIdentityRow(*row) if row else None
@@ -1,5 +1,5 @@
 #import datetime
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Text, JSON, ForeignKey, DateTime, Index
 from .core import Base 
 from .mixins import TimestampMixin
 
@@ -16,4 +16,136 @@ class User(TimestampMixin, Base):
         return f"<User(email='{self.email}', first_name='{self.first_name}', last_name='{self.last_name}')>"
 
 
-    
+class RevokedToken(Base):
+    """
+    Refresh token ids (jti) that were rotated or logged out, and revoked
+    session ids (sid). Rows are kept until the token they stand for expires.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String, nullable=False, unique=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(jti='{self.jti}', expires_at={self.expires_at})>"
+
+
+class Dataset(TimestampMixin, Base):
+    __tablename__ = 'datasets'
+    __table_args__ = (
+        # Keyset pagination walks id descending within each filter
+        Index('ix_datasets_owner_id_id', 'owner_id', 'id'),
+        Index('ix_datasets_file_type_id', 'file_type', 'id'),
+        # Finds an already ingested dataset with the same content
+        Index('ix_datasets_storage_key', 'storage_key'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    tags = Column(JSON, nullable=True)
+    category_ids = Column(JSON, nullable=True)
+    file_type = Column(String, nullable=False)
+    filename = Column(String, nullable=True)
+    storage_key = Column(String, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    checksum = Column(String(64), nullable=False)
+    row_count = Column(Integer, nullable=True) # filled in by ingestion
+    columns = Column(JSON, nullable=True)
+    bbox = Column(JSON, nullable=True) # [min_x, min_y, max_x, max_y] of all features
+    profile = Column(JSON, nullable=True) # per-column statistics, tabular datasets only
+
+    def __repr__(self):
+        return f"<Dataset(title='{self.title}', file_type='{self.file_type}', owner_id={self.owner_id})>"
+
+
+class Blob(TimestampMixin, Base):
+    """
+    A stored dataset file, shared by every dataset with the same content.
+    `key` is the storage key (the sha256 of the content); `ref_count` is the
+    number of datasets using it. updated_at tells how long an unreferenced
+    blob has been waiting for garbage collection.
+    """
+    __tablename__ = 'blobs'
+    __table_args__ = (
+        Index('ix_blobs_ref_count_updated_at', 'ref_count', 'updated_at'),
+    )
+
+    key = Column(String, primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Blob(key='{self.key}', ref_count={self.ref_count})>"
+
+
+class DatasetTag(Base):
+    """
+    Normalized copy of Dataset.tags, for indexed filtering. owner_id repeats
+    the dataset's so a user's listing by tag is one range of the index.
+    """
+    __tablename__ = 'dataset_tags'
+    __table_args__ = (
+        Index('ix_dataset_tags_owner_id_tag_dataset_id', 'owner_id', 'tag', 'dataset_id'),
+    )
+
+    dataset_id = Column(Integer, ForeignKey('datasets.id', ondelete='CASCADE'), primary_key=True)
+    tag = Column(String, primary_key=True)
+    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+
+
+class DatasetCategory(Base):
+    """Normalized copy of Dataset.category_ids, for indexed filtering; owner_id as in DatasetTag"""
+    __tablename__ = 'dataset_categories'
+    __table_args__ = (
+        Index('ix_dataset_categories_owner_id_category_id_dataset_id', 'owner_id', 'category_id', 'dataset_id'),
+    )
+
+    dataset_id = Column(Integer, ForeignKey('datasets.id', ondelete='CASCADE'), primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+
+
+class IngestionJob(TimestampMixin, Base):
+    __tablename__ = 'ingestion_jobs'
+
+    id = Column(Integer, primary_key=True)
+    dataset_id = Column(Integer, ForeignKey('datasets.id', ondelete='CASCADE'), nullable=False, unique=True)
+    status = Column(String, nullable=False, default='pending', index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<IngestionJob(dataset_id={self.dataset_id}, status='{self.status}', attempts={self.attempts})>"
+
+
+class DatasetFeature(Base):
+    """
+    One parsed feature. Geometry and properties are kept as the GeoJSON text
+    produced at ingest so reads can stream them without re-serializing; the
+    bbox columns feed the spatial index (see app/db/spatial.py).
+    """
+    __tablename__ = 'dataset_features'
+    __table_args__ = (
+        Index('ix_dataset_features_dataset_id_id', 'dataset_id', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    dataset_id = Column(Integer, ForeignKey('datasets.id', ondelete='CASCADE'), nullable=False)
+    min_x = Column(Float, nullable=True)
+    min_y = Column(Float, nullable=True)
+    max_x = Column(Float, nullable=True)
+    max_y = Column(Float, nullable=True)
+    geometry = Column(Text, nullable=True)
+    properties = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<DatasetFeature(dataset_id={self.dataset_id}, id={self.id})>"
+
+
+from . import spatial, search  # noqa: E402,F401  register the spatial and full-text index DDL
@@ -0,0 +1,153 @@
+"""
+Full-text search over dataset title, tags and description.
+
+SQLite: an external-content FTS5 table over `datasets`, kept in sync by
+triggers on insert, update and delete, ranked with bm25(). Tags are indexed
+as their decoded values (json_each), not the stored JSON text, where
+non-ASCII characters are escaped.
+
+PostgreSQL: a GIN expression index on a weighted tsvector of the same
+columns. The index is always in sync with the row; the query repeats the
+indexed expression so the planner can use it, ranked with ts_rank_cd().
+
+Other dialects fall back to a LIKE scan. Like app/db/spatial.py the DDL runs
+after `datasets` is created through metadata and is repeated by the Alembic
+migration.
+"""
+import re
+
+from sqlalchemy import Float, and_, bindparam, column, event, func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.schema import Dataset
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS datasets_fts USING fts5("
+    "title, tags, description, content='datasets', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    """
+    CREATE TRIGGER IF NOT EXISTS datasets_fts_insert AFTER INSERT ON datasets BEGIN
+        INSERT INTO datasets_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, (SELECT group_concat(value, ' ') FROM json_each(new.tags)), new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS datasets_fts_delete AFTER DELETE ON datasets BEGIN
+        INSERT INTO datasets_fts(datasets_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, (SELECT group_concat(value, ' ') FROM json_each(old.tags)), old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS datasets_fts_update AFTER UPDATE OF title, tags, description ON datasets BEGIN
+        INSERT INTO datasets_fts(datasets_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, (SELECT group_concat(value, ' ') FROM json_each(old.tags)), old.description);
+        INSERT INTO datasets_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, (SELECT group_concat(value, ' ') FROM json_each(new.tags)), new.description);
+    END
+    """,
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS datasets_fts_insert",
+    "DROP TRIGGER IF EXISTS datasets_fts_delete",
+    "DROP TRIGGER IF EXISTS datasets_fts_update",
+    "DROP TABLE IF EXISTS datasets_fts",
+]
+POSTGRES_DOCUMENT = (
+    "(setweight(to_tsvector('simple', coalesce(datasets.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(datasets.tags::jsonb::text, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(datasets.description, '')), 'C'))"
+)
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_datasets_search ON datasets USING gin ({POSTGRES_DOCUMENT})",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_datasets_search",
+]
+
+MAX_TERMS = 10
+
+datasets_fts = table("datasets_fts", column("rowid"))
+
+
+@event.listens_for(Dataset.__table__, "after_create")
+def create_search_index(target, connection, **kw):
+    statements = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Dataset.__table__, "before_drop")
+def drop_search_index(target, connection, **kw):
+    statements = {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def search_terms(query: str) -> list[str]:
+    """Words of a user query; punctuation and search operators are dropped"""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def _fts5_query(terms: list[str]) -> str:
+    # Every term must match, the last one as a prefix (search as you type)
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _tsquery(terms: list[str]) -> str:
+    return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+
+def search_statement(dialect: str, columns, terms: list[str]):
+    """
+    Select of `columns` plus a `score` column (lower is better) for datasets
+    matching every term, and the bind parameters it needs. Callers add
+    ordering on (score, id), keyset conditions and the limit.
+    """
+    if dialect == "sqlite":
+        score = func.bm25(literal_column("datasets_fts"), 10.0, 5.0, 1.0).label("score")
+        statement = (
+            select(*columns, score)
+            .select_from(Dataset)
+            .join(datasets_fts, datasets_fts.c.rowid == Dataset.id)
+            .where(literal_column("datasets_fts").op("MATCH")(bindparam("query")))
+        )
+        return statement, score, {"query": _fts5_query(terms)}
+
+    if dialect == "postgresql":
+        document = literal_column(POSTGRES_DOCUMENT)
+        tsquery = func.to_tsquery("simple", bindparam("query"))
+        score = (-func.ts_rank_cd(document, tsquery)).label("score")
+        statement = select(*columns, score).where(document.op("@@")(tsquery))
+        return statement, score, {"query": _tsquery(terms)}
+
+    # Portable fallback: unranked substring scan
+    score = literal_column("0.0", Float).label("score")
+    conditions = []
+    for i, term in enumerate(terms):
+        pattern = bindparam(f"term_{i}")
+        conditions.append(or_(Dataset.title.ilike(pattern), Dataset.description.ilike(pattern)))
+    statement = select(*columns, score).where(and_(*conditions))
+    return statement, score, {f"term_{i}": f"%{term}%" for i, term in enumerate(terms)}
+
+
+async def search_datasets(
+    session: AsyncSession,
+    columns,
+    terms: list[str],
+    limit: int,
+    after: tuple[float, int] | None = None,
+    owner_id: int | None = None,
+):
+    """Rows of `columns` + score, best match first, keyset paginated on (score, id)"""
+    statement, score, params = search_statement(session.get_bind().dialect.name, columns, terms)
+    if owner_id is not None:
+        statement = statement.where(Dataset.owner_id == owner_id)
+    if after is not None:
+        last_score, last_id = after
+        statement = statement.where(
+            or_(score.element > last_score, and_(score.element == last_score, Dataset.id > last_id))
+        )
+    statement = statement.order_by(score.element, Dataset.id).limit(limit)
+    return (await session.execute(statement, params)).all()
@@ -0,0 +1,153 @@
+"""
+Spatial index over `dataset_features` bounding boxes.
+
+SQLite: an R*Tree virtual table, kept in sync by triggers. The dataset id is
+stored as a degenerate third dimension so a query only descends into one
+dataset's subtree. R*Tree coordinates are 32-bit floats rounded outwards, so
+candidates are rechecked against the exact bbox columns and dataset id (ids
+above 2^24 round onto their neighbours).
+
+PostgreSQL: a GiST expression index on `box(min, max)` (no PostGIS needed),
+queried with the `&&` overlap operator.
+
+The DDL runs after `dataset_features` is created through metadata (tests,
+benchmarks); the Alembic migration issues the same statements.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.schema import DatasetFeature
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS dataset_features_rtree "
+    "USING rtree(id, min_d, max_d, min_x, max_x, min_y, max_y)",
+    """
+    CREATE TRIGGER IF NOT EXISTS dataset_features_rtree_insert AFTER INSERT ON dataset_features
+    WHEN new.min_x IS NOT NULL
+    BEGIN
+        INSERT INTO dataset_features_rtree
+        VALUES (new.id, new.dataset_id, new.dataset_id, new.min_x, new.max_x, new.min_y, new.max_y);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS dataset_features_rtree_update
+    AFTER UPDATE OF dataset_id, min_x, min_y, max_x, max_y ON dataset_features
+    BEGIN
+        DELETE FROM dataset_features_rtree WHERE id = old.id;
+        INSERT INTO dataset_features_rtree
+        SELECT new.id, new.dataset_id, new.dataset_id, new.min_x, new.max_x, new.min_y, new.max_y
+        WHERE new.min_x IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS dataset_features_rtree_delete AFTER DELETE ON dataset_features
+    BEGIN
+        DELETE FROM dataset_features_rtree WHERE id = old.id;
+    END
+    """,
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS dataset_features_rtree_insert",
+    "DROP TRIGGER IF EXISTS dataset_features_rtree_update",
+    "DROP TRIGGER IF EXISTS dataset_features_rtree_delete",
+    "DROP TABLE IF EXISTS dataset_features_rtree",
+]
+POSTGRES_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_dataset_features_bbox ON dataset_features "
+    "USING gist (box(point(min_x, min_y), point(max_x, max_y))) WHERE min_x IS NOT NULL",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_dataset_features_bbox",
+]
+
+
+@event.listens_for(DatasetFeature.__table__, "after_create")
+def create_spatial_index(target, connection, **kw):
+    statements = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(DatasetFeature.__table__, "before_drop")
+def drop_spatial_index(target, connection, **kw):
+    statements = {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@dataclass(slots=True, frozen=True)
+class FeatureRow:
+    id: int
+    min_x: float | None
+    min_y: float | None
+    max_x: float | None
+    max_y: float | None
+    geometry: str | None
+    properties: str | None
+
+
+SQLITE_BBOX_QUERY = text("""
+    SELECT f.id, f.min_x, f.min_y, f.max_x, f.max_y, f.geometry, f.properties
+    FROM dataset_features_rtree AS r
+    JOIN dataset_features AS f ON f.id = r.id
+    WHERE r.min_d <= :dataset_id AND r.max_d >= :dataset_id
+      AND f.dataset_id = :dataset_id
+      AND r.min_x <= :max_x AND r.max_x >= :min_x
+      AND r.min_y <= :max_y AND r.max_y >= :min_y
+      AND f.min_x <= :max_x AND f.max_x >= :min_x
+      AND f.min_y <= :max_y AND f.max_y >= :min_y
+      AND r.id > :after_id
+    ORDER BY r.id
+    LIMIT :limit
+""")
+
+POSTGRES_BBOX_QUERY = text("""
+    SELECT id, min_x, min_y, max_x, max_y, geometry, properties
+    FROM dataset_features
+    WHERE dataset_id = :dataset_id
+      AND min_x IS NOT NULL
+      AND box(point(min_x, min_y), point(max_x, max_y)) && box(point(:min_x, :min_y), point(:max_x, :max_y))
+      AND id > :after_id
+    ORDER BY id
+    LIMIT :limit
+""")
+
+# Portable fallback without a spatial index: a scan of the dataset's features
+SCAN_BBOX_QUERY = text("""
+    SELECT id, min_x, min_y, max_x, max_y, geometry, properties
+    FROM dataset_features
+    WHERE dataset_id = :dataset_id
+      AND min_x <= :max_x AND max_x >= :min_x
+      AND min_y <= :max_y AND max_y >= :min_y
+      AND id > :after_id
+    ORDER BY id
+    LIMIT :limit
+""")
+
+BBOX_QUERIES = {"sqlite": SQLITE_BBOX_QUERY, "postgresql": POSTGRES_BBOX_QUERY}
+
+
+async def query_bbox(
+    session: AsyncSession,
+    dataset_id: int,
+    bbox: tuple[float, float, float, float],
+    limit: int,
+    after_id: int = 0,
+    use_index: bool = True,
+) -> list[FeatureRow]:
+    """Features of a dataset whose bbox overlaps `bbox`, ordered by id (keyset paginated by `after_id`)"""
+    dialect = session.get_bind().dialect.name
+    statement = BBOX_QUERIES.get(dialect, SCAN_BBOX_QUERY) if use_index else SCAN_BBOX_QUERY
+    params = {
+        "dataset_id": dataset_id,
+        "min_x": bbox[0],
+        "min_y": bbox[1],
+        "max_x": bbox[2],
+        "max_y": bbox[3],
+        "after_id": after_id,
+        "limit": limit,
+    }
+    result = await session.execute(statement, params)
+    return [FeatureRow(*row) for row in result]
@@ -11,4 +11,9 @@ class AuthenticationError(AuthError):
 
 class RegistrationError(AuthError):
     def __init__(self, message: str = "Unable to create user"):
-        super().__init__(status_code=400, detail=message)
\ No newline at end of file
+        super().__init__(status_code=400, detail=message)
+
+
+class LoginThrottledError(AuthError):
+    def __init__(self, retry_after: int, message: str = "Too many failed login attempts"):
+        super().__init__(status_code=429, detail=message, headers={"Retry-After": str(retry_after)})
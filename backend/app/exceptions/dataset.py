@@ -0,0 +1,21 @@
+from fastapi import HTTPException
+
+class DatasetError(HTTPException):
+    """Base exception for dataset-related errors"""
+    pass
+
+class DatasetValidationError(DatasetError):
+    def __init__(self, message: str = "Invalid dataset"):
+        super().__init__(status_code=400, detail=message)
+
+class DatasetTooLargeError(DatasetError):
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Dataset file exceeds the {max_bytes} bytes limit")
+
+class DatasetNotFoundError(DatasetError):
+    def __init__(self, message: str = "Dataset not found"):
+        super().__init__(status_code=404, detail=message)
+
+class DatasetNotReadyError(DatasetError):
+    def __init__(self, message: str = "Dataset has not been ingested yet"):
+        super().__init__(status_code=409, detail=message)
@@ -1,19 +1,58 @@
 import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 
 from app.db.core import async_engine, Base
-from app.core.logging import configure_logging, LogLevels
+from app.core.logging import configure_logging, stop_logging
+from app.core.middleware import RequestIdMiddleware, MetricsMiddleware
+from app.core.metrics import instrument_engine
 from app.core.settings import settings
+from app.core.hashing import get_hashing_executor
+from app.core.rate_limiter import limiter
+from app.core.responses import FastJSONResponse
 
-configure_logging(LogLevels.info)
-from app.db.schema import User  # Import models to register them
+configure_logging(
+    settings.LOG_LEVEL,
+    json_format=settings.LOG_JSON,
+    use_queue=settings.LOG_QUEUE,
+    sampling=settings.LOG_SAMPLING,
+)
+from app.db import schema  # noqa: F401 -- registers every model table on Base.metadata
+from app.services.ingestion_service import ingestion_runner
+from app.services.blob_service import blob_collector
+from app.services.revocation_store import revocation_store
 
 # Routes
 from app.api.v1.auth import router as auth_router
 from app.api.v1.users import router as users_router
+from app.api.v1.datasets import router as datasets_router
+from app.api.metrics import router as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ingestion_runner.start()
+    blob_collector.start()
+    await revocation_store.start()
+    yield
+    await revocation_store.stop()
+    await blob_collector.stop()
+    await ingestion_runner.stop()
+    get_hashing_executor().shutdown()
+    stop_logging()
 
-app = FastAPI(title=settings.APP_NAME)
+
+app = FastAPI(
+    title=settings.APP_NAME,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON else JSONResponse,
+)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 origins = [
     "http://localhost",
@@ -27,10 +66,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(RequestIdMiddleware)
+if settings.METRICS_ENABLED:
+    instrument_engine(async_engine)
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(users_router)
+app.include_router(datasets_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
     
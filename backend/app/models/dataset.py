@@ -0,0 +1,106 @@
+from datetime import datetime
+from enum import StrEnum
+from pydantic import BaseModel, ConfigDict
+
+
+class FileType(StrEnum):
+    csv = "csv"
+    geojson = "geojson"
+
+
+class ExportFormat(StrEnum):
+    ndjson = "ndjson"
+    geojson = "geojson"
+    csv = "csv"
+
+
+class ColumnType(StrEnum):
+    empty = "empty"
+    integer = "integer"
+    number = "number"
+    boolean = "boolean"
+    string = "string"
+
+
+class JobStatus(StrEnum):
+    pending = "pending"
+    processing = "processing"
+    ready = "ready"
+    failed = "failed"
+
+
+class DatasetForm(BaseModel):
+    """Multipart form fields sent along with the uploaded file"""
+    title: str
+    description: str | None = None
+    tags: str | None = None  # JSON list or comma separated
+    category_ids: str | None = None  # JSON list or comma separated
+    file_type: FileType
+
+
+class DatasetCreate(BaseModel):
+    title: str
+    description: str | None = None
+    tags: list[str] | None = None
+    category_ids: list[int] | None = None
+    file_type: FileType
+
+
+class DatasetRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    owner_id: int
+    title: str
+    description: str | None
+    tags: list[str] | None
+    category_ids: list[int] | None
+    file_type: FileType
+    filename: str | None
+    size_bytes: int
+    checksum: str
+    row_count: int | None = None
+    columns: list[str] | None = None
+    bbox: list[float] | None = None
+    created_at: datetime
+
+
+class DatasetPage(BaseModel):
+    items: list[DatasetRead]
+    next_cursor: str | None = None  # pass back as `cursor` for the next page
+
+
+class DatasetStatus(BaseModel):
+    dataset_id: int
+    status: JobStatus
+    attempts: int
+    error: str | None = None
+    row_count: int | None = None
+    columns: list[str] | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class Histogram(BaseModel):
+    edges: list[float]  # len(counts) + 1 bin edges, each bin includes its lower edge
+    counts: list[int]
+
+
+class ColumnProfile(BaseModel):
+    name: str
+    type: ColumnType
+    count: int
+    null_count: int
+    min: float | None = None  # integer and number columns
+    max: float | None = None
+    histogram: Histogram | None = None
+    true_count: int | None = None  # boolean columns
+    min_length: int | None = None  # string columns
+    max_length: int | None = None
+
+
+class DatasetProfile(BaseModel):
+    dataset_id: int
+    row_count: int | None = None
+    bbox: list[float] | None = None
+    columns: list[ColumnProfile]
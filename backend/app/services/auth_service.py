@@ -1,30 +1,35 @@
+import hashlib
 import logging
+import time
+import uuid
 from datetime import timedelta, datetime, timezone
-from typing import Annotated
+from typing import Annotated, NoReturn
 from fastapi import Depends, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from pwdlib import PasswordHash
 import jwt
 from jwt import PyJWTError
 from jwt.exceptions import InvalidTokenError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from app.models.auth import TokenData, RegisterUserRequest, Token, AuthTokens
 from app.exceptions.auth import AuthenticationError, RegistrationError
 from app.core.settings import settings
+from app.core.cache import TTLCache
+from app.core.metrics import timed_phase
+from app.core.hashing import verify_password, get_password_hash, get_hashing_executor
+from app.core.login_throttle import LoginThrottle, login_throttle
+from app.core.singleflight import SingleFlight
 from app.db.schema import User
+from app.db.queries import UserCredentialsRow, fetch_user_credentials, fetch_user_identity
+from app.services.user_cache import user_cache
+from app.services.revocation_store import RevocationStore, revocation_store
 
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl='api/v1/auth/login')
-password_hash = PasswordHash.recommended()
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_hash.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    return password_hash.hash(password)
+# Decoded access tokens keyed by their sha256 digest, each entry expires with the token.
+token_cache = TTLCache(max_size=settings.TOKEN_CACHE_SIZE)
+# Tabs refreshing at once look the same user up; they share one query
+user_identity_reads = SingleFlight("user_identity")
 
 
 def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]) -> TokenData:
@@ -32,29 +37,73 @@ def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]) -> TokenData
 
 
 def verify_token(token: str) -> TokenData:
+    cache_key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(cache_key)
+    if token_data is not None:
+        return token_data
+
     try:
-        payload = jwt.decode(token, settings.ACCESS_TOKEN_SECRET, algorithms=[settings.ALGORITHM])
+        with timed_phase("jwt"):
+            payload = jwt.decode(token, settings.ACCESS_TOKEN_SECRET, algorithms=[settings.ALGORITHM])
         user_id: str = payload.get('id')
-        return TokenData(user_id=int(user_id))
+        token_data = TokenData(user_id=int(user_id))
     except PyJWTError as e:
-        logging.warning(f"Token verification failed: {str(e)}")
+        logging.warning("Token verification failed: %s", e)
         raise AuthenticationError()
 
+    expires_at = payload.get('exp', time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    token_cache.set(cache_key, token_data, ttl=expires_at - time.time())
+    return token_data
+
 
 class AuthService:
-    def __init__(self, session: AsyncSession):
+    verify_password = staticmethod(verify_password)
+    get_password_hash = staticmethod(get_password_hash)
+    verify_token = staticmethod(verify_token)
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        revocations: RevocationStore = revocation_store,
+        throttle: LoginThrottle = login_throttle,
+    ):
         self._db = session
+        self._revocations = revocations
+        self._throttle = throttle
 
    
-    async def authenticate_user(self, email: str, password: str) -> User | bool:
-        result = await self._db.execute(select(User).where(User.email == email))
-        user = result.scalar_one_or_none()
-        if not user or not verify_password(password, user.password_hash):
-            logging.warning(f"Failed authentication attempt for email: {email}")
+    async def authenticate_user(self, email: str, password: str) -> UserCredentialsRow | bool:
+        user = await fetch_user_credentials(self._db, email)
+        if not user:
+            # Unknown emails cost one verification too, so timing does not reveal which exist
+            await get_hashing_executor().verify_dummy(password)
+            verified, updated_hash = False, None
+        else:
+            verified, updated_hash = await get_hashing_executor().verify_and_update(password, user.password_hash)
+        if not verified:
+            logging.warning("Failed authentication attempt for email: %s", email)
             return False
+        if updated_hash is not None:
+            await self._upgrade_password_hash(user, updated_hash)
         return user
 
 
+    async def _upgrade_password_hash(self, user: UserCredentialsRow, updated_hash: str) -> None:
+        # The stored hash uses outdated Argon2 parameters; only replaced if the password
+        # did not change since it was read
+        try:
+            await self._db.execute(
+                update(User)
+                .where(User.id == user.id, User.password_hash == user.password_hash)
+                .values(password_hash=updated_hash)
+            )
+            await self._db.commit()
+        except Exception as e:
+            # The login itself succeeded, the upgrade is retried on the next one
+            await self._db.rollback()
+            logging.error("Failed to upgrade password hash of user %s: %s", user.id, e)
+
+
     def create_access_token(self, email: str, user_id: int, expires_delta: timedelta) -> str:
         encode = {
             'sub': email,
@@ -62,17 +111,25 @@ class AuthService:
             'exp': datetime.now(timezone.utc) + expires_delta,
             'type': 'access'
         }
-        return jwt.encode(encode, settings.ACCESS_TOKEN_SECRET, algorithm=settings.ALGORITHM)
+        with timed_phase("jwt"):
+            return jwt.encode(encode, settings.ACCESS_TOKEN_SECRET, algorithm=settings.ALGORITHM)
 
 
-    def create_refresh_token(self, email: str, user_id: int, expires_delta: timedelta) -> str:
+    def create_refresh_token(self, email: str, user_id: int, expires_delta: timedelta, session_id: str | None = None) -> str:
+        """
+        Every refresh token has its own id (jti) and belongs to a login session
+        (sid) shared by all the tokens rotated from it.
+        """
         encode = {
             'sub': email,
             'id': str(user_id),
             'exp': datetime.now(timezone.utc) + expires_delta,
-            'type': 'refresh'
+            'type': 'refresh',
+            'jti': uuid.uuid4().hex,
+            'sid': session_id or uuid.uuid4().hex,
         }
-        return jwt.encode(encode, settings.REFRESH_TOKEN_SECRET, algorithm=settings.ALGORITHM)
+        with timed_phase("jwt"):
+            return jwt.encode(encode, settings.REFRESH_TOKEN_SECRET, algorithm=settings.ALGORITHM)
 
 
     def set_refresh_cookie(self, response: Response, refresh_token: str) -> None:
@@ -89,7 +146,8 @@ class AuthService:
         )
 
 
-    def clear_refresh_cookie(self, response: Response) -> None:
+    @staticmethod
+    def clear_refresh_cookie(response: Response) -> None:
         response.delete_cookie(key=settings.REFRESH_TOKEN_COOKIE_NAME)
 
 
@@ -107,55 +165,109 @@ class AuthService:
                 email=register_user_request.email,
                 first_name=register_user_request.first_name,
                 last_name=register_user_request.last_name,
-                password_hash=get_password_hash(register_user_request.password)
+                password_hash=await get_hashing_executor().hash(register_user_request.password)
             )    
             self._db.add(create_user_model)
             await self._db.commit()
+            await user_cache.invalidate(create_user_model.id)
         except RegistrationError:
             raise
         except Exception as e:
-            logging.error(f"Failed to register user: {register_user_request.email}. Error: {str(e)}")
+            logging.error("Failed to register user: %s. Error: %s", register_user_request.email, e)
             raise RegistrationError("Failed to create user.")
 
 
-    async def login_for_access_token(self, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> AuthTokens:
+    async def login_for_access_token(
+        self, form_data: Annotated[OAuth2PasswordRequestForm, Depends()], client_ip: str | None = None
+    ) -> AuthTokens:
+        # Counted and rejected before hashing: throttled guesses cost no Argon2 time
+        await self._throttle.acquire(form_data.username, client_ip)
         user = await self.authenticate_user(form_data.username, form_data.password)
         if not user:
             raise AuthenticationError()
+        await self._throttle.record_success(form_data.username)
         access_token = self.create_access_token(user.email, user.id, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
         refresh_token = self.create_refresh_token(user.email, user.id, timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES))
         
         return AuthTokens(access_token=access_token, refresh_token=refresh_token)
 
 
+    def _decode_refresh_token(self, refresh_token: str) -> dict:
+        try:
+            with timed_phase("jwt"):
+                payload = jwt.decode(refresh_token, settings.REFRESH_TOKEN_SECRET, algorithms=[settings.ALGORITHM])
+        except (PyJWTError, InvalidTokenError):
+            raise AuthenticationError("Invalid refresh token or expired")
+        if payload.get("type") != "refresh":
+            raise AuthenticationError("Invalid token type")
+        if not payload.get('id') or not payload.get('sub') or not payload.get('jti') or not payload.get('sid'):
+            raise AuthenticationError("Invalid token payload")
+        return payload
+
+
+    async def _revoke_session(self, payload: dict) -> None:
+        # The session id outlives any single token of the session
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+        await self._revocations.revoke(self._db, payload['sid'], expires_at)
+        await self._db.commit()
+
+
+    async def _reject_reused_refresh_token(self, payload: dict, revoked_at: datetime | None) -> NoReturn:
+        # Two tabs refreshing at once present the same token; the one that lost is only refused
+        grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE)
+        if revoked_at is None or datetime.utcnow() - revoked_at <= grace:
+            logging.info("Refresh token of user %s was rotated by a concurrent refresh", payload['id'])
+        else:
+            logging.warning("Refresh token reused, revoking session of user %s", payload['id'])
+            await self._revoke_session(payload)
+        raise AuthenticationError("Invalid refresh token or expired")
+
+
     async def refresh_access_token(self, request: Request) -> AuthTokens:
+        """
+        Rotates the refresh token: the presented one is revoked and a new one of
+        the same session is issued. A revoked token presented again means it was
+        copied, so the whole session is revoked, the legitimate holder included;
+        within REFRESH_TOKEN_REUSE_GRACE of its rotation it is only refused.
+        """
         refresh_token = request.cookies.get(settings.REFRESH_TOKEN_COOKIE_NAME)
         if not refresh_token:
             raise AuthenticationError("Refresh token missing")
 
-        try:
-            payload = jwt.decode(refresh_token, settings.REFRESH_TOKEN_SECRET, algorithms=[settings.ALGORITHM])
-            
-            if payload.get("type") != "refresh":
-                raise AuthenticationError("Invalid token type")
-            
-            user_id: str = payload.get('id')
-            email: str = payload.get('sub')
-            if not user_id or not email:
-                raise AuthenticationError("Invalid token payload")
+        payload = self._decode_refresh_token(refresh_token)
+        revoked_at = await self._revocations.revoked_at(self._db, payload['jti'])
+        if revoked_at is not None:
+            await self._reject_reused_refresh_token(payload, revoked_at)
+        if await self._revocations.is_revoked(self._db, payload['sid']):
+            raise AuthenticationError("Invalid refresh token or expired")
 
-            result = await self._db.execute(select(User).where(User.email == email).where(User.id == int(user_id)))
-            user = result.scalar_one_or_none()
-            if not user:
-                raise AuthenticationError("User not found")
+        user_id, email = int(payload['id']), payload['sub']
+        user = await user_identity_reads.do((user_id, email), lambda: fetch_user_identity(self._db, user_id, email))
+        if not user:
+            raise AuthenticationError("User not found")
+
+        expires_at = datetime.fromtimestamp(payload['exp'], timezone.utc).replace(tzinfo=None)
+        if not await self._revocations.revoke(self._db, payload['jti'], expires_at):
+            # Lost a race against another use of the same token
+            await self._reject_reused_refresh_token(payload, await self._revocations.revoked_at(self._db, payload['jti']))
+        await self._db.commit()
 
-        except (PyJWTError, InvalidTokenError):
-            raise AuthenticationError("Invalid refresh token or expired")
-        
-        # Issue new tokens (refresh token rotation optional but recommended)
         access_token = self.create_access_token(user.email, int(user.id), timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-        #refresh_token = self.create_refresh_token(user.email, int(user.id), timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES))
+        refresh_token = self.create_refresh_token(
+            user.email, int(user.id), timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES), payload['sid']
+        )
+        return AuthTokens(access_token=access_token, refresh_token=refresh_token)
 
-        return AuthTokens(access_token=access_token, refresh_token=refresh_token)    
+
+    async def logout(self, request: Request) -> None:
+        """Revokes the session of the refresh cookie, if there is a valid one"""
+        refresh_token = request.cookies.get(settings.REFRESH_TOKEN_COOKIE_NAME)
+        if not refresh_token:
+            return
+        try:
+            payload = self._decode_refresh_token(refresh_token)
+        except AuthenticationError:
+            return
+        await self._revoke_session(payload)
 
 CurrentUser = Annotated[TokenData, Depends(get_current_user)]
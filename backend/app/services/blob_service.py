@@ -0,0 +1,119 @@
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.core.storage import FileStorage, dataset_storage
+from app.db.core import async_session, dialect_insert
+from app.db.schema import Blob
+
+
+class BlobService:
+    """
+    Reference counts of stored dataset files.
+
+    Datasets with identical content share one blob. Counts change inside the
+    caller's transaction, so they commit (or roll back) together with the
+    dataset rows. Files are only deleted by `collect_garbage`, once a blob has
+    been unreferenced for BLOB_GC_GRACE seconds: an upload that found the file
+    already stored may still be about to reference it.
+    """
+
+    def __init__(self, session: AsyncSession, storage: FileStorage = dataset_storage) -> None:
+        self._db = session
+        self._storage = storage
+
+    async def acquire(self, key: str, size_bytes: int) -> None:
+        now = datetime.datetime.utcnow()
+        statement = dialect_insert(self._db, Blob).values(key=key, size_bytes=size_bytes, ref_count=1, created_at=now, updated_at=now)
+        await self._db.execute(statement.on_conflict_do_update(
+            index_elements=[Blob.key],
+            set_={"ref_count": Blob.ref_count + 1, "updated_at": now},
+        ))
+
+    async def track(self, key: str, size_bytes: int) -> None:
+        """Records a stored file nothing references yet, so `collect_garbage` eventually deletes it"""
+        now = datetime.datetime.utcnow()
+        statement = dialect_insert(self._db, Blob).values(key=key, size_bytes=size_bytes, ref_count=0, created_at=now, updated_at=now)
+        await self._db.execute(statement.on_conflict_do_nothing(index_elements=[Blob.key]))
+
+    async def release(self, key: str) -> None:
+        await self._db.execute(
+            update(Blob).where(Blob.key == key, Blob.ref_count > 0).values(ref_count=Blob.ref_count - 1)
+        )
+
+    async def collect_garbage(self, grace: float = settings.BLOB_GC_GRACE, batch_size: int = 500) -> int:
+        """Deletes blobs unreferenced for `grace` seconds and their files. Returns how many were deleted."""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=grace)
+        deleted = 0
+        while True:
+            keys = (await self._db.execute(
+                select(Blob.key).where(Blob.ref_count == 0, Blob.updated_at <= cutoff).limit(batch_size)
+            )).scalars().all()
+            if not keys:
+                return deleted
+            # Re-checked in the DELETE: a blob referenced again since the select stays
+            collected = (await self._db.execute(
+                delete(Blob)
+                .where(Blob.key.in_(keys), Blob.ref_count == 0, Blob.updated_at <= cutoff)
+                .returning(Blob.key)
+            )).scalars().all()
+            # Files go before the commit: an upload acquiring one of these keys waits for
+            # it, so once its own reference is committed no deletion is still to come
+            for key in collected:
+                await self._storage.delete(key)
+            await self._db.commit()
+            deleted += len(collected)
+            if len(keys) < batch_size:
+                return deleted
+
+
+class BlobCollector:
+    """Runs BlobService.collect_garbage every BLOB_GC_INTERVAL seconds in the background"""
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        storage: FileStorage = dataset_storage,
+        interval: float = settings.BLOB_GC_INTERVAL,
+        grace: float = settings.BLOB_GC_GRACE,
+    ) -> None:
+        self._session_factory = session_factory
+        self._storage = storage
+        self.interval = interval
+        self.grace = grace
+        self._task: asyncio.Task | None = None
+
+    async def collect(self) -> int:
+        async with self._session_factory() as session:
+            deleted = await BlobService(session, self._storage).collect_garbage(self.grace)
+        if deleted:
+            logging.info("Deleted %s unreferenced dataset files", deleted)
+        return deleted
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.collect()
+            except Exception:
+                logging.exception("Dataset file garbage collection failed")
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+blob_collector = BlobCollector()
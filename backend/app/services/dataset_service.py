@@ -1,66 +1,418 @@
+import base64
+import datetime
 import logging
 import json
-from sqlalchemy import select
+from dataclasses import replace
+from typing import AsyncIterator
+from sqlalchemy import bindparam, delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import HTTPException
+from fastapi import UploadFile
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
-from app.models.dataset import DatasetRead, DatasetCreate
-from app.db.schema import Dataset
-#from app.exceptions.user import UserNotFoundError, InvalidPasswordError, PasswordMismatchError
+from app.models.dataset import DatasetRead, DatasetCreate, DatasetForm, DatasetPage, DatasetProfile, DatasetStatus, ExportFormat, FileType, JobStatus
+from app.db.schema import Dataset, DatasetCategory, DatasetFeature, DatasetTag, IngestionJob
+from app.core.settings import settings
+from app.core.responses import version_tag
+from app.core.storage import FileStorage, UploadTooLargeError, dataset_storage, iter_upload
+from app.exceptions.dataset import DatasetValidationError, DatasetTooLargeError, DatasetNotFoundError, DatasetNotReadyError
+from app.db.search import search_datasets, search_terms
+from app.db.spatial import query_bbox
+from app.services.blob_service import BlobService
+from app.services.download import MEDIA_TYPES as DOWNLOAD_MEDIA_TYPES, DatasetDownload, VariantBuilder, preferred_encoding, variant_builder
+from app.services.export import encode_export
+from app.services.geometry import intersects_bbox
+from app.services.mvt import encode_tile, tile_bounds
+from app.services.tile_cache import TileCache, tile_cache
+from app.services.ingestion_service import IngestionRunner, ingestion_runner
+
+
+def _parse_list(raw: str | None, cast) -> list | None:
+    """Accepts a JSON list or a comma separated string"""
+    if not raw:
+        return None
+    try:
+        parsed = json.loads(raw)
+        if isinstance(parsed, list):
+            return [cast(x) for x in parsed]
+    except ValueError:
+        pass
+    return [cast(x.strip()) for x in str(raw).split(",") if x.strip()]
+
+
+DATASET_READ_COLUMNS = (
+    Dataset.id, Dataset.owner_id, Dataset.title, Dataset.description, Dataset.tags, Dataset.category_ids,
+    Dataset.file_type, Dataset.filename, Dataset.size_bytes, Dataset.checksum, Dataset.row_count,
+    Dataset.columns, Dataset.bbox, Dataset.created_at,
+)
+
+EXPORT_FEATURES = (
+    select(DatasetFeature.id, DatasetFeature.geometry, DatasetFeature.properties)
+    .where(DatasetFeature.dataset_id == bindparam("dataset_id"))
+    .order_by(DatasetFeature.id)
+)
+
+
+def _encode_cursor(*values) -> str:
+    raw = ":".join(repr(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, *types) -> tuple:
+    """Opaque cursor back into its typed values, e.g. `_decode_cursor(c, float, int)`"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        parts = raw.split(":")
+        if len(parts) != len(types):
+            raise ValueError(raw)
+        return tuple(cast(part) for cast, part in zip(types, parts))
+    except ValueError:
+        raise DatasetValidationError("Invalid cursor")
+
+
+def _parse_bbox(raw: str) -> tuple[float, float, float, float]:
+    """Parses `min_x,min_y,max_x,max_y`"""
+    try:
+        min_x, min_y, max_x, max_y = (float(v) for v in raw.split(","))
+    except ValueError:
+        raise DatasetValidationError("bbox must be min_x,min_y,max_x,max_y")
+    if min_x > max_x or min_y > max_y:
+        raise DatasetValidationError("bbox min values must not exceed max values")
+    return min_x, min_y, max_x, max_y
 
 
 class DatasetService:
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        storage: FileStorage = dataset_storage,
+        ingestion: IngestionRunner = ingestion_runner,
+        tiles: TileCache = tile_cache,
+        variants: VariantBuilder = variant_builder,
+    ) -> None:
         self._db = session
+        self._storage = storage
+        self._ingestion = ingestion
+        self._tiles = tiles
+        self._variants = variants
 
-    async def create_dataset(self, user_id, form, upload_file):
-        
-        # Normalize tags
-        parsed_tags: Optional[List[str]] = None
-        if form.tags:
-            try:
-                parsed = json.loads(form.tags)
-                if isinstance(parsed, list):
-                    parsed_tags = [str(t) for t in parsed]
-                else:
-                    parsed_tags = [t.strip() for t in str(tags).split(",") if t.strip()]
-            except Exception:
-                parsed_tags = [t.strip() for t in str(tags).split(",") if t.strip()]
-
-        # Normalizar category_ids
-        parsed_cat_ids: Optional[List[int]] = None
-        if form.category_ids:
-            try:
-                parsed = json.loads(form.category_ids)
-                if isinstance(parsed, list):
-                    parsed_cat_ids = [int(x) for x in parsed]
-                else:
-                    parsed_cat_ids = [int(x) for x in str(category_ids).split(",") if x.strip()]
-            except Exception:
-                parsed_cat_ids = [int(x) for x in str(category_ids).split(",") if x.strip()]
-
-        # Construir DTO validado
+    async def create_dataset(self, user_id: int, form: DatasetForm, upload_file: UploadFile) -> DatasetRead:
+        # Normalize tags and category_ids
         try:
-            dto = Dataset(
-                title=title,
-                description=description,
-                tags=parsed_tags,
-                category_ids=parsed_cat_ids,
-                file_type=file_type,
+            dto = DatasetCreate(
+                title=form.title,
+                description=form.description,
+                tags=_parse_list(form.tags, str),
+                category_ids=_parse_list(form.category_ids, int),
+                file_type=form.file_type,
+            )
+        except (ValueError, ValidationError) as e:
+            raise DatasetValidationError(str(e))
+
+        # Stream the upload to storage chunk by chunk, never holding the whole file.
+        # Storage is content-addressed: a repeated upload shares the stored file.
+        try:
+            stored = await self._storage.save(iter_upload(upload_file), max_bytes=settings.DATASET_MAX_UPLOAD_BYTES)
+        except UploadTooLargeError as e:
+            logging.warning("Rejected dataset upload over %s bytes for user ID: %s", e.max_bytes, user_id)
+            raise DatasetTooLargeError(e.max_bytes)
+
+        dataset = Dataset(
+            owner_id=user_id,
+            title=dto.title,
+            description=dto.description,
+            tags=dto.tags,
+            category_ids=dto.category_ids,
+            file_type=dto.file_type,
+            filename=upload_file.filename,
+            storage_key=stored.key,
+            size_bytes=stored.size,
+            checksum=stored.checksum,
+        )
+        try:
+            self._db.add(dataset)
+            await self._db.flush()
+            job = IngestionJob(dataset_id=dataset.id, status=JobStatus.pending, attempts=0)
+            self._db.add(job)
+            self._db.add_all(
+                DatasetTag(dataset_id=dataset.id, owner_id=user_id, tag=tag) for tag in dict.fromkeys(dto.tags or [])
+            )
+            self._db.add_all(
+                DatasetCategory(dataset_id=dataset.id, owner_id=user_id, category_id=category_id)
+                for category_id in dict.fromkeys(dto.category_ids or [])
+            )
+            await BlobService(self._db, self._storage).acquire(stored.key, stored.size)
+            await self._db.commit()
+        except Exception:
+            await self._db.rollback()
+            await self._storage.discard(stored)
+            if stored.created:
+                # Not deleted right away: an identical upload may already be sharing the file.
+                # Tracked as an unreferenced blob, it is collected after BLOB_GC_GRACE.
+                try:
+                    await BlobService(self._db, self._storage).track(stored.key, stored.size)
+                    await self._db.commit()
+                except Exception:
+                    logging.exception("Could not track orphaned dataset file %s", stored.key)
+            raise
+        # Referenced now, garbage collection leaves the file alone; if it collected
+        # the file between save() and the commit, the upload puts it back
+        await self._storage.settle(stored)
+        # Parsing happens in the background, the request returns right away
+        self._ingestion.submit(job.id)
+        logging.info(
+            "Created dataset %s (%s bytes, %s) for user ID: %s",
+            dataset.id, stored.size, "new file" if stored.created else "duplicate content", user_id,
+        )
+        return DatasetRead.model_validate(dataset)
+
+    async def delete_dataset(self, user_id: int, dataset_id: int) -> None:
+        """Deletes a dataset, its rows and cached tiles; its file goes once no other dataset shares it"""
+        storage_key = (await self._db.execute(
+            select(Dataset.storage_key).where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).scalar_one_or_none()
+        if storage_key is None:
+            raise DatasetNotFoundError()
+        # Children are deleted explicitly, SQLite does not enforce ON DELETE CASCADE by default
+        for model in (DatasetFeature, DatasetTag, DatasetCategory, IngestionJob):
+            await self._db.execute(delete(model).where(model.dataset_id == dataset_id))
+        await self._db.execute(delete(Dataset).where(Dataset.id == dataset_id))
+        await BlobService(self._db, self._storage).release(storage_key)
+        await self._db.commit()
+        await self._tiles.discard(dataset_id)
+        logging.info("Deleted dataset %s for user ID: %s", dataset_id, user_id)
+
+    async def list_datasets(
+        self,
+        user_id: int,
+        limit: int,
+        cursor: str | None = None,
+        tag: str | None = None,
+        category_id: int | None = None,
+        file_type: FileType | None = None,
+    ) -> DatasetPage:
+        """
+        The user's datasets, newest first, keyset paginated on the dataset id.
+
+        Tag and category filters drive the query from their association
+        table, whose (owner_id, value, dataset_id) index yields the user's
+        matching ids already in order; otherwise the (owner_id, id) index on
+        datasets does. Each page is a bounded index range scan, whatever its
+        depth and however many other users share the tag or category.
+        """
+        statement = select(*DATASET_READ_COLUMNS).where(Dataset.owner_id == user_id)
+        key = Dataset.id
+        if tag is not None:
+            statement = statement.join(DatasetTag, DatasetTag.dataset_id == Dataset.id).where(
+                DatasetTag.owner_id == user_id, DatasetTag.tag == tag
             )
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=str(e))
+            key = DatasetTag.dataset_id
+        if category_id is not None:
+            statement = statement.join(DatasetCategory, DatasetCategory.dataset_id == Dataset.id).where(
+                DatasetCategory.owner_id == user_id, DatasetCategory.category_id == category_id
+            )
+            if tag is None:
+                key = DatasetCategory.dataset_id
+        if file_type is not None:
+            statement = statement.where(Dataset.file_type == file_type)
+        if cursor is not None:
+            statement = statement.where(key < _decode_cursor(cursor, int)[0])
+        statement = statement.order_by(key.desc()).limit(limit + 1)
+
+        rows = (await self._db.execute(statement)).all()
+        items = [DatasetRead.model_validate(row) for row in rows[:limit]]
+        next_cursor = _encode_cursor(items[-1].id) if len(rows) > limit else None
+        return DatasetPage(items=items, next_cursor=next_cursor)
+
+    async def search_datasets(self, user_id: int, query: str, limit: int, cursor: str | None = None) -> DatasetPage:
+        """Full-text search over the title, tags and description of the user's datasets, best match first"""
+        terms = search_terms(query)
+        if not terms:
+            raise DatasetValidationError("Search query has no searchable words")
+        after = _decode_cursor(cursor, float, int) if cursor is not None else None
+        rows = await search_datasets(self._db, DATASET_READ_COLUMNS, terms, limit + 1, after, owner_id=user_id)
+        items = [DatasetRead.model_validate(row) for row in rows[:limit]]
+        next_cursor = _encode_cursor(rows[limit - 1].score, rows[limit - 1].id) if len(rows) > limit else None
+        return DatasetPage(items=items, next_cursor=next_cursor)
+
+    async def get_status(self, user_id: int, dataset_id: int) -> DatasetStatus:
+        row = (await self._db.execute(
+            select(
+                IngestionJob.dataset_id,
+                IngestionJob.status,
+                IngestionJob.attempts,
+                IngestionJob.error,
+                IngestionJob.started_at,
+                IngestionJob.finished_at,
+                Dataset.row_count,
+                Dataset.columns,
+            )
+            .join(Dataset, Dataset.id == IngestionJob.dataset_id)
+            .where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).one_or_none()
+        if row is None:
+            raise DatasetNotFoundError()
+        return DatasetStatus(**row._mapping)
+
+    async def get_profile(self, user_id: int, dataset_id: int) -> DatasetProfile:
+        """Column statistics computed at ingest; only tabular (CSV) datasets have them"""
+        row = (await self._db.execute(
+            select(Dataset.row_count, Dataset.bbox, Dataset.profile, Dataset.file_type)
+            .where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).first()
+        if row is None:
+            raise DatasetNotFoundError()
+        if row.profile is None:
+            if row.file_type != FileType.csv:
+                raise DatasetNotFoundError("Profiles are only computed for CSV datasets")
+            raise DatasetNotReadyError()
+        return DatasetProfile(dataset_id=dataset_id, row_count=row.row_count, bbox=row.bbox, columns=row.profile)
 
-        # Validar extensión/content-type opcionalmente
-        if file_type == FileType.csv and not file.content_type in ("text/csv","application/vnd.ms-excel"):
-            # puedes hacer validaciones más estrictas
-            pass
+    async def _check_owner(self, user_id: int, dataset_id: int) -> None:
+        found = (await self._db.execute(
+            select(Dataset.id).where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).first()
+        if found is None:
+            raise DatasetNotFoundError()
 
-        # Lógica para almacenar/parsear el archivo (ej: subir a storage, extraer metadatos)
-        contents = await file.read()
-        # aquí delegas a un servicio que guarde el archivo y cree el dataset
-        created = await DatasetService(db).create_dataset(dto, file.filename, contents)
+    async def get_download(self, user_id: int, dataset_id: int, accept_encoding: str | None = None) -> DatasetDownload:
+        """
+        Where and how to send a dataset's stored file.
 
-        return created
-        
\ No newline at end of file
+        Stored files never change, so the content checksum is a strong ETag
+        and the upload time is Last-Modified. A compressed variant is sent
+        when the client accepts it and it has been built; otherwise the file
+        goes as stored and the variant is built for the next request.
+        """
+        row = (await self._db.execute(
+            select(Dataset.storage_key, Dataset.checksum, Dataset.file_type, Dataset.filename, Dataset.size_bytes, Dataset.created_at)
+            .where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).first()
+        if row is None:
+            raise DatasetNotFoundError()
+        download = DatasetDownload(
+            path=self._storage.path(row.storage_key),
+            media_type=DOWNLOAD_MEDIA_TYPES.get(row.file_type, "application/octet-stream"),
+            filename=row.filename or f"dataset-{dataset_id}.{row.file_type}",
+            etag=f'"{row.checksum}"',
+            last_modified=row.created_at,
+        )
+        encoding = preferred_encoding(accept_encoding) if row.size_bytes >= settings.DOWNLOAD_COMPRESS_MIN_BYTES else None
+        if encoding is None:
+            return download
+        variant = self._storage.variant_path(row.storage_key, encoding)
+        if not await run_in_threadpool(variant.exists):
+            self._variants.schedule(self._storage, row.storage_key, encoding)
+            return download
+        return replace(download, path=variant, etag=f'"{row.checksum}-{encoding}"', content_encoding=encoding)
+
+    async def query_features(self, user_id: int, dataset_id: int, bbox: str, limit: int, after: int = 0) -> str:
+        """
+        Features intersecting `bbox` as a GeoJSON FeatureCollection string.
+
+        The spatial index returns bbox-overlap candidates; only features that
+        straddle the query bbox get the exact geometry test. Geometry and
+        properties are spliced in as stored, never re-serialized. `next` is
+        the cursor for the following page (null on the last one).
+        """
+        query = _parse_bbox(bbox)
+        await self._check_owner(user_id, dataset_id)
+        rows = await query_bbox(self._db, dataset_id, query, limit=limit, after_id=after)
+
+        parts = []
+        for row in rows:
+            inside = (
+                row.min_x >= query[0] and row.min_y >= query[1]
+                and row.max_x <= query[2] and row.max_y <= query[3]
+            )
+            if not inside and not intersects_bbox(json.loads(row.geometry), query):
+                continue
+            parts.append(
+                f'{{"type":"Feature","id":{row.id},"geometry":{row.geometry or "null"},'
+                f'"properties":{row.properties or "null"}}}'
+            )
+        next_cursor = rows[-1].id if len(rows) == limit else "null"
+        return (
+            f'{{"type":"FeatureCollection","features":[{",".join(parts)}],'
+            f'"numberReturned":{len(parts)},"next":{next_cursor}}}'
+        )
+
+    async def dataset_version(self, user_id: int, dataset_id: int) -> datetime.datetime:
+        """When the dataset last changed, (re)ingestion included; a single-column lookup"""
+        updated_at = (await self._db.execute(
+            select(Dataset.updated_at).where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).scalar_one_or_none()
+        if updated_at is None:
+            raise DatasetNotFoundError()
+        return updated_at
+
+    async def status_version(self, user_id: int, dataset_id: int) -> tuple[datetime.datetime, datetime.datetime]:
+        """updated_at of the ingestion job and of the dataset, which together make up its status"""
+        row = (await self._db.execute(
+            select(IngestionJob.updated_at, Dataset.updated_at)
+            .join(Dataset, Dataset.id == IngestionJob.dataset_id)
+            .where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).one_or_none()
+        if row is None:
+            raise DatasetNotFoundError()
+        return tuple(row)
+
+    async def tile_version(self, user_id: int, dataset_id: int) -> str:
+        """Cheap version tag of a dataset's features; changes whenever it is (re)ingested"""
+        return version_tag(await self.dataset_version(user_id, dataset_id))
+
+    async def get_tile(self, dataset_id: int, version: str, z: int, x: int, y: int) -> bytes:
+        """Encoded MVT for a tile, served from the tile cache when possible"""
+        key = (dataset_id, version, z, x, y)
+        tile = await self._tiles.get(key)
+        if tile is not None:
+            return tile
+
+        bounds = tile_bounds(z, x, y, buffer_ratio=settings.TILE_BUFFER / settings.TILE_EXTENT)
+        rows = await query_bbox(self._db, dataset_id, bounds, limit=settings.TILE_MAX_FEATURES)
+        if len(rows) == settings.TILE_MAX_FEATURES:
+            logging.warning("Tile %s/%s/%s of dataset %s truncated to %s features", z, x, y, dataset_id, len(rows))
+        tile = await run_in_threadpool(self._encode_tile, rows, z, x, y)
+        await self._tiles.set(key, tile)
+        return tile
+
+    @staticmethod
+    def _encode_tile(rows, z: int, x: int, y: int) -> bytes:
+        features = (
+            (row.id, json.loads(row.geometry), json.loads(row.properties) if row.properties else None)
+            for row in rows
+        )
+        return encode_tile(
+            features,
+            z, x, y,
+            extent=settings.TILE_EXTENT,
+            buffer=settings.TILE_BUFFER,
+            tolerance=settings.TILE_SIMPLIFY_TOLERANCE,
+        )
+
+    async def export_features(self, user_id: int, dataset_id: int, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        """
+        Checks access up front, then returns an async iterator of encoded chunks.
+
+        Rows come from a server-side cursor (`AsyncSession.stream`) in
+        partitions of EXPORT_BATCH_SIZE, so memory stays flat and the first
+        chunk is sent before the whole dataset has been read.
+        """
+        columns = (await self._db.execute(
+            select(Dataset.columns).where(Dataset.id == dataset_id, Dataset.owner_id == user_id)
+        )).first()
+        if columns is None:
+            raise DatasetNotFoundError()
+        return self._stream_export(dataset_id, export_format, columns[0] or [])
+
+    async def _stream_export(self, dataset_id: int, export_format: ExportFormat, columns: list[str]) -> AsyncIterator[bytes]:
+        result = await self._db.stream(
+            EXPORT_FEATURES.execution_options(yield_per=settings.EXPORT_BATCH_SIZE),
+            {"dataset_id": dataset_id},
+        )
+        try:
+            async for chunk in encode_export(result.partitions(), export_format, columns):
+                yield chunk
+        finally:
+            await result.close()
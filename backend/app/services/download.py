@@ -0,0 +1,85 @@
+"""
+Download of stored dataset files.
+
+Files are sent with Starlette's FileResponse, which reads them from disk in
+chunks (or hands the path to the server with the ASGI pathsend extension) and
+handles Range and If-Range itself. Text formats also get precompressed
+variants next to the stored file, built once in the background on the first
+request that accepts them and shared by every dataset with that content.
+"""
+import asyncio
+import datetime
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.storage import FileStorage, available_encodings
+from app.models.dataset import FileType
+
+MEDIA_TYPES = {
+    FileType.csv: "text/csv; charset=utf-8",
+    FileType.geojson: "application/geo+json",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class DatasetDownload:
+    path: Path
+    media_type: str
+    filename: str
+    etag: str
+    last_modified: datetime.datetime
+    content_encoding: str | None = None
+
+
+def negotiate_encoding(accept_encoding: str | None, encodings: list[str]) -> str | None:
+    """Best of `encodings` (in preference order) accepted by an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class VariantBuilder:
+    """Compresses file variants in background tasks, one task per (key, encoding)"""
+
+    def __init__(self) -> None:
+        self._tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+    def schedule(self, storage: FileStorage, key: str, encoding: str) -> None:
+        if (key, encoding) in self._tasks:
+            return
+        task = asyncio.create_task(self._build(storage, key, encoding))
+        self._tasks[(key, encoding)] = task
+        task.add_done_callback(lambda _: self._tasks.pop((key, encoding), None))
+
+    async def _build(self, storage: FileStorage, key: str, encoding: str) -> None:
+        try:
+            await storage.compress(key, encoding)
+            logging.info("Built %s variant of dataset file %s", encoding, key)
+        except Exception:
+            logging.exception("Could not build %s variant of dataset file %s", encoding, key)
+
+    async def join(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values())
+
+
+variant_builder = VariantBuilder()
+
+
+def preferred_encoding(accept_encoding: str | None) -> str | None:
+    return negotiate_encoding(accept_encoding, available_encodings())
@@ -0,0 +1,69 @@
+"""
+Incremental encoders for dataset exports.
+
+Each encoder turns partitions of feature rows (id, geometry, properties, as
+stored at ingest) into text chunks, so an export never holds more than one
+partition in memory. Stored GeoJSON text is spliced in as is; only CSV needs
+to decode properties.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+from app.models.dataset import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.geojson: "application/geo+json",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def _feature(row) -> str:
+    return (
+        f'{{"type":"Feature","id":{row.id},"geometry":{row.geometry or "null"},'
+        f'"properties":{row.properties or "null"}}}'
+    )
+
+
+async def encode_ndjson(partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield "".join(_feature(row) + "\n" for row in rows).encode()
+
+
+async def encode_geojson(partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    yield b'{"type":"FeatureCollection","features":[\n'
+    separator = ""
+    async for rows in partitions:
+        chunk = ",\n".join(_feature(row) for row in rows)
+        yield (separator + chunk).encode()
+        separator = ",\n"
+    yield b"\n]}\n"
+
+
+async def encode_csv(partitions: AsyncIterator[Sequence], columns: list[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", *columns, "geometry"])
+    yield buffer.getvalue().encode()
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            properties = json.loads(row.properties) if row.properties else {}
+            values = (properties.get(column) for column in columns)
+            writer.writerow([
+                row.id,
+                *(v if v is None or isinstance(v, str) else json.dumps(v) for v in values),
+                row.geometry or "",
+            ])
+        yield buffer.getvalue().encode()
+
+
+def encode_export(partitions: AsyncIterator[Sequence], export_format: ExportFormat, columns: list[str]) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.csv:
+        return encode_csv(partitions, columns)
+    if export_format == ExportFormat.geojson:
+        return encode_geojson(partitions)
+    return encode_ndjson(partitions)
@@ -0,0 +1,133 @@
+"""
+Small planar geometry helpers over GeoJSON dicts.
+
+Kept dependency free (no shapely) so they can run inside the ingestion
+process pool. Coordinates are treated as plain x/y; a bbox is always
+(min_x, min_y, max_x, max_y).
+"""
+from typing import Iterator
+
+BBox = tuple[float, float, float, float]
+
+
+def iter_positions(geometry: dict) -> Iterator[tuple[float, float]]:
+    kind = geometry.get("type")
+    coordinates = geometry.get("coordinates")
+    if kind == "GeometryCollection":
+        for part in geometry.get("geometries") or []:
+            yield from iter_positions(part)
+        return
+    if coordinates is None:
+        return
+    depth = {"Point": 0, "MultiPoint": 1, "LineString": 1, "MultiLineString": 2, "Polygon": 2, "MultiPolygon": 3}.get(kind)
+    if depth is None:
+        raise ValueError(f"Unsupported geometry type: {kind}")
+    stack = [(coordinates, depth)]
+    while stack:
+        value, level = stack.pop()
+        if level == 0:
+            yield float(value[0]), float(value[1])
+        else:
+            stack.extend((item, level - 1) for item in value)
+
+
+def geometry_bbox(geometry: dict | None) -> BBox | None:
+    if not geometry:
+        return None
+    min_x = min_y = float("inf")
+    max_x = max_y = float("-inf")
+    for x, y in iter_positions(geometry):
+        if x < min_x:
+            min_x = x
+        if x > max_x:
+            max_x = x
+        if y < min_y:
+            min_y = y
+        if y > max_y:
+            max_y = y
+    if min_x == float("inf"):
+        return None
+    return min_x, min_y, max_x, max_y
+
+
+def bbox_union(a: BBox | None, b: BBox | None) -> BBox | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def _point_in_bbox(x: float, y: float, bbox: BBox) -> bool:
+    return bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]
+
+
+def _segment_intersects_bbox(x1: float, y1: float, x2: float, y2: float, bbox: BBox) -> bool:
+    # Liang-Barsky: clip the segment's parameter range against each slab
+    t0, t1 = 0.0, 1.0
+    dx, dy = x2 - x1, y2 - y1
+    for p, q in ((-dx, x1 - bbox[0]), (dx, bbox[2] - x1), (-dy, y1 - bbox[1]), (dy, bbox[3] - y1)):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                if t > t1:
+                    return False
+                t0 = max(t0, t)
+            else:
+                if t < t0:
+                    return False
+                t1 = min(t1, t)
+    return True
+
+
+def _line_intersects_bbox(line: list, bbox: BBox) -> bool:
+    if len(line) == 1:
+        return _point_in_bbox(line[0][0], line[0][1], bbox)
+    return any(
+        _segment_intersects_bbox(a[0], a[1], b[0], b[1], bbox)
+        for a, b in zip(line, line[1:])
+    )
+
+
+def _point_in_ring(x: float, y: float, ring: list) -> bool:
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _polygon_intersects_bbox(rings: list, bbox: BBox) -> bool:
+    if not rings:
+        return False
+    if any(_line_intersects_bbox(ring, bbox) for ring in rings):
+        return True
+    # No edge touches the bbox: either it is fully inside the polygon or disjoint
+    x, y = bbox[0], bbox[1]
+    return _point_in_ring(x, y, rings[0]) and not any(_point_in_ring(x, y, hole) for hole in rings[1:])
+
+
+def intersects_bbox(geometry: dict | None, bbox: BBox) -> bool:
+    """Exact test of whether a GeoJSON geometry intersects an axis-aligned bbox"""
+    if not geometry:
+        return False
+    kind = geometry.get("type")
+    coordinates = geometry.get("coordinates")
+    if kind == "Point":
+        return _point_in_bbox(coordinates[0], coordinates[1], bbox)
+    if kind == "MultiPoint":
+        return any(_point_in_bbox(p[0], p[1], bbox) for p in coordinates)
+    if kind == "LineString":
+        return _line_intersects_bbox(coordinates, bbox)
+    if kind == "MultiLineString":
+        return any(_line_intersects_bbox(line, bbox) for line in coordinates)
+    if kind == "Polygon":
+        return _polygon_intersects_bbox(coordinates, bbox)
+    if kind == "MultiPolygon":
+        return any(_polygon_intersects_bbox(polygon, bbox) for polygon in coordinates)
+    if kind == "GeometryCollection":
+        return any(intersects_bbox(part, bbox) for part in geometry.get("geometries") or [])
+    return False
@@ -0,0 +1,201 @@
+import datetime
+import logging
+import os
+import tempfile
+from sqlalchemy import delete, insert, literal, select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core.jobs import JobScheduler
+from app.core.settings import settings
+from app.core.storage import FileStorage, dataset_storage
+from app.db.core import async_session
+from app.db.schema import Dataset, DatasetFeature, IngestionJob
+from app.models.dataset import JobStatus
+from app.services.parsers import ParseError, parse_dataset, read_feature
+
+
+class IngestionRunner:
+    """
+    Parses uploaded datasets in the background.
+
+    Job state lives in `ingestion_jobs`: a job is claimed with a conditional
+    UPDATE (pending -> processing), so a job is never parsed twice even when
+    several app workers share the database. Parsing runs in the scheduler's
+    process pool; each step opens its own short session so no connection is
+    held while the CPU work runs. The parser spills features to a temporary
+    file which is then bulk inserted in batches of INGESTION_FEATURE_BATCH_SIZE.
+
+    Uploads with identical content share a storage key. When another dataset
+    with the same key and file type is already ingested, its features and
+    profile are copied in the database with INSERT ... SELECT and the file is
+    not parsed again.
+    """
+
+    def __init__(self, session_factory=async_session, storage: FileStorage = dataset_storage, **scheduler_options):
+        self._session_factory = session_factory
+        self._storage = storage
+        options = dict(
+            max_workers=settings.INGESTION_MAX_WORKERS,
+            max_concurrent_jobs=settings.INGESTION_MAX_CONCURRENT_JOBS,
+            max_attempts=settings.INGESTION_MAX_ATTEMPTS,
+            retry_delay=settings.INGESTION_RETRY_DELAY,
+            permanent_errors=(ParseError,),
+        )
+        options.update(scheduler_options)
+        self.scheduler = JobScheduler(self.run, self.on_failure, **options)
+
+    def submit(self, job_id: int) -> None:
+        self.scheduler.submit(job_id)
+
+    async def start(self) -> None:
+        """
+        Start the workers and re-queue jobs left unfinished by a previous process.
+
+        Other workers may still be parsing their jobs, so only jobs claimed
+        more than INGESTION_STALE_AFTER seconds ago are taken back.
+        """
+        stale_before = datetime.datetime.utcnow() - datetime.timedelta(seconds=settings.INGESTION_STALE_AFTER)
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    update(IngestionJob)
+                    .where(IngestionJob.status == JobStatus.processing, IngestionJob.started_at < stale_before)
+                    .values(status=JobStatus.pending)
+                )
+                jobs = (await session.execute(
+                    select(IngestionJob.id, IngestionJob.attempts).where(IngestionJob.status == JobStatus.pending)
+                )).all()
+                await session.commit()
+        except Exception:
+            # A missing schema must not keep the app from booting
+            logging.exception("Could not recover unfinished ingestion jobs")
+            jobs = []
+        for job_id, attempts in jobs:
+            self.scheduler.submit(job_id, attempts + 1)
+        if jobs:
+            logging.info("Re-queued %s unfinished ingestion jobs", len(jobs))
+        self.scheduler.start()
+
+    async def stop(self) -> None:
+        await self.scheduler.stop()
+
+    async def run(self, job_id: int, attempt: int) -> None:
+        now = datetime.datetime.utcnow()
+        async with self._session_factory() as session:
+            claimed = await session.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, IngestionJob.status == JobStatus.pending)
+                .values(status=JobStatus.processing, attempts=attempt, started_at=now, error=None)
+            )
+            if claimed.rowcount != 1:
+                logging.info("Ingestion job %s already claimed or finished, skipping", job_id)
+                return
+            dataset_id, storage_key, file_type = (await session.execute(
+                select(Dataset.id, Dataset.storage_key, Dataset.file_type)
+                .join(IngestionJob, IngestionJob.dataset_id == Dataset.id)
+                .where(IngestionJob.id == job_id)
+            )).one()
+            source = (await session.execute(
+                select(Dataset.id, Dataset.row_count, Dataset.columns, Dataset.bbox, Dataset.profile)
+                .join(IngestionJob, IngestionJob.dataset_id == Dataset.id)
+                .where(
+                    Dataset.storage_key == storage_key,
+                    Dataset.file_type == file_type,
+                    Dataset.id != dataset_id,
+                    IngestionJob.status == JobStatus.ready,
+                )
+                .limit(1)
+            )).first()
+            await session.commit()
+
+        if source is not None:
+            await self._copy(job_id, dataset_id, source)
+            return
+
+        fd, features_path = tempfile.mkstemp(prefix="features-", suffix=".tsv")
+        os.close(fd)
+        try:
+            result = await self.scheduler.run_cpu(
+                parse_dataset, str(self._storage.path(storage_key)), file_type, features_path
+            )
+            async with self._session_factory() as session:
+                # Retries start from a clean slate
+                await session.execute(delete(DatasetFeature).where(DatasetFeature.dataset_id == dataset_id))
+                await self._load_features(session, dataset_id, features_path)
+                await session.execute(
+                    update(Dataset)
+                    .where(Dataset.id == dataset_id)
+                    .values(
+                        row_count=result["row_count"],
+                        columns=result["columns"],
+                        bbox=result["bbox"],
+                        profile=result.get("profile"),
+                    )
+                )
+                await session.execute(
+                    update(IngestionJob)
+                    .where(IngestionJob.id == job_id)
+                    .values(status=JobStatus.ready, finished_at=datetime.datetime.utcnow())
+                )
+                await session.commit()
+        finally:
+            os.unlink(features_path)
+        logging.info("Ingested dataset %s: %s rows", dataset_id, result["row_count"])
+
+    async def _copy(self, job_id: int, dataset_id: int, source) -> None:
+        columns = ("min_x", "min_y", "max_x", "max_y", "geometry", "properties")
+        async with self._session_factory() as session:
+            await session.execute(delete(DatasetFeature).where(DatasetFeature.dataset_id == dataset_id))
+            await session.execute(
+                insert(DatasetFeature).from_select(
+                    ("dataset_id", *columns),
+                    select(literal(dataset_id), *(DatasetFeature.__table__.c[name] for name in columns))
+                    .where(DatasetFeature.dataset_id == source.id)
+                    .order_by(DatasetFeature.id),
+                )
+            )
+            await session.execute(
+                update(Dataset)
+                .where(Dataset.id == dataset_id)
+                .values(row_count=source.row_count, columns=source.columns, bbox=source.bbox, profile=source.profile)
+            )
+            await session.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id)
+                .values(status=JobStatus.ready, finished_at=datetime.datetime.utcnow())
+            )
+            await session.commit()
+        logging.info("Ingested dataset %s from identical dataset %s: %s rows", dataset_id, source.id, source.row_count)
+
+    @staticmethod
+    def _read_batch(handle, size: int) -> list[dict]:
+        batch = []
+        for line in handle:
+            batch.append(read_feature(line))
+            if len(batch) >= size:
+                break
+        return batch
+
+    async def _load_features(self, session, dataset_id: int, features_path: str) -> None:
+        insert_features = DatasetFeature.__table__.insert()
+        handle = await run_in_threadpool(open, features_path, encoding="utf-8")
+        try:
+            while batch := await run_in_threadpool(self._read_batch, handle, settings.INGESTION_FEATURE_BATCH_SIZE):
+                for row in batch:
+                    row["dataset_id"] = dataset_id
+                await session.execute(insert_features, batch)
+        finally:
+            handle.close()
+
+    async def on_failure(self, job_id: int, attempt: int, error: BaseException, final: bool) -> None:
+        values = dict(status=JobStatus.failed if final else JobStatus.pending, attempts=attempt, error=str(error)[:1000])
+        if final:
+            values["finished_at"] = datetime.datetime.utcnow()
+        async with self._session_factory() as session:
+            await session.execute(update(IngestionJob).where(IngestionJob.id == job_id).values(**values))
+            await session.commit()
+        if final:
+            logging.error("Ingestion job %s failed after %s attempts: %s", job_id, attempt, error)
+
+
+ingestion_runner = IngestionRunner()
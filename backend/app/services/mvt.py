@@ -0,0 +1,372 @@
+"""
+Mapbox Vector Tile (MVT 2.1) encoding for GeoJSON features.
+
+Self-contained: tile math, clipping, simplification and the protobuf wire
+format are implemented here, so no protobuf/shapely/mapbox-vector-tile
+dependency is needed. Input coordinates are WGS84 lon/lat (GeoJSON).
+
+Geometries are projected straight into tile space (0..extent, y down), clipped
+to the tile plus `buffer`, simplified with Douglas-Peucker at `tolerance` tile
+units - so simplification scales with the zoom level - and quantized to the
+integer grid. GeometryCollections are not encoded.
+"""
+import math
+import struct
+from typing import Iterable
+
+MAX_LATITUDE = 85.05112878
+
+POINT = 1
+LINESTRING = 2
+POLYGON = 3
+
+MOVE_TO = 1
+LINE_TO = 2
+CLOSE_PATH = 7
+
+
+# Tile math
+
+def tile_bounds(z: int, x: int, y: int, buffer_ratio: float = 0.0) -> tuple[float, float, float, float]:
+    """lon/lat bbox of a tile, grown by `buffer_ratio` of the tile size on every side"""
+    n = 2 ** z
+
+    def lon(tx: float) -> float:
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return (
+        max(-180.0, lon(x - buffer_ratio)),
+        max(-MAX_LATITUDE, lat(y + 1 + buffer_ratio)),
+        min(180.0, lon(x + 1 + buffer_ratio)),
+        min(MAX_LATITUDE, lat(y - buffer_ratio)),
+    )
+
+
+class _Projector:
+    def __init__(self, z: int, x: int, y: int, extent: int):
+        self.scale = 2 ** z * extent
+        self.offset_x = x * extent
+        self.offset_y = y * extent
+
+    def __call__(self, position) -> tuple[float, float]:
+        lon, lat = float(position[0]), float(position[1])
+        lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+        sin = math.sin(math.radians(lat))
+        world_x = (lon + 180.0) / 360.0
+        world_y = 0.5 - math.log((1 + sin) / (1 - sin)) / (4 * math.pi)
+        return world_x * self.scale - self.offset_x, world_y * self.scale - self.offset_y
+
+
+# Clipping
+
+def _inside(point, bounds) -> bool:
+    return bounds[0] <= point[0] <= bounds[2] and bounds[1] <= point[1] <= bounds[3]
+
+
+def _clip_segment(a, b, bounds):
+    """Liang-Barsky; returns the visible part of segment a-b or None"""
+    t0, t1 = 0.0, 1.0
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    for p, q in ((-dx, a[0] - bounds[0]), (dx, bounds[2] - a[0]), (-dy, a[1] - bounds[1]), (dy, bounds[3] - a[1])):
+        if p == 0:
+            if q < 0:
+                return None
+        else:
+            t = q / p
+            if p < 0:
+                if t > t1:
+                    return None
+                t0 = max(t0, t)
+            else:
+                if t < t0:
+                    return None
+                t1 = min(t1, t)
+    return (a[0] + t0 * dx, a[1] + t0 * dy), (a[0] + t1 * dx, a[1] + t1 * dy)
+
+
+def clip_line(line: list, bounds) -> list[list]:
+    parts, current = [], []
+    for a, b in zip(line, line[1:]):
+        clipped = _clip_segment(a, b, bounds)
+        if clipped is None:
+            if len(current) > 1:
+                parts.append(current)
+            current = []
+            continue
+        start, end = clipped
+        if not current:
+            current = [start]
+        elif current[-1] != start:
+            if len(current) > 1:
+                parts.append(current)
+            current = [start]
+        current.append(end)
+        if end != b:
+            parts.append(current)
+            current = []
+    if len(current) > 1:
+        parts.append(current)
+    return parts
+
+
+def clip_ring(ring: list, bounds) -> list:
+    """Sutherland-Hodgman against the four edges of `bounds`"""
+    edges = (
+        (lambda p: p[0] >= bounds[0], lambda a, b: _at_x(a, b, bounds[0])),
+        (lambda p: p[0] <= bounds[2], lambda a, b: _at_x(a, b, bounds[2])),
+        (lambda p: p[1] >= bounds[1], lambda a, b: _at_y(a, b, bounds[1])),
+        (lambda p: p[1] <= bounds[3], lambda a, b: _at_y(a, b, bounds[3])),
+    )
+    output = ring[:-1] if ring and ring[0] == ring[-1] else list(ring)
+    for inside, intersect in edges:
+        if not output:
+            break
+        points, output = output, []
+        previous = points[-1]
+        for point in points:
+            if inside(point):
+                if not inside(previous):
+                    output.append(intersect(previous, point))
+                output.append(point)
+            elif inside(previous):
+                output.append(intersect(previous, point))
+            previous = point
+    return output
+
+
+def _at_x(a, b, x):
+    t = (x - a[0]) / (b[0] - a[0])
+    return x, a[1] + t * (b[1] - a[1])
+
+
+def _at_y(a, b, y):
+    t = (y - a[1]) / (b[1] - a[1])
+    return a[0] + t * (b[0] - a[0]), y
+
+
+# Simplification and quantization
+
+def simplify(points: list, tolerance: float) -> list:
+    """Iterative Douglas-Peucker, keeps the first and last point"""
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = points[first]
+        bx, by = points[last]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        max_distance, index = 0.0, 0
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length_sq == 0:
+                distance = (px - ax) ** 2 + (py - ay) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+                distance = (px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if max_distance > tolerance_sq:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+def _quantize(points: list) -> list[tuple[int, int]]:
+    result = []
+    for x, y in points:
+        point = (int(round(x)), int(round(y)))
+        if not result or result[-1] != point:
+            result.append(point)
+    return result
+
+
+def _ring_area(ring: list[tuple[int, int]]) -> float:
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(ring, ring[1:] + ring[:1])) / 2
+
+
+# Geometry preparation
+
+def prepare_geometry(geometry: dict, project, bounds, tolerance: float) -> tuple[int, list] | None:
+    """Projects, clips and simplifies a GeoJSON geometry. Returns (type, parts) or None when nothing is visible."""
+    kind = geometry.get("type")
+    coordinates = geometry.get("coordinates")
+    if not coordinates:
+        return None
+
+    if kind in ("Point", "MultiPoint"):
+        positions = [coordinates] if kind == "Point" else coordinates
+        points = [p for p in (project(position) for position in positions) if _inside(p, bounds)]
+        points = _quantize(points)
+        return (POINT, [points]) if points else None
+
+    if kind in ("LineString", "MultiLineString"):
+        lines = [coordinates] if kind == "LineString" else coordinates
+        parts = []
+        for line in lines:
+            for part in clip_line([project(p) for p in line], bounds):
+                part = _quantize(simplify(part, tolerance))
+                if len(part) >= 2:
+                    parts.append(part)
+        return (LINESTRING, parts) if parts else None
+
+    if kind in ("Polygon", "MultiPolygon"):
+        polygons = [coordinates] if kind == "Polygon" else coordinates
+        rings = []
+        for polygon in polygons:
+            for index, ring in enumerate(polygon):
+                clipped = clip_ring([project(p) for p in ring], bounds)
+                if len(clipped) < 3:
+                    if index == 0:
+                        break  # exterior gone, holes are irrelevant
+                    continue
+                clipped = _quantize(simplify(clipped + clipped[:1], tolerance))
+                if len(clipped) > 1 and clipped[0] == clipped[-1]:
+                    clipped.pop()
+                area = _ring_area(clipped) if len(clipped) >= 3 else 0
+                if area == 0:
+                    if index == 0:
+                        break
+                    continue
+                # Exterior rings have positive area in tile space (y down), holes negative
+                if (index == 0) != (area > 0):
+                    clipped.reverse()
+                rings.append(clipped)
+        return (POLYGON, rings) if rings else None
+
+    return None
+
+
+# Protobuf wire format
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _field(number: int, wire_type: int) -> bytes:
+    return _varint((number << 3) | wire_type)
+
+
+def _length_delimited(number: int, payload: bytes) -> bytes:
+    return _field(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number: int, values: list[int]) -> bytes:
+    return _length_delimited(number, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value) -> bytes | None:
+    if isinstance(value, bool):
+        return _field(7, 0) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _field(5, 0) + _varint(value)
+        return _field(6, 0) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _field(3, 1) + struct.pack("<d", value)
+    if isinstance(value, str):
+        return _length_delimited(1, value.encode("utf-8"))
+    return None
+
+
+def _command(command: int, count: int) -> int:
+    return (command & 0x7) | (count << 3)
+
+
+def encode_geometry(kind: int, parts: list) -> list[int]:
+    commands = []
+    cursor_x = cursor_y = 0
+
+    def deltas(points):
+        nonlocal cursor_x, cursor_y
+        for x, y in points:
+            commands.append(_zigzag(x - cursor_x))
+            commands.append(_zigzag(y - cursor_y))
+            cursor_x, cursor_y = x, y
+
+    if kind == POINT:
+        points = parts[0]
+        commands.append(_command(MOVE_TO, len(points)))
+        deltas(points)
+        return commands
+    for part in parts:
+        commands.append(_command(MOVE_TO, 1))
+        deltas(part[:1])
+        commands.append(_command(LINE_TO, len(part) - 1))
+        deltas(part[1:])
+        if kind == POLYGON:
+            commands.append(_command(CLOSE_PATH, 1))
+    return commands
+
+
+def encode_tile(
+    features: Iterable[tuple[int, dict | None, dict | None]],
+    z: int,
+    x: int,
+    y: int,
+    layer_name: str = "features",
+    extent: int = 4096,
+    buffer: int = 64,
+    tolerance: float = 1.0,
+) -> bytes:
+    """Encodes (id, geometry, properties) tuples into a single-layer tile. Empty tiles encode to b''."""
+    project = _Projector(z, x, y, extent)
+    bounds = (-buffer, -buffer, extent + buffer, extent + buffer)
+    keys: dict[str, int] = {}
+    values: dict[bytes, int] = {}
+    encoded_features = []
+
+    for feature_id, geometry, properties in features:
+        if not geometry:
+            continue
+        try:
+            prepared = prepare_geometry(geometry, project, bounds, tolerance)
+        except (TypeError, ValueError, IndexError, ZeroDivisionError):
+            continue
+        if prepared is None:
+            continue
+        kind, parts = prepared
+        tags = []
+        for key, value in (properties or {}).items():
+            encoded = _encode_value(value)
+            if encoded is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault(encoded, len(values)))
+        feature = _field(1, 0) + _varint(feature_id)
+        if tags:
+            feature += _packed(2, tags)
+        feature += _field(3, 0) + _varint(kind) + _packed(4, encode_geometry(kind, parts))
+        encoded_features.append(_length_delimited(2, feature))
+
+    if not encoded_features:
+        return b""
+    layer = bytearray(_field(15, 0) + _varint(2) + _length_delimited(1, layer_name.encode("utf-8")))
+    for feature in encoded_features:
+        layer += feature
+    for key in keys:
+        layer += _length_delimited(3, key.encode("utf-8"))
+    for value in values:
+        layer += _length_delimited(4, value)
+    layer += _field(5, 0) + _varint(extent)
+    return _length_delimited(3, bytes(layer))
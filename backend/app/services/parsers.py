@@ -0,0 +1,156 @@
+"""
+Dataset parsers run by the ingestion process pool.
+
+Everything here is plain, picklable and free of app/DB imports so worker
+processes stay cheap to start. Parsers stream their features into a
+tab-separated file (bbox, geometry and properties as GeoJSON text), which the
+event loop side then bulk-loads in batches; only metadata travels back
+through the pool. Memory stays flat regardless of the dataset size (GeoJSON
+excepted, it is parsed as one document).
+"""
+import csv
+import json
+import math
+from typing import TextIO
+
+from app.models.dataset import FileType
+from app.services.geometry import BBox, bbox_union, geometry_bbox
+from app.services.profiler import TableProfiler
+
+LON_COLUMNS = ("lon", "lng", "long", "longitude", "x")
+LAT_COLUMNS = ("lat", "latitude", "y")
+
+
+class ParseError(Exception):
+    pass
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def write_feature(out: TextIO, bbox: BBox | None, geometry: str | None, properties: str | None) -> None:
+    # json.dumps escapes tabs and newlines, so they are safe as separators
+    bbox_fields = "\t".join(repr(v) for v in bbox) if bbox else "\t\t\t"
+    out.write(f"{bbox_fields}\t{geometry or ''}\t{properties or ''}\n")
+
+
+def read_feature(line: str) -> dict:
+    min_x, min_y, max_x, max_y, geometry, properties = line.rstrip("\n").split("\t")
+    return {
+        "min_x": float(min_x) if min_x else None,
+        "min_y": float(min_y) if min_y else None,
+        "max_x": float(max_x) if max_x else None,
+        "max_y": float(max_y) if max_y else None,
+        "geometry": geometry or None,
+        "properties": properties or None,
+    }
+
+
+def _find_column(columns: list[str], candidates: tuple[str, ...]) -> int | None:
+    lowered = [c.lower() for c in columns]
+    for name in candidates:
+        if name in lowered:
+            return lowered.index(name)
+    return None
+
+
+def parse_csv(path: str, out: TextIO) -> dict:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        try:
+            columns = next(reader)
+        except StopIteration:
+            raise ParseError("CSV file is empty")
+        except csv.Error as e:
+            raise ParseError(f"Invalid CSV: {e}")
+        except UnicodeDecodeError as e:
+            raise ParseError(f"CSV is not UTF-8 encoded: {e}")
+        columns = [c.strip() for c in columns]
+        if not any(columns):
+            raise ParseError("CSV header is empty")
+        lon_index = _find_column(columns, LON_COLUMNS)
+        lat_index = _find_column(columns, LAT_COLUMNS)
+        has_points = lon_index is not None and lat_index is not None
+        # Column statistics and the dataset bbox come from the profiler's vectorized pass
+        profiler = TableProfiler(columns, (lon_index, lat_index) if has_points else None)
+        row_count = 0
+        try:
+            for row in reader:
+                if not row:
+                    continue
+                row_count += 1
+                profiler.add_row(row)
+                bbox = geometry = None
+                if has_points:
+                    try:
+                        x, y = float(row[lon_index]), float(row[lat_index])
+                        if not (math.isfinite(x) and math.isfinite(y)):
+                            raise ValueError
+                        bbox = (x, y, x, y)
+                        geometry = _dumps({"type": "Point", "coordinates": [x, y]})
+                    except (ValueError, IndexError):
+                        pass
+                write_feature(out, bbox, geometry, _dumps(dict(zip(columns, row))))
+        except csv.Error as e:
+            raise ParseError(f"Invalid CSV at line {reader.line_num}: {e}")
+        except UnicodeDecodeError as e:
+            raise ParseError(f"CSV is not UTF-8 encoded after line {reader.line_num}: {e}")
+    profile = profiler.result()
+    return {"row_count": row_count, "columns": columns, "bbox": profile["bbox"], "profile": profile["columns"]}
+
+
+def parse_geojson(path: str, out: TextIO) -> dict:
+    try:
+        with open(path, "rb") as handle:
+            document = json.load(handle)
+    except ValueError as e:
+        raise ParseError(f"Invalid GeoJSON: {e}")
+    if not isinstance(document, dict):
+        raise ParseError("GeoJSON root must be an object")
+    if document.get("type") == "FeatureCollection":
+        features = document.get("features") or []
+    elif document.get("type") == "Feature":
+        features = [document]
+    else:
+        raise ParseError("GeoJSON must be a Feature or FeatureCollection")
+    columns: dict[str, None] = {}
+    extent = None
+    for feature in features:
+        if not isinstance(feature, dict):
+            raise ParseError("GeoJSON features must be objects")
+        geometry = feature.get("geometry")
+        properties = feature.get("properties")
+        try:
+            bbox = geometry_bbox(geometry)
+        except (ValueError, TypeError, IndexError, AttributeError) as e:
+            raise ParseError(f"Invalid geometry: {e}")
+        extent = bbox_union(extent, bbox)
+        for key in (properties or {}):
+            columns.setdefault(key)
+        write_feature(
+            out,
+            bbox,
+            _dumps(geometry) if geometry else None,
+            _dumps(properties) if properties is not None else None,
+        )
+    return {"row_count": len(features), "columns": list(columns), "bbox": extent}
+
+
+PARSERS = {
+    FileType.csv: parse_csv,
+    FileType.geojson: parse_geojson,
+}
+
+
+def parse_dataset(path: str, file_type: str, features_path: str) -> dict:
+    """Entry point submitted to the process pool, returns the extracted metadata"""
+    try:
+        parser = PARSERS[FileType(file_type)]
+    except ValueError:
+        raise ParseError(f"Unsupported file type: {file_type}")
+    with open(features_path, "w", encoding="utf-8") as out:
+        result = parser(path, out)
+    if result["bbox"] is not None:
+        result["bbox"] = list(result["bbox"])
+    return result
@@ -0,0 +1,220 @@
+"""
+Per-column statistics of tabular datasets, computed at ingest.
+
+The parser hands over rows in chunks of PROFILE_CHUNK_ROWS; each chunk is
+turned into one NumPy string array per column and profiled with vectorized
+operations, so big files never need more than one chunk in memory. Partial
+results merge across chunks:
+
+- type: empty < integer < number, boolean, and string when values mix
+- null count (empty cells and NULL_VALUES)
+- numbers: min, max and a histogram whose bins double in width whenever a
+  chunk falls outside them, so every chunk lands in the same bins
+- booleans: count of true values; strings: min and max length
+- bbox of the coordinate column pair, when there is one
+
+Like the parsers, this runs in the ingestion worker processes and imports
+nothing from the app besides constants. Cells use NumPy's variable-width
+StringDType, so one long cell does not inflate the whole column.
+"""
+import math
+
+import numpy as np
+
+PROFILE_CHUNK_ROWS = 50_000
+HISTOGRAM_BINS = 20  # must be even, bins are merged in pairs
+STRING_DTYPE = np.dtypes.StringDType()
+NULL_VALUES = ("", "null", "NULL", "NA", "N/A", "NaN", "nan", "None")
+NULL_MAX_LENGTH = max(len(value) for value in NULL_VALUES)
+TRUE_VALUES = ("true", "True", "TRUE")
+FALSE_VALUES = ("false", "False", "FALSE")
+
+EMPTY = "empty"
+INTEGER = "integer"
+NUMBER = "number"
+BOOLEAN = "boolean"
+STRING = "string"
+
+
+def _to_floats(values: np.ndarray) -> np.ndarray | None:
+    """Vectorized str -> float64, None when any value is not a number"""
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        return None
+
+
+def _coerce_floats(values: np.ndarray) -> np.ndarray:
+    """str -> float64 with NaN for anything unparseable; only used for dirty coordinate chunks"""
+    floats = _to_floats(values)
+    if floats is not None:
+        return floats
+
+    def parse(value: str) -> float:
+        try:
+            return float(value)
+        except ValueError:
+            return math.nan
+
+    return np.fromiter((parse(v) for v in values), dtype=np.float64, count=len(values))
+
+
+class Histogram:
+    """Fixed number of equal-width bins that grow to cover every value seen"""
+
+    def __init__(self, bins: int = HISTOGRAM_BINS):
+        self.bins = bins
+        self.start: float | None = None
+        self.width = 0.0
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def _grow(self, low: float, high: float) -> None:
+        half = self.bins // 2
+        while low < self.start or high >= self.start + self.width * self.bins:
+            merged = self.counts.reshape(half, 2).sum(axis=1)
+            if low < self.start:
+                # Grow to the left: the old range becomes the upper half
+                self.start -= self.width * self.bins
+                self.counts = np.concatenate([np.zeros(half, dtype=np.int64), merged])
+            else:
+                self.counts = np.concatenate([merged, np.zeros(half, dtype=np.int64)])
+            self.width *= 2
+
+    def add(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        low, high = float(values.min()), float(values.max())
+        if self.start is None:
+            self.start = low
+            # Half-open bins: the upper edge must lie above the maximum
+            self.width = (high - low) / self.bins * (1 + 1e-9) or 1.0
+        self._grow(low, high)
+        indexes = ((values - self.start) / self.width).astype(np.int64)
+        self.counts += np.bincount(np.clip(indexes, 0, self.bins - 1), minlength=self.bins)
+
+    def to_dict(self) -> dict | None:
+        if self.start is None:
+            return None
+        # Trim empty bins on both ends left over from growing
+        filled = np.flatnonzero(self.counts)
+        first, last = int(filled[0]), int(filled[-1]) + 1
+        edges = self.start + self.width * np.arange(first, last + 1)
+        return {"edges": edges.tolist(), "counts": self.counts[first:last].tolist()}
+
+
+class ColumnProfile:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.type = EMPTY
+        self.count = 0
+        self.null_count = 0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.true_count = 0
+        self.min_length: int | None = None
+        self.max_length: int | None = None
+        self.histogram = Histogram()
+
+    def _widen(self, chunk_type: str) -> None:
+        if chunk_type == EMPTY or chunk_type == self.type:
+            return
+        if self.type == EMPTY:
+            self.type = chunk_type
+        elif {self.type, chunk_type} == {INTEGER, NUMBER}:
+            self.type = NUMBER
+        else:
+            self.type = STRING
+
+    def add(self, values: np.ndarray) -> None:
+        self.count += len(values)
+        lengths = np.strings.str_len(values)
+        # Only short cells can be nulls; np.isin over the whole column costs ~50x more
+        short = lengths <= NULL_MAX_LENGTH
+        nulls = np.zeros(len(values), dtype=bool)
+        nulls[short] = np.isin(values[short], NULL_VALUES)
+        self.null_count += int(nulls.sum())
+        present = values[~nulls]
+        if not len(present):
+            return
+
+        lengths = lengths[~nulls]
+        low, high = int(lengths.min()), int(lengths.max())
+        self.min_length = low if self.min_length is None else min(self.min_length, low)
+        self.max_length = high if self.max_length is None else max(self.max_length, high)
+
+        if self.type == STRING:
+            return
+        is_true = np.isin(present, TRUE_VALUES)
+        if self.type in (EMPTY, BOOLEAN) and np.all(is_true | np.isin(present, FALSE_VALUES)):
+            self._widen(BOOLEAN)
+            self.true_count += int(is_true.sum())
+            return
+        floats = _to_floats(present) if self.type != BOOLEAN else None
+        if floats is None or not np.all(np.isfinite(floats)):
+            self._widen(STRING)
+            return
+        self._widen(INTEGER if np.all(np.mod(floats, 1) == 0) else NUMBER)
+        low, high = float(floats.min()), float(floats.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.histogram.add(floats)
+
+    def to_dict(self) -> dict:
+        profile = {"name": self.name, "type": self.type, "count": self.count, "null_count": self.null_count}
+        if self.type in (INTEGER, NUMBER):
+            profile.update(min=self.min, max=self.max, histogram=self.histogram.to_dict())
+        elif self.type == BOOLEAN:
+            profile["true_count"] = self.true_count
+        elif self.type == STRING:
+            profile.update(min_length=self.min_length, max_length=self.max_length)
+        return profile
+
+
+class TableProfiler:
+    """
+    Profiles rows of string cells added chunk by chunk. `coordinates` are the
+    indexes of the lon and lat columns, if any, for the bbox.
+    """
+
+    def __init__(self, columns: list[str], coordinates: tuple[int, int] | None = None):
+        self.columns = [ColumnProfile(name) for name in columns]
+        self.coordinates = coordinates
+        self.bbox: list[float] | None = None
+        self._rows: list[list[str]] = []
+
+    def add_row(self, row: list[str]) -> None:
+        width = len(self.columns)
+        if len(row) != width:
+            # Short rows are padded with empty cells, extra cells are ignored
+            row = (row + [""] * width)[:width]
+        self._rows.append(row)
+        if len(self._rows) >= PROFILE_CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        cells = [np.array([row[index] for row in rows], dtype=STRING_DTYPE) for index in range(len(self.columns))]
+        for column, values in zip(self.columns, cells):
+            column.add(values)
+        if self.coordinates is not None:
+            self._add_bbox(cells[self.coordinates[0]], cells[self.coordinates[1]])
+
+    def _add_bbox(self, lon: np.ndarray, lat: np.ndarray) -> None:
+        x, y = _coerce_floats(lon), _coerce_floats(lat)
+        valid = np.isfinite(x) & np.isfinite(y)
+        if not valid.any():
+            return
+        x, y = x[valid], y[valid]
+        chunk = [float(x.min()), float(y.min()), float(x.max()), float(y.max())]
+        if self.bbox is None:
+            self.bbox = chunk
+        else:
+            self.bbox = [min(self.bbox[0], chunk[0]), min(self.bbox[1], chunk[1]),
+                         max(self.bbox[2], chunk[2]), max(self.bbox[3], chunk[3])]
+
+    def result(self) -> dict:
+        self.flush()
+        return {"columns": [column.to_dict() for column in self.columns], "bbox": self.bbox}
@@ -0,0 +1,79 @@
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import CacheStats, TTLCache
+from app.core.settings import settings
+
+TileKey = tuple[int, str, int, int, int]  # dataset id, dataset version, z, x, y
+
+
+class TileCache:
+    """
+    Two level cache of encoded vector tiles.
+
+    An in-process LRU holds the hottest tiles; every generated tile is also
+    written under `root/<dataset>/<version>/<z>/<x>/<y>.mvt` so it survives
+    restarts and is shared between workers. Keys carry the dataset version,
+    so re-ingesting a dataset never serves stale tiles. The first tile of a
+    new version removes the dataset's older version directories, and
+    `discard` removes a deleted dataset's tiles, so the disk level holds at
+    most one version per live dataset.
+    """
+
+    def __init__(self, memory: TTLCache, root: str | Path | None = None):
+        self._memory = memory
+        self.root = Path(root) if root else None
+
+    def path(self, key: TileKey) -> Path:
+        dataset_id, version, z, x, y = key
+        return self.root / str(dataset_id) / version / str(z) / str(x) / f"{y}.mvt"
+
+    def _read(self, path: Path) -> bytes | None:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: Path, tile: bytes) -> None:
+        version_dir = path.parents[2]
+        new_version = not version_dir.exists()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(tile)
+        os.replace(tmp_path, path)
+        if new_version:
+            for other in version_dir.parent.iterdir():
+                if other != version_dir:
+                    shutil.rmtree(other, ignore_errors=True)
+
+    async def get(self, key: TileKey) -> bytes | None:
+        tile = self._memory.get(key)
+        if tile is not None or self.root is None:
+            return tile
+        tile = await run_in_threadpool(self._read, self.path(key))
+        if tile is not None:
+            self._memory.set(key, tile)
+        return tile
+
+    async def set(self, key: TileKey, tile: bytes) -> None:
+        self._memory.set(key, tile)
+        if self.root is not None:
+            await run_in_threadpool(self._write, self.path(key), tile)
+
+    async def discard(self, dataset_id: int) -> None:
+        """Removes a deleted dataset's tiles from disk; memory entries age out of the LRU"""
+        if self.root is not None:
+            await run_in_threadpool(shutil.rmtree, self.root / str(dataset_id), True)
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> CacheStats:
+        return self._memory.stats()
+
+
+tile_cache = TileCache(TTLCache(max_size=settings.TILE_CACHE_SIZE), settings.TILE_CACHE_DIR or None)
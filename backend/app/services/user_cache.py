@@ -0,0 +1,67 @@
+import datetime
+
+from app.core.cache import CacheStats, RedisCache, TTLCache
+from app.core.settings import settings
+from app.models.user import UserResponse
+
+
+class UserProfileCache:
+    """
+    Read-through cache of UserResponse by user id.
+
+    The in-process TTL/LRU layer is checked first, then the optional shared
+    backend (USER_CACHE_URL). Other workers' local copies are not notified on
+    invalidation and live at most USER_CACHE_TTL seconds.
+
+    The user's updated_at (its ETag version) is kept locally next to the
+    profile, with the same TTL and invalidation, so revalidating a cached
+    profile needs no query either.
+    """
+
+    def __init__(self, local: TTLCache, shared: RedisCache | None = None, ttl: float = 60):
+        self._local = local
+        self._shared = shared
+        self._versions = TTLCache(max_size=local.max_size, ttl=local.ttl)
+        self.ttl = ttl
+
+    async def get(self, user_id: int) -> UserResponse | None:
+        user = self._local.get(user_id)
+        if user is not None or self._shared is None:
+            return user
+        raw = await self._shared.get(str(user_id))
+        if raw is None:
+            return None
+        user = UserResponse.model_validate_json(raw)
+        self._local.set(user_id, user)
+        return user
+
+    async def set(self, user: UserResponse) -> None:
+        self._local.set(user.id, user)
+        if self._shared is not None:
+            await self._shared.set(str(user.id), user.model_dump_json().encode(), self.ttl)
+
+    def get_version(self, user_id: int) -> datetime.datetime | None:
+        return self._versions.get(user_id)
+
+    def set_version(self, user_id: int, version: datetime.datetime) -> None:
+        self._versions.set(user_id, version)
+
+    async def invalidate(self, user_id: int) -> None:
+        self._local.delete(user_id)
+        self._versions.delete(user_id)
+        if self._shared is not None:
+            await self._shared.delete(str(user_id))
+
+    def clear(self) -> None:
+        self._local.clear()
+        self._versions.clear()
+
+    def stats(self) -> CacheStats:
+        return self._local.stats()
+
+
+user_cache = UserProfileCache(
+    TTLCache(max_size=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL),
+    RedisCache(settings.USER_CACHE_URL, prefix="user:") if settings.USER_CACHE_URL else None,
+    ttl=settings.USER_CACHE_TTL,
+)
@@ -1,3 +1,4 @@
+import datetime
 import logging
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -5,8 +6,14 @@ from fastapi import HTTPException
 
 from app.models.user import UserResponse, PasswordChange
 from app.db.schema import User
+from app.db.queries import fetch_user_profile, fetch_user_version
 from app.exceptions.user import UserNotFoundError, InvalidPasswordError, PasswordMismatchError
-from app.services.auth_service import AuthService
+from app.core.hashing import get_hashing_executor
+from app.core.singleflight import SingleFlight
+from app.services.user_cache import user_cache
+
+# Parallel requests of one page load resolve the same user, cold cache misses share one query
+user_profile_reads = SingleFlight("user_profile")
 
 
 class UserService:
@@ -14,31 +21,59 @@ class UserService:
         self._db = session
 
     async def get_user_by_id(self, user_id: int) -> UserResponse:
+        cached = await user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        row = await user_profile_reads.do(user_id, lambda: fetch_user_profile(self._db, user_id))
+        if row is None:
+            logging.warning("User not found with ID: %s", user_id)
+            raise UserNotFoundError(user_id)
+        logging.info("Successfully retrieved user with ID: %s", user_id)
+        # Trusted DB columns, no need to re-validate the email
+        user = UserResponse.model_construct(id=row.id, email=row.email, first_name=row.first_name, last_name=row.last_name)
+        await user_cache.set(user)
+        user_cache.set_version(user_id, row.updated_at)
+        return user
+
+
+    async def get_user_version(self, user_id: int) -> datetime.datetime:
+        """When the user last changed, for conditional GETs; a single-column primary key lookup on a cache miss"""
+        version = user_cache.get_version(user_id)
+        if version is not None:
+            return version
+        version = await fetch_user_version(self._db, user_id)
+        if version is None:
+            raise UserNotFoundError(user_id)
+        user_cache.set_version(user_id, version)
+        return version
+
+
+    async def _get_user(self, user_id: int) -> User:
         result = await self._db.execute(select(User).where(User.id == user_id))
         user = result.scalar_one_or_none()
         if not user:
-            logging.warning(f"User not found with ID: {user_id}")
+            logging.warning("User not found with ID: %s", user_id)
             raise UserNotFoundError(user_id)
-        logging.info(f"Successfully retrieved user with ID: {user_id}")
         return user
 
 
     async def change_password(self, user_id: int, password_change: PasswordChange) -> None:
         try:
-            user = await self.get_user_by_id(user_id)
+            user = await self._get_user(user_id)
             
-            if not AuthService.verify_password(password_change.current_password, user.password_hash):
-                logging.warning(f"Invalid current password provided for user ID: {user_id}")
+            if not await get_hashing_executor().verify(password_change.current_password, user.password_hash):
+                logging.warning("Invalid current password provided for user ID: %s", user_id)
                 raise InvalidPasswordError()
             
             if password_change.new_password != password_change.new_password_confirm:
-                logging.warning(f"Password mismatch during change attempt for user ID: {user_id}")
+                logging.warning("Password mismatch during change attempt for user ID: %s", user_id)
                 raise PasswordMismatchError()
             
-            user.password_hash = AuthService.get_password_hash(password_change.new_password)
+            user.password_hash = await get_hashing_executor().hash(password_change.new_password)
             await self._db.commit()
-            logging.info(f"Successfully changed password for user ID: {user_id}")
+            await user_cache.invalidate(user_id)
+            logging.info("Successfully changed password for user ID: %s", user_id)
         
         except Exception as e:
-            logging.error(f"Error during password change for user ID: {user_id}. Error: {str(e)}")
+            logging.error("Error during password change for user ID: %s. Error: %s", user_id, e)
             raise
@@ -0,0 +1,73 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run the real FastAPI app in-process through httpx's ASGI transport
+against a throwaway SQLite database, so they need no running server.
+Run them from the backend folder, e.g. `python -m benchmarks.login_latency`.
+"""
+import logging
+import os
+import statistics
+import tempfile
+import time
+import warnings
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.hashing import get_password_hash
+from app.db.core import Base, MeteredQueuePool, get_sessionmaker
+from app.db.schema import User
+
+BENCH_PASSWORD = "benchpassword123"
+
+
+async def create_bench_db():
+    """Create a temporary SQLite database with the app schema. Returns (engine, sessionmaker)."""
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=MeteredQueuePool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def seed_users(sessionmaker, count: int) -> list[str]:
+    """Insert `count` users sharing one password hash and return their emails."""
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    emails = [f"bench{i}@example.com" for i in range(count)]
+    async with sessionmaker() as session:
+        session.add_all(
+            User(email=email, first_name="Bench", last_name="User", password_hash=password_hash)
+            for email in emails
+        )
+        await session.commit()
+    return emails
+
+
+def bench_client(sessionmaker) -> AsyncClient:
+    """An AsyncClient bound to the app with its sessions opened on the benchmark database."""
+    from app.main import app
+
+    warnings.simplefilter("ignore")
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # get_db and the routes that open sessions themselves all take the sessionmaker from here
+    app.dependency_overrides[get_sessionmaker] = lambda: sessionmaker
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+
+
+async def timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+def summarize(label: str, samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"{label:<36} n={len(samples):<6} mean={statistics.fmean(samples) * 1000:8.2f}ms "
+        f"p50={p50 * 1000:8.2f}ms p99={p99 * 1000:8.2f}ms"
+    )
@@ -0,0 +1,41 @@
+"""
+Polling /api/v1/users/me: full responses vs If-None-Match revalidation.
+
+Logs one user in and polls the profile `--requests` times, first without
+validators (every poll returns the body), then with the ETag of the first
+response (every poll is a 304 answered from the updated_at lookup). Run once
+with the user cache on (default) and once with USER_CACHE_SIZE=0 to see the
+cold path.
+
+    python -m benchmarks.conditional_get --requests 2000
+"""
+import argparse
+import asyncio
+
+from .common import BENCH_PASSWORD, bench_client, create_bench_db, seed_users, summarize, timed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    emails = await seed_users(sessionmaker, 1)
+    async with bench_client(sessionmaker) as client:
+        response = await client.post("/api/v1/auth/login", data={"username": emails[0], "password": BENCH_PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        etag = (await client.get("/api/v1/users/me", headers=headers)).headers["etag"]
+
+        for label, request_headers in [("full", headers), ("if-none-match", {**headers, "If-None-Match": etag})]:
+            samples = []
+            for _ in range(args.requests):
+                request = client.get("/api/v1/users/me", headers=request_headers)
+                samples.append(await timed(request))
+            response = await client.get("/api/v1/users/me", headers=request_headers)
+            print(summarize(f"/users/me {label}", samples) + f" status={response.status_code} body={len(response.content)}B")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Dataset listing latency by page depth: keyset cursor vs OFFSET.
+
+Seeds datasets with random tags/categories, then times the page at several
+depths, unfiltered and filtered by tag, with DatasetService.list_datasets
+(keyset) and with the same query paginated by OFFSET.
+
+    python -m benchmarks.dataset_listing --datasets 200000 --depths 1,100,400,800
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import insert, select
+
+from app.db.schema import Dataset, DatasetCategory, DatasetTag
+from app.services.dataset_service import DATASET_READ_COLUMNS, DatasetService, _encode_cursor
+
+from .common import create_bench_db, seed_users, summarize
+
+BATCH = 10_000
+TAGS = [f"tag{i}" for i in range(10)]
+PAGE = 50
+
+
+async def seed_datasets(sessionmaker, count: int) -> None:
+    rng = random.Random(4)
+    async with sessionmaker() as session:
+        for start in range(1, count + 1, BATCH):
+            ids = range(start, min(count + 1, start + BATCH))
+            tags = {i: rng.sample(TAGS, 2) for i in ids}
+            await session.execute(insert(Dataset), [
+                dict(id=i, owner_id=1, title=f"dataset {i}", tags=tags[i], category_ids=[i % 7],
+                     file_type="csv", storage_key=str(i), size_bytes=0, checksum="")
+                for i in ids
+            ])
+            await session.execute(insert(DatasetTag), [dict(dataset_id=i, owner_id=1, tag=t) for i in ids for t in tags[i]])
+            await session.execute(insert(DatasetCategory), [dict(dataset_id=i, owner_id=1, category_id=i % 7) for i in ids])
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--datasets", type=int, default=200_000)
+    parser.add_argument("--depths", default="1,100,400,800")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    await seed_datasets(sessionmaker, args.datasets)
+
+    async with sessionmaker() as session:
+        service = DatasetService(session)
+        for tag in (None, "tag3"):
+            label = f"tag={tag}" if tag else "all"
+            base = select(*DATASET_READ_COLUMNS).where(Dataset.owner_id == 1)
+            key = Dataset.id
+            if tag:
+                base = base.join(DatasetTag, DatasetTag.dataset_id == Dataset.id).where(
+                    DatasetTag.owner_id == 1, DatasetTag.tag == tag
+                )
+                key = DatasetTag.dataset_id
+            for depth in (int(d) for d in args.depths.split(",")):
+                offset = (depth - 1) * PAGE
+                # The cursor a client would hold after walking depth-1 pages
+                previous_id = (await session.execute(
+                    base.with_only_columns(key).order_by(key.desc()).offset(offset - 1).limit(1)
+                )).scalar() if offset else None
+                cursor = _encode_cursor(previous_id) if previous_id else None
+
+                keyset, by_offset = [], []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    await service.list_datasets(1, PAGE, cursor, tag=tag)
+                    keyset.append(time.perf_counter() - started)
+                    started = time.perf_counter()
+                    (await session.execute(base.order_by(key.desc()).offset(offset).limit(PAGE))).all()
+                    by_offset.append(time.perf_counter() - started)
+                print(summarize(f"{label} page {depth} keyset", keyset))
+                print(summarize(f"{label} page {depth} offset", by_offset))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Column profiling cost: vectorized chunks vs a per-cell Python loop, and
+serving the stored profile vs re-reading the file on every view.
+
+`python` computes the same statistics (type, nulls, min/max, bbox) cell by
+cell, without histograms; `numpy` is TableProfiler. `stored` reads the
+profile the way GET /datasets/{id}/profile does.
+
+    python -m benchmarks.dataset_profile --rows 1000000
+"""
+import argparse
+import asyncio
+import csv
+import math
+import tempfile
+import time
+from pathlib import Path
+
+from app.db.schema import Dataset
+from app.services.dataset_service import DatasetService
+from app.services.profiler import NULL_VALUES, TableProfiler
+
+from .common import create_bench_db, seed_users, summarize
+from .ingestion_throughput import make_csv
+
+
+def read_rows(path: Path):
+    with open(path, newline="") as handle:
+        reader = csv.reader(handle)
+        columns = next(reader)
+        return columns, list(reader)
+
+
+def profile_numpy(columns, rows) -> dict:
+    profiler = TableProfiler(columns, (2, 3))
+    for row in rows:
+        profiler.add_row(row)
+    return profiler.result()
+
+
+def profile_python(columns, rows) -> dict:
+    stats = [{"nulls": 0, "numeric": True, "min": math.inf, "max": -math.inf} for _ in columns]
+    bbox = [math.inf, math.inf, -math.inf, -math.inf]
+    for row in rows:
+        for value, column in zip(row, stats):
+            if value in NULL_VALUES:
+                column["nulls"] += 1
+            elif column["numeric"]:
+                try:
+                    number = float(value)
+                    column["min"] = min(column["min"], number)
+                    column["max"] = max(column["max"], number)
+                except ValueError:
+                    column["numeric"] = False
+        x, y = float(row[2]), float(row[3])
+        bbox = [min(bbox[0], x), min(bbox[1], y), max(bbox[2], x), max(bbox[3], y)]
+    return {"columns": stats, "bbox": bbox}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = make_csv(Path(tempfile.mkdtemp(prefix="bench-profile-")) / "data.csv", args.rows)
+    columns, rows = read_rows(path)
+    for label, func in (("python", profile_python), ("numpy", profile_numpy)):
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            func(columns, rows)
+            samples.append(time.perf_counter() - started)
+        print(summarize(f"profile {args.rows} rows ({label})", samples))
+
+    samples = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        profile_numpy(*read_rows(path))
+        samples.append(time.perf_counter() - started)
+    print(summarize("re-read and profile the file", samples))
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    async with sessionmaker() as session:
+        session.add(Dataset(owner_id=1, title="bench", file_type="csv", storage_key="k", size_bytes=0, checksum="",
+                            row_count=args.rows, profile=profile_numpy(columns, rows)["columns"]))
+        await session.commit()
+        service = DatasetService(session)
+        samples = []
+        for _ in range(100):
+            started = time.perf_counter()
+            await service.get_profile(1, 1)
+            samples.append(time.perf_counter() - started)
+    print(summarize("stored profile", samples))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
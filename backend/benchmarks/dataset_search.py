@@ -0,0 +1,82 @@
+"""
+Dataset search latency: FTS index vs a LIKE '%term%' scan.
+
+Seeds datasets with titles, descriptions and tags drawn from a small
+vocabulary (a rare word, a common word, a prefix), then times the first page
+of DatasetService.search_datasets against the same terms matched with LIKE
+over title and description.
+
+The scan stops at the first page of matches, while search ranks every match,
+so a very common word (the last query) is cheaper to scan than to rank.
+
+    python -m benchmarks.dataset_search --datasets 1000000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import and_, insert, or_, select
+
+from app.db.schema import Dataset
+from app.services.dataset_service import DATASET_READ_COLUMNS, DatasetService
+
+from .common import create_bench_db, seed_users, summarize
+
+BATCH = 10_000
+PAGE = 50
+WORDS = [f"word{i}" for i in range(2000)]
+QUERIES = ["word1999", "word1500 word1999", "word199", "word7"]
+
+
+async def seed_datasets(sessionmaker, count: int) -> None:
+    # Zipf-like: low word numbers are common, high ones rare
+    rng = random.Random(5)
+    weights = [1 / (i + 1) for i in range(len(WORDS))]
+
+    def words(k: int) -> str:
+        return " ".join(rng.choices(WORDS, weights, k=k))
+
+    async with sessionmaker() as session:
+        for start in range(1, count + 1, BATCH):
+            await session.execute(insert(Dataset), [
+                dict(id=i, owner_id=1, title=words(4), description=words(20), tags=words(2).split(),
+                     category_ids=[], file_type="csv", storage_key=str(i), size_bytes=0, checksum="")
+                for i in range(start, min(count + 1, start + BATCH))
+            ])
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--datasets", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    await seed_datasets(sessionmaker, args.datasets)
+
+    async with sessionmaker() as session:
+        service = DatasetService(session)
+        for query in QUERIES:
+            like = and_(*(
+                or_(Dataset.title.like(f"%{term}%"), Dataset.description.like(f"%{term}%"))
+                for term in query.split()
+            ))
+            scan = select(*DATASET_READ_COLUMNS).where(like).order_by(Dataset.id).limit(PAGE)
+            indexed, scanned = [], []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                await service.search_datasets(1, query, PAGE)
+                indexed.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                (await session.execute(scan)).all()
+                scanned.append(time.perf_counter() - started)
+            print(summarize(f"{query!r} fts", indexed))
+            print(summarize(f"{query!r} like", scanned))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Time to first byte and peak memory of dataset exports.
+
+`buffered` loads every row with session.execute() and renders the body in
+one go; `streaming` is DatasetService.export_features over a server-side
+cursor.
+
+    python -m benchmarks.export_streaming --features 1000000 --format ndjson
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.db.schema import Dataset
+from app.models.dataset import ExportFormat
+from app.services.dataset_service import EXPORT_FEATURES, DatasetService
+from app.services.export import _feature
+
+from .common import create_bench_db, seed_users
+from .spatial_query import seed_features
+
+
+async def measure(label: str, chunks) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_byte = None
+    total = 0
+    async for chunk in chunks:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        total += len(chunk)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{label:<10} first byte {first_byte * 1000:9.1f}ms  total {elapsed:6.2f}s  "
+        f"{total / 2**20:7.1f} MiB out  peak {peak / 2**20:7.1f} MiB"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=1_000_000)
+    parser.add_argument("--format", default="ndjson", choices=[f.value for f in ExportFormat])
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    # seed_features splits rows over two datasets, export the first one
+    await seed_features(sessionmaker, args.features * 2)
+    async with sessionmaker() as session:
+        dataset = await session.get(Dataset, 1)
+        dataset.columns = []
+        await session.commit()
+
+    async def buffered():
+        async with sessionmaker() as session:
+            rows = (await session.execute(EXPORT_FEATURES, {"dataset_id": 1})).all()
+            yield "".join(_feature(row) + "\n" for row in rows).encode()
+
+    async def streaming():
+        async with sessionmaker() as session:
+            async for chunk in await DatasetService(session).export_features(1, 1, ExportFormat(args.format)):
+                yield chunk
+
+    print(f"exporting {args.features} features as {args.format}")
+    await measure("buffered", buffered())
+    await measure("streaming", streaming())
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
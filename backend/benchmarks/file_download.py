@@ -0,0 +1,79 @@
+"""
+Sending a stored dataset file: peak memory and time per response.
+
+`buffered` reads the file into a Response body; `file` is the FileResponse
+used by /download, streamed in chunks; `pathsend` is the same response on a
+server advertising the ASGI pathsend extension, where no bytes pass through
+Python. Also times a 1MiB Range read and building the gzip variant.
+
+    python -m benchmarks.file_download --rows 5000000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from starlette.responses import FileResponse, Response
+
+from app.core.storage import LocalFileStorage
+
+from .ingestion_throughput import make_csv
+
+
+async def measure(label: str, make_response, headers: list[tuple[bytes, bytes]] = (), extensions=None) -> None:
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "method": "GET", "path": "/", "headers": list(headers), "extensions": extensions or {}}
+    sent = {"bytes": 0, "status": None}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            sent["bytes"] += len(message.get("body", b""))
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    await make_response()(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<10} {sent['status']}  {elapsed * 1000:9.1f}ms  {sent['bytes'] / 2**20:8.1f} MiB sent  peak {peak / 2**20:7.2f} MiB")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-download-"))
+    path = make_csv(workdir / "data.csv", args.rows)
+    size = path.stat().st_size
+    print(f"file of {size / 2**20:.1f} MiB")
+
+    await measure("buffered", lambda: Response(path.read_bytes(), media_type="text/csv"))
+    await measure("file", lambda: FileResponse(path, media_type="text/csv"))
+    await measure("pathsend", lambda: FileResponse(path, media_type="text/csv"), extensions={"http.response.pathsend": {}})
+    middle = size // 2
+    await measure("range 1MiB", lambda: FileResponse(path, media_type="text/csv"),
+                  headers=[(b"range", f"bytes={middle}-{middle + 2**20 - 1}".encode())])
+
+    storage = LocalFileStorage(workdir / "storage")
+    with open(path, "rb") as handle:
+        async def chunks():
+            while chunk := handle.read(2**20):
+                yield chunk
+        stored = await storage.save(chunks())
+    await storage.settle(stored)
+    started = time.perf_counter()
+    await storage.compress(stored.key, "gzip")
+    variant = storage.variant_path(stored.key, "gzip")
+    print(f"gzip variant built in {time.perf_counter() - started:.2f}s: "
+          f"{variant.stat().st_size / 2**20:.1f} MiB ({variant.stat().st_size / size:.0%} of the file)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
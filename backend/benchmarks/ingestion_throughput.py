@@ -0,0 +1,83 @@
+"""
+Upload latency and ingestion throughput with background parsing.
+
+Compares parsing inside the request (what create_dataset used to be meant to
+do) with the background job queue, then drains the queue with 1 and N parser
+processes.
+
+    python -m benchmarks.ingestion_throughput --files 8 --rows 200000 --workers 4
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.core.storage import LocalFileStorage
+from app.models.dataset import DatasetForm, FileType
+from app.services.dataset_service import DatasetService
+from app.services.ingestion_service import IngestionRunner
+from app.services.parsers import parse_dataset
+
+from .common import create_bench_db, seed_users, summarize
+
+
+def make_csv(path: Path, rows: int) -> Path:
+    with open(path, "w") as handle:
+        handle.write("id,name,lon,lat,value\n")
+        for i in range(rows):
+            handle.write(f"{i},name {i},{-58 + i % 100 / 100},{-34 + i % 50 / 100},{i * 3}\n")
+    return path
+
+
+async def upload_all(sessionmaker, storage, ingestion, paths) -> list[float]:
+    form = DatasetForm(title="bench", file_type=FileType.csv)
+    samples = []
+    for path in paths:
+        started = time.perf_counter()
+        with open(path, "rb") as handle:
+            async with sessionmaker() as session:
+                await DatasetService(session, storage, ingestion).create_dataset(1, form, UploadFile(handle, filename=path.name))
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-ingest-"))
+    paths = [make_csv(workdir / f"data-{i}.csv", args.rows) for i in range(args.files)]
+
+    inline = []
+    for path in paths:
+        started = time.perf_counter()
+        parse_dataset(str(path), "csv", str(workdir / "features.tsv"))
+        inline.append(time.perf_counter() - started)
+    print(summarize("parse inside the request (parse only)", inline))
+
+    for workers in (1, args.workers):
+        engine, sessionmaker = await create_bench_db()
+        await seed_users(sessionmaker, 1)
+        storage = LocalFileStorage(workdir / f"storage-{workers}")
+        ingestion = IngestionRunner(sessionmaker, storage, max_workers=workers, max_concurrent_jobs=workers)
+
+        print(summarize(f"upload with background parse ({workers}w)", await upload_all(sessionmaker, storage, ingestion, paths)))
+        started = time.perf_counter()
+        await ingestion.start()
+        await ingestion.scheduler.join()
+        elapsed = time.perf_counter() - started
+        stats = ingestion.scheduler.stats()
+        await ingestion.stop()
+        print(f"  drained {stats.succeeded} jobs with {workers} parser processes in {elapsed:.2f}s "
+              f"({stats.succeeded / elapsed:.2f} datasets/s)")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
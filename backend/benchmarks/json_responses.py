@@ -0,0 +1,54 @@
+"""
+Requests per second on /users/me and /auth/login with and without FAST_JSON.
+
+With FAST_JSON off, routes return models and FastAPI re-validates them against
+the response_model before serializing.
+
+    python -m benchmarks.json_responses --requests 2000
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.settings import settings
+
+from .common import BENCH_PASSWORD, bench_client, create_bench_db, seed_users
+
+
+async def rps(call, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            response = await call()
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    emails = await seed_users(sessionmaker, 1)
+    credentials = {"username": emails[0], "password": BENCH_PASSWORD}
+    async with bench_client(sessionmaker) as client:
+        response = await client.post("/api/v1/auth/login", data=credentials)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        for fast_json in (False, True):
+            settings.FAST_JSON = fast_json
+            me = await rps(lambda: client.get("/api/v1/users/me", headers=headers), args.requests, args.concurrency)
+            login = await rps(lambda: client.post("/api/v1/auth/login", data=credentials), args.logins, args.concurrency)
+            print(f"FAST_JSON={fast_json!s:<5} GET /users/me {me:8.0f} req/s   POST /auth/login {login:6.1f} req/s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+/users/me throughput with the old synchronous logging and the queue pipeline.
+
+Logs go to a temporary file so the terminal does not dominate the numbers.
+
+    python -m benchmarks.logging_throughput --requests 2000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from app.core.logging import LogLevels, configure_logging, stop_logging
+from app.core.settings import settings
+
+from .common import BENCH_PASSWORD, bench_client, create_bench_db, seed_users
+
+MODES = {
+    "sync text": dict(use_queue=False),
+    "queue text": dict(use_queue=True),
+    "queue json": dict(use_queue=True, json_format=True),
+    "queue json + sampling": dict(use_queue=True, json_format=True, sampling=settings.LOG_SAMPLING),
+}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    emails = await seed_users(sessionmaker, 1)
+    async with bench_client(sessionmaker) as client:
+        response = await client.post("/api/v1/auth/login", data={"username": emails[0], "password": BENCH_PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def call() -> None:
+            async with semaphore:
+                await client.get("/api/v1/users/me", headers=headers)
+
+        for label, options in MODES.items():
+            with tempfile.TemporaryFile("w") as log_file:
+                configure_logging(LogLevels.info, stream=log_file, force=True, **options)
+                started = time.perf_counter()
+                await asyncio.gather(*(call() for _ in range(args.requests)))
+                elapsed = time.perf_counter() - started
+                stop_logging()
+            print(f"{label:<24} {args.requests / elapsed:8.0f} req/s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Login latency under concurrent load, per hashing executor mode.
+
+`inline` is the old behaviour (Argon2 on the event loop); `thread` and `process`
+offload to the hashing executor. Alongside the login burst a stream of cheap
+`/users/me` requests measures how much the event loop is stalled.
+
+    python -m benchmarks.login_latency --logins 64 --concurrency 16
+"""
+import argparse
+import asyncio
+
+from app.core.hashing import configure_hashing_executor, get_hashing_executor
+
+from .common import BENCH_PASSWORD, bench_client, create_bench_db, seed_users, summarize, timed
+
+
+async def run_mode(kind: str, sessionmaker, emails: list[str], logins: int, concurrency: int) -> None:
+    configure_hashing_executor(kind)
+    async with bench_client(sessionmaker) as client:
+        response = await client.post("/api/v1/auth/login", data={"username": emails[0], "password": BENCH_PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        login_samples: list[float] = []
+        me_samples: list[float] = []
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def login(i: int) -> None:
+            async with semaphore:
+                data = {"username": emails[i % len(emails)], "password": BENCH_PASSWORD}
+                login_samples.append(await timed(client.post("/api/v1/auth/login", data=data)))
+
+        async def poll_me() -> None:
+            while not done.is_set():
+                me_samples.append(await timed(client.get("/api/v1/users/me", headers=headers)))
+
+        poller = asyncio.create_task(poll_me())
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        done.set()
+        await poller
+
+    print(summarize(f"[{kind}] POST /auth/login", login_samples))
+    print(summarize(f"[{kind}] GET /users/me (bystander)", me_samples))
+    stats = get_hashing_executor().stats()
+    print(f"[{kind}] max queue depth={stats.max_queue_depth} completed={stats.completed}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--modes", default="inline,thread,process")
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    emails = await seed_users(sessionmaker, 32)
+    for kind in args.modes.split(","):
+        await run_mode(kind, sessionmaker, emails, args.logins, args.concurrency)
+    get_hashing_executor().shutdown()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Hashing time spent on a password-guessing burst, with and without the
+login throttle.
+
+Sends `--guesses` wrong passwords from one client IP against one existing
+account and against random unknown emails, and reports the wall time and the
+Argon2 time the hashing executor spent. Without the throttle every guess is
+hashed (unknown emails included, since they get a dummy verification); with
+it, hashing stops at the configured attempt limits.
+
+    python -m benchmarks.login_throttling --guesses 200
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi.security import OAuth2PasswordRequestForm
+from limits.storage import MemoryStorage
+
+from app.core.exceptions import AuthError
+from app.core.hashing import configure_hashing_executor
+from app.core.login_throttle import LoginThrottle
+from app.core.settings import settings
+from app.services.auth_service import AuthService
+
+from .common import create_bench_db, seed_users
+
+
+async def burst(sessionmaker, throttle: LoginThrottle, usernames: list[str]) -> tuple[float, float, int]:
+    executor = configure_hashing_executor("thread")
+    rejected = 0
+    started = time.perf_counter()
+    async with sessionmaker() as session:
+        service = AuthService(session, throttle=throttle)
+        for username in usernames:
+            form = OAuth2PasswordRequestForm(username=username, password="guess", scope="")
+            try:
+                await service.login_for_access_token(form, "203.0.113.7")
+            except AuthError as e:
+                rejected += e.status_code == 429
+    return time.perf_counter() - started, executor.stats().total_run_seconds, rejected
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--guesses", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    engine, sessionmaker = await create_bench_db()
+    emails = await seed_users(sessionmaker, 1)
+    targets = {
+        "one account": [emails[0]] * args.guesses,
+        "unknown emails": [f"guess{i}@example.com" for i in range(args.guesses)],
+    }
+    for name, usernames in targets.items():
+        for label, throttle in [
+            ("no throttle", LoginThrottle(MemoryStorage(), account_limit="1000000/hour", ip_limit="1000000/hour")),
+            ("throttle", LoginThrottle(MemoryStorage())),
+        ]:
+            wall, hashing, rejected = await burst(sessionmaker, throttle, usernames)
+            print(
+                f"{name:<16} {label:<12} guesses={len(usernames)} wall={wall:6.2f}s "
+                f"hashing={hashing:6.2f}s rejected_before_hashing={rejected}"
+            )
+    print(f"limits: account {settings.LOGIN_ACCOUNT_FAILURE_LIMIT}, ip {settings.LOGIN_IP_FAILURE_LIMIT}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Sessions opened and pool checkouts per endpoint.
+
+AsyncSession only checks a connection out of the pool on its first query, so
+a session that runs none costs no checkout (logout with an invalid cookie
+shows it). Token-only paths such as logout or refresh without a cookie open
+no session at all.
+
+    python -m benchmarks.pool_checkouts --requests 200
+"""
+import argparse
+import asyncio
+
+from app.core.settings import settings
+
+from .common import BENCH_PASSWORD, bench_client, create_bench_db, seed_users
+
+
+class CountingFactory:
+    def __init__(self, sessionmaker):
+        self.sessionmaker = sessionmaker
+        self.sessions = 0
+
+    def __call__(self):
+        self.sessions += 1
+        return self.sessionmaker()
+
+
+async def run(engine, sessionmaker, email: str, requests: int) -> None:
+    pool_metrics = engine.pool.metrics
+    factory = CountingFactory(sessionmaker)
+
+    async with bench_client(factory) as client:
+        response = await client.post("/api/v1/auth/login", data={"username": email, "password": BENCH_PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        refresh_cookie = {settings.REFRESH_TOKEN_COOKIE_NAME: response.cookies[settings.REFRESH_TOKEN_COOKIE_NAME]}
+        invalid_cookie = {settings.REFRESH_TOKEN_COOKIE_NAME: "not-a-token"}
+        client.cookies.clear()
+
+        endpoints = {
+            "POST /auth/logout (no cookie)": lambda: client.post("/api/v1/auth/logout"),
+            "POST /auth/logout (invalid cookie)": lambda: client.post("/api/v1/auth/logout", cookies=invalid_cookie),
+            "POST /auth/refresh-token (no cookie)": lambda: client.post("/api/v1/auth/refresh-token"),
+            "POST /auth/refresh-token": lambda: client.post("/api/v1/auth/refresh-token", cookies=refresh_cookie),
+            "GET /users/me": lambda: client.get("/api/v1/users/me", headers=headers),
+        }
+        for label, call in endpoints.items():
+            factory.sessions = 0
+            pool_metrics.reset()
+            for _ in range(requests):
+                await call()
+                client.cookies.clear()
+            print(
+                f"{label:<38} sessions/req={factory.sessions / requests:4.2f} "
+                f"checkouts/req={pool_metrics.checkouts / requests:4.2f}"
+            )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    emails = await seed_users(sessionmaker, 1)
+    await run(engine, sessionmaker, emails[0], args.requests)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
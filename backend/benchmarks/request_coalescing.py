@@ -0,0 +1,59 @@
+"""
+Concurrent identical user lookups with and without single-flight coalescing.
+
+Simulates page loads that fire `--parallel` requests resolving the same
+user at once, each request with its own session as in the app, against a
+cold user cache. Compares running fetch_user_profile per request with
+routing it through the `user_profile` SingleFlight group used by
+UserService.get_user_by_id, reporting burst latency and pool checkouts.
+
+    python -m benchmarks.request_coalescing --parallel 8 --bursts 500
+"""
+import argparse
+import asyncio
+import time
+
+from app.db.queries import fetch_user_profile
+from app.services.user_service import user_profile_reads
+
+from .common import create_bench_db, seed_users, summarize
+
+
+async def run(engine, sessionmaker, parallel: int, bursts: int, coalesce: bool) -> tuple[list[float], int]:
+    pool_metrics = engine.pool.metrics
+    async def lookup(user_id: int) -> None:
+        async with sessionmaker() as session:
+            if coalesce:
+                await user_profile_reads.do(user_id, lambda: fetch_user_profile(session, user_id))
+            else:
+                await fetch_user_profile(session, user_id)
+
+    checkouts = pool_metrics.checkouts
+    samples = []
+    for burst in range(bursts):
+        user_id = burst % 100 + 1
+        started = time.perf_counter()
+        await asyncio.gather(*(lookup(user_id) for _ in range(parallel)))
+        samples.append(time.perf_counter() - started)
+    return samples, pool_metrics.checkouts - checkouts
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parallel", type=int, default=8)
+    parser.add_argument("--bursts", type=int, default=500)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 100)
+    for coalesce in (False, True):
+        samples, checkouts = await run(engine, sessionmaker, args.parallel, args.bursts, coalesce)
+        label = "single-flight" if coalesce else "one query per request"
+        print(summarize(f"{label} x{args.parallel}", samples) + f" checkouts={checkouts}")
+    stats = user_profile_reads.stats()
+    print(f"coalesced {stats.coalesced}/{stats.calls} calls")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
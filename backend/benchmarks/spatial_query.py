@@ -0,0 +1,75 @@
+"""
+Bounding-box query latency: R*Tree index vs scanning a dataset's features.
+
+Seeds random point features into one dataset (plus a second one so the index
+has to discriminate by dataset), then runs small-window bbox queries both ways.
+
+    python -m benchmarks.spatial_query --features 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import insert
+
+from app.db.schema import Dataset, DatasetFeature
+from app.db.spatial import query_bbox
+
+from .common import create_bench_db, seed_users, summarize
+
+BATCH = 20_000
+
+
+async def seed_features(sessionmaker, count: int) -> None:
+    rng = random.Random(1)
+    async with sessionmaker() as session:
+        session.add_all(
+            Dataset(owner_id=1, title=f"bench {i}", file_type="csv", storage_key=str(i), size_bytes=0, checksum="")
+            for i in (1, 2)
+        )
+        await session.flush()
+        for start in range(0, count, BATCH):
+            rows = []
+            for i in range(start, min(count, start + BATCH)):
+                x, y = rng.uniform(-180, 180), rng.uniform(-90, 90)
+                rows.append(dict(
+                    dataset_id=1 + i % 2, min_x=x, min_y=y, max_x=x, max_y=y,
+                    geometry=f'{{"type":"Point","coordinates":[{x},{y}]}}', properties="{}",
+                ))
+            await session.execute(insert(DatasetFeature), rows)
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--window", type=float, default=2.0, help="query bbox size in degrees")
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    started = time.perf_counter()
+    await seed_features(sessionmaker, args.features)
+    print(f"seeded {args.features} features in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(2)
+    windows = []
+    for _ in range(args.queries):
+        x, y = rng.uniform(-180, 180 - args.window), rng.uniform(-90, 90 - args.window)
+        windows.append((x, y, x + args.window, y + args.window))
+
+    async with sessionmaker() as session:
+        for use_index, label in ((True, "bbox query, R*Tree index"), (False, "bbox query, dataset scan")):
+            samples, hits = [], 0
+            for bbox in windows[: args.queries if use_index else max(10, args.queries // 10)]:
+                started = time.perf_counter()
+                hits += len(await query_bbox(session, 1, bbox, limit=10_000, use_index=use_index))
+                samples.append(time.perf_counter() - started)
+            print(summarize(label, samples), f"avg hits={hits / len(samples):.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
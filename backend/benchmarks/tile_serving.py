@@ -0,0 +1,76 @@
+"""
+Vector tile latency (cold, disk cache, memory cache) and payload size.
+
+Seeds random points into one dataset, then requests random tiles at a few
+zoom levels through DatasetService.get_tile. Payload is compared with the
+GeoJSON a client would otherwise download for the whole dataset.
+
+    python -m benchmarks.tile_serving --features 200000 --zooms 4,6,8
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from sqlalchemy import func, select
+
+from app.core.cache import TTLCache
+from app.db.schema import DatasetFeature
+from app.services.dataset_service import DatasetService
+from app.services.tile_cache import TileCache
+
+from .common import create_bench_db, seed_users, summarize
+from .spatial_query import seed_features
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=200_000)
+    parser.add_argument("--zooms", default="4,6,8")
+    parser.add_argument("--tiles", type=int, default=50, help="tiles per zoom level")
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    await seed_features(sessionmaker, args.features)
+    tiles = TileCache(TTLCache(100_000), tempfile.mkdtemp(prefix="bench-tiles-"))
+
+    async with sessionmaker() as session:
+        geojson_bytes = (await session.execute(
+            select(func.sum(func.length(DatasetFeature.geometry) + func.length(DatasetFeature.properties) + 40))
+            .where(DatasetFeature.dataset_id == 1)
+        )).scalar_one()
+        print(f"whole dataset as GeoJSON ~{geojson_bytes / 2**20:.1f} MiB")
+        service = DatasetService(session, tiles=tiles)
+        rng = random.Random(3)
+        for z in (int(v) for v in args.zooms.split(",")):
+            # Points are spread over the whole world; stay within the populated latitudes
+            n = 2 ** z
+            coords = [(rng.randrange(n), rng.randrange(n // 4, n - n // 4)) for _ in range(args.tiles)]
+            coords = list(dict.fromkeys(coords))
+            cold, sizes = [], []
+            for x, y in coords:
+                started = time.perf_counter()
+                sizes.append(len(await service.get_tile(1, "v1", z, x, y)))
+                cold.append(time.perf_counter() - started)
+            warm = []
+            for x, y in coords:
+                started = time.perf_counter()
+                await service.get_tile(1, "v1", z, x, y)
+                warm.append(time.perf_counter() - started)
+            tiles.clear()
+            disk = []
+            for x, y in coords:
+                started = time.perf_counter()
+                await service.get_tile(1, "v1", z, x, y)
+                disk.append(time.perf_counter() - started)
+            print(f"z{z}: mean tile {sum(sizes) / len(sizes) / 1024:.1f} KiB")
+            print(summarize(f"  z{z} cold (query + encode)", cold))
+            print(summarize(f"  z{z} disk cache", disk))
+            print(summarize(f"  z{z} memory cache", warm))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
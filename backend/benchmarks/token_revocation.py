@@ -0,0 +1,78 @@
+"""
+Revocation check latency: Bloom filter in front of `revoked_tokens` vs a
+lookup on every check.
+
+Seeds revoked token ids, loads them into a RevocationStore and times the
+check of ids that were never revoked (every refresh of a healthy session)
+through the filter and as a plain indexed lookup, then the check of revoked
+ids, which always go to the database. Also reports the load time and the
+observed false positive rate.
+
+    python -m benchmarks.token_revocation --revoked 1000000
+"""
+import argparse
+import asyncio
+import datetime
+import time
+import uuid
+
+from sqlalchemy import insert, select
+
+from app.db.schema import RevokedToken
+from app.services.revocation_store import RevocationStore
+
+from .common import create_bench_db, summarize
+
+BATCH = 10_000
+
+
+async def seed_revocations(sessionmaker, count: int) -> list[str]:
+    expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=7)
+    revoked_at = datetime.datetime.utcnow()
+    jtis = [uuid.uuid4().hex for _ in range(count)]
+    async with sessionmaker() as session:
+        for start in range(0, count, BATCH):
+            await session.execute(insert(RevokedToken), [
+                dict(jti=jti, expires_at=expires_at, revoked_at=revoked_at) for jti in jtis[start:start + BATCH]
+            ])
+        await session.commit()
+    return jtis
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--revoked", type=int, default=1_000_000)
+    parser.add_argument("--checks", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    revoked = await seed_revocations(sessionmaker, args.revoked)
+    store = RevocationStore(session_factory=sessionmaker, sync_interval=0)
+    started = time.perf_counter()
+    await store.sync()
+    print(f"loaded {args.revoked} revocations into the filter in {time.perf_counter() - started:.2f}s")
+
+    fresh = [uuid.uuid4().hex for _ in range(args.checks)]
+    async with sessionmaker() as session:
+        filtered, queried, hits = [], [], []
+        for jti in fresh:
+            started = time.perf_counter()
+            await store.is_revoked(session, jti)
+            filtered.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            (await session.execute(select(RevokedToken.id).where(RevokedToken.jti == jti))).first()
+            queried.append(time.perf_counter() - started)
+        false_positives = store.stats().lookups
+        for jti in revoked[:args.checks]:
+            started = time.perf_counter()
+            assert await store.is_revoked(session, jti)
+            hits.append(time.perf_counter() - started)
+    print(summarize("not revoked, filter", filtered))
+    print(summarize("not revoked, lookup", queried))
+    print(summarize("revoked, filter + lookup", hits))
+    print(f"false positives: {false_positives}/{args.checks}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""
+Repeated uploads with content-addressed storage.
+
+Uploads a CSV and ingests it, then uploads the same bytes again: the second
+upload shares the stored file and its ingestion copies the features of the
+first dataset instead of parsing the file.
+
+    python -m benchmarks.upload_dedup --rows 1000000 --repeat 3
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.storage import LocalFileStorage
+from app.services.ingestion_service import IngestionRunner
+
+from .common import create_bench_db, seed_users, summarize
+from .ingestion_throughput import make_csv, upload_all
+
+
+async def ingest(ingestion) -> float:
+    started = time.perf_counter()
+    await ingestion.scheduler.join()
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-dedup-"))
+    path = make_csv(workdir / "data.csv", args.rows)
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    storage = LocalFileStorage(workdir / "storage")
+    ingestion = IngestionRunner(sessionmaker, storage, max_workers=1, max_concurrent_jobs=1)
+    ingestion.scheduler.start()
+
+    first_upload = await upload_all(sessionmaker, storage, ingestion, [path])
+    first_ingest = [await ingest(ingestion)]
+    repeat_upload, repeat_ingest = [], []
+    for _ in range(args.repeat):
+        repeat_upload += await upload_all(sessionmaker, storage, ingestion, [path])
+        repeat_ingest.append(await ingest(ingestion))
+    await ingestion.stop()
+
+    print(summarize("first upload", first_upload))
+    print(summarize("first ingestion (parse)", first_ingest))
+    print(summarize("repeat upload", repeat_upload))
+    print(summarize("repeat ingestion (copy)", repeat_ingest))
+    stored = sum(f.stat().st_size for f in storage.root.rglob("*") if f.is_file())
+    print(f"  {1 + args.repeat} datasets, {stored / 2 ** 20:.1f}MiB stored for a {path.stat().st_size / 2 ** 20:.1f}MiB file")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
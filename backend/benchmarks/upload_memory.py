@@ -0,0 +1,78 @@
+"""
+Peak Python memory while storing uploads of growing size.
+
+`buffered` is the previous approach (`await file.read()` of the whole upload);
+`streaming` is DatasetService.create_dataset with chunked storage.
+
+    python -m benchmarks.upload_memory --sizes-mb 16,64,256
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.core.storage import LocalFileStorage
+from app.models.dataset import DatasetForm, FileType
+from app.services.dataset_service import DatasetService
+from app.services.ingestion_service import IngestionRunner
+
+from .common import create_bench_db, seed_users
+
+
+def make_file(directory: Path, size: int) -> Path:
+    path = directory / f"upload-{size}.csv"
+    block = b"x" * (1024 * 1024)
+    with open(path, "wb") as handle:
+        for _ in range(size // len(block)):
+            handle.write(block)
+    return path
+
+
+async def peak_of(coro) -> int:
+    tracemalloc.start()
+    try:
+        await coro
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", default="16,64,256")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-upload-"))
+    storage = LocalFileStorage(workdir / "storage")
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    form = DatasetForm(title="bench", file_type=FileType.csv)
+    ingestion = IngestionRunner(sessionmaker, storage)  # never started, jobs stay queued
+
+    for size_mb in (int(size) for size in args.sizes_mb.split(",")):
+        path = make_file(workdir, size_mb * 1024 * 1024)
+
+        async def buffered(path=path):
+            with open(path, "rb") as handle:
+                contents = await UploadFile(handle, filename=path.name).read()
+                del contents
+
+        async def streaming(path=path):
+            with open(path, "rb") as handle:
+                async with sessionmaker() as session:
+                    await DatasetService(session, storage, ingestion).create_dataset(1, form, UploadFile(handle, filename=path.name))
+
+        print(
+            f"{size_mb:>5} MiB upload  buffered peak {await peak_of(buffered()) / 2**20:8.1f} MiB"
+            f"   streaming peak {await peak_of(streaming()) / 2**20:6.1f} MiB"
+        )
+        os.remove(path)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+ORM entity load vs column-projected DTO read for a single user by id.
+
+Reports mean latency and the peak memory allocated while serving one call (tracemalloc).
+
+    python -m benchmarks.user_queries --iterations 2000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from app.db.queries import fetch_user_profile
+from app.db.schema import User
+
+from .common import create_bench_db, seed_users
+
+
+async def orm_path(session, user_id: int):
+    result = await session.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    session.expunge_all()
+    return user
+
+
+async def projected_path(session, user_id: int):
+    return await fetch_user_profile(session, user_id)
+
+
+async def measure(label: str, fn, sessionmaker, iterations: int) -> None:
+    async with sessionmaker() as session:
+        for _ in range(50):
+            await fn(session, 1)
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await fn(session, 1)
+        elapsed = time.perf_counter() - started
+
+        # Peak transient allocation of one call, averaged
+        tracemalloc.start()
+        total_peak = 0
+        for _ in range(iterations):
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await fn(session, 1)
+            total_peak += tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+    print(f"{label:<24} {elapsed / iterations * 1e6:8.1f}us/call  peak alloc {total_peak / iterations / 1024:6.1f} KiB/call")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine, sessionmaker = await create_bench_db()
+    await seed_users(sessionmaker, 1)
+    await measure("ORM scalar_one_or_none", orm_path, sessionmaker, args.iterations)
+    await measure("projected DTO", projected_path, sessionmaker, args.iterations)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -24,6 +24,16 @@ fileConfig(config.config_file_name)
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Virtual tables and their shadow tables are managed by hand (app/db/spatial.py, app/db/search.py)
+    if type_ == "table" and reflected and compare_to is None and name.startswith(("dataset_features_rtree", "datasets_fts")):
+        return False
+    # Expression indexes from the same modules (PostgreSQL)
+    if type_ == "index" and reflected and compare_to is None and name in ("ix_dataset_features_bbox", "ix_datasets_search"):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -42,6 +52,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -63,7 +74,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,76 @@
+"""add full-text search index on datasets
+
+Revision ID: f5b3e8a2c947
+Revises: e2a9c7d41b65
+Create Date: 2026-10-18 14:58:30.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b3e8a2c947'
+down_revision: Union[str, Sequence[str], None] = 'e2a9c7d41b65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS datasets_fts USING fts5("
+    "title, tags, description, content='datasets', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    """
+    CREATE TRIGGER IF NOT EXISTS datasets_fts_insert AFTER INSERT ON datasets BEGIN
+        INSERT INTO datasets_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, (SELECT group_concat(value, ' ') FROM json_each(new.tags)), new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS datasets_fts_delete AFTER DELETE ON datasets BEGIN
+        INSERT INTO datasets_fts(datasets_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, (SELECT group_concat(value, ' ') FROM json_each(old.tags)), old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS datasets_fts_update AFTER UPDATE OF title, tags, description ON datasets BEGIN
+        INSERT INTO datasets_fts(datasets_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, (SELECT group_concat(value, ' ') FROM json_each(old.tags)), old.description);
+        INSERT INTO datasets_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, (SELECT group_concat(value, ' ') FROM json_each(new.tags)), new.description);
+    END
+    """,
+    # Index the rows that already exist
+    "INSERT INTO datasets_fts(rowid, title, tags, description) "
+    "SELECT id, title, (SELECT group_concat(value, ' ') FROM json_each(datasets.tags)), description FROM datasets",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS datasets_fts_insert",
+    "DROP TRIGGER IF EXISTS datasets_fts_delete",
+    "DROP TRIGGER IF EXISTS datasets_fts_update",
+    "DROP TABLE IF EXISTS datasets_fts",
+]
+POSTGRES_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_datasets_search ON datasets USING gin ("
+    "(setweight(to_tsvector('simple', coalesce(datasets.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(datasets.tags::jsonb::text, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(datasets.description, '')), 'C')))",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_datasets_search",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for statement in {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for statement in {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(dialect, []):
+        op.execute(statement)
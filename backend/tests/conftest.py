@@ -10,12 +10,17 @@ from app.db.schema import User
 from app.models.auth import TokenData
 from app.services.auth_service import AuthService
 from app.core.rate_limiter import limiter
+from app.services.user_cache import user_cache
+from app.core.login_throttle import login_throttle
 from .test_db import engine, TestingSessionLocal
 
 
 @pytest_asyncio.fixture(scope="function")
 async def db():
-    
+    # Ids restart with every fresh schema, cached profiles must not leak between tests
+    user_cache.clear()
+    login_throttle.reset()
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
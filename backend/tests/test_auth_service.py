@@ -5,7 +5,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 import asyncio
 
-from app.services.auth_service import AuthService
+from app.services.auth_service import AuthService, token_cache
 from app.models.auth import RegisterUserRequest, AuthTokens, Token
 from app.core.exceptions import AuthenticationError
 from app.db.schema import User
@@ -152,3 +152,220 @@ async def test_refresh_access_token_invalid_token(db):
         await auth_service.refresh_access_token(request=mock_request)
     
     assert "Invalid refresh token or expired" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_verify_token_is_cached_until_expiry(db):
+    auth_service = AuthService(session=db)
+    token_cache.clear()
+    hits = token_cache.hits
+
+    token = auth_service.create_access_token("test@example.com", 1, timedelta(minutes=5))
+    assert auth_service.verify_token(token).get_id() == 1
+    assert auth_service.verify_token(token).get_id() == 1
+    assert token_cache.hits == hits + 1
+
+    expired = auth_service.create_access_token("test@example.com", 1, timedelta(seconds=-1))
+    with pytest.raises(AuthenticationError):
+        auth_service.verify_token(expired)
+    assert len(token_cache) == 1
+
+
+def refresh_request(token: str):
+    request = Mock()
+    request.cookies = {settings.REFRESH_TOKEN_COOKIE_NAME: token}
+    return request
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_session(db, test_user, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_GRACE", 0)
+    auth_service = AuthService(session=db)
+    db.add(test_user)
+    await db.commit()
+
+    first = auth_service.create_refresh_token(test_user.email, test_user.id, timedelta(minutes=5))
+    second = (await auth_service.refresh_access_token(refresh_request(first))).refresh_token
+    third = (await auth_service.refresh_access_token(refresh_request(second))).refresh_token
+
+    # Replaying a rotated token fails and takes the newest token of the session down with it
+    with pytest.raises(AuthenticationError):
+        await auth_service.refresh_access_token(refresh_request(first))
+    with pytest.raises(AuthenticationError):
+        await auth_service.refresh_access_token(refresh_request(third))
+
+    # Other sessions of the same user are unaffected
+    other = auth_service.create_refresh_token(test_user.email, test_user.id, timedelta(minutes=5))
+    assert (await auth_service.refresh_access_token(refresh_request(other))).refresh_token
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_keep_the_session(db, test_user, monkeypatch):
+    from app.services.revocation_store import revocation_store
+    from .test_db import TestingSessionLocal
+
+    db.add(test_user)
+    await db.commit()
+    token = AuthService(session=db).create_refresh_token(test_user.email, test_user.id, timedelta(minutes=5))
+
+    # Both requests pass the revocation check before either one rotates the token
+    barrier = asyncio.Barrier(2)
+    revoked_at = revocation_store.revoked_at
+    checks = 0
+
+    async def checked_together(session, jti):
+        nonlocal checks
+        result = await revoked_at(session, jti)
+        checks += 1
+        if checks <= 2:
+            await barrier.wait()
+        return result
+
+    monkeypatch.setattr(revocation_store, "revoked_at", checked_together)
+
+    async def refresh():
+        async with TestingSessionLocal() as session:
+            return await AuthService(session=session).refresh_access_token(refresh_request(token))
+
+    results = await asyncio.gather(refresh(), refresh(), return_exceptions=True)
+    monkeypatch.undo()
+
+    refreshed = [r for r in results if isinstance(r, AuthTokens)]
+    assert len(refreshed) == 1
+    assert [type(r) for r in results if r not in refreshed] == [AuthenticationError]
+
+    # The loser is refused, but the session survives for the winner's new token,
+    # and so does a replay of the rotated token shortly after
+    auth_service = AuthService(session=db)
+    with pytest.raises(AuthenticationError):
+        await auth_service.refresh_access_token(refresh_request(token))
+    assert (await auth_service.refresh_access_token(refresh_request(refreshed[0].refresh_token))).refresh_token
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(db, test_user):
+    auth_service = AuthService(session=db)
+    db.add(test_user)
+    await db.commit()
+
+    token = auth_service.create_refresh_token(test_user.email, test_user.id, timedelta(minutes=5))
+    await auth_service.logout(refresh_request(token))
+    with pytest.raises(AuthenticationError):
+        await auth_service.refresh_access_token(refresh_request(token))
+
+    # Missing or invalid cookies are ignored
+    await auth_service.logout(Mock(cookies={}))
+    await auth_service.logout(refresh_request("not-a-token"))
+
+
+@pytest.mark.asyncio
+async def test_token_only_requests_open_no_session(db):
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+    from app.db.core import get_sessionmaker
+
+    def no_sessions():
+        raise AssertionError("a session was opened")
+
+    app.dependency_overrides[get_sessionmaker] = lambda: no_sessions
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.post("/api/v1/auth/logout")).status_code == 204
+            assert (await client.post("/api/v1/auth/refresh-token")).status_code == 401
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_login_throttled_before_hashing(db, test_user):
+    from limits.storage import MemoryStorage
+    from app.core.hashing import get_hashing_executor
+    from app.core.login_throttle import LoginThrottle
+    from app.core.exceptions import LoginThrottledError
+
+    # Exact counts: the sliding window approximation discounts earlier hits near a minute boundary
+    throttle = LoginThrottle(MemoryStorage(), "moving-window", account_limit="3/minute", ip_limit="5/minute")
+    auth_service = AuthService(session=db, throttle=throttle)
+    db.add(test_user)
+    await db.commit()
+
+    def form(username, password):
+        return OAuth2PasswordRequestForm(username=username, password=password, scope="")
+
+    for _ in range(3):
+        with pytest.raises(AuthenticationError):
+            await auth_service.login_for_access_token(form("test@example.com", "wrong"), "10.0.0.1")
+
+    completed = get_hashing_executor().stats().completed
+    with pytest.raises(LoginThrottledError) as excinfo:
+        await auth_service.login_for_access_token(form("Test@Example.com", "password123"), "10.0.0.2")
+    assert excinfo.value.status_code == 429
+    assert int(excinfo.value.headers["Retry-After"]) > 0
+    assert get_hashing_executor().stats().completed == completed
+
+    # Unknown emails count against the IP and still pay for one verification
+    for i in range(2):
+        with pytest.raises(AuthenticationError):
+            await auth_service.login_for_access_token(form(f"nobody{i}@example.com", "wrong"), "10.0.0.1")
+    assert get_hashing_executor().stats().completed > completed
+    with pytest.raises(LoginThrottledError):
+        await auth_service.login_for_access_token(form("other@example.com", "wrong"), "10.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_guesses_are_counted_before_hashing(db, test_user):
+    from limits.storage import MemoryStorage
+    from app.core.hashing import get_hashing_executor
+    from app.core.login_throttle import LoginThrottle
+    from app.core.exceptions import LoginThrottledError
+    from .test_db import TestingSessionLocal
+
+    throttle = LoginThrottle(MemoryStorage(), "moving-window", account_limit="3/minute", ip_limit="5/minute")
+    db.add(test_user)
+    await db.commit()
+
+    async def guess():
+        async with TestingSessionLocal() as session:
+            form = OAuth2PasswordRequestForm(username="test@example.com", password="wrong", scope="")
+            await AuthService(session=session, throttle=throttle).login_for_access_token(form, "10.0.0.1")
+
+    completed = get_hashing_executor().stats().completed
+    results = await asyncio.gather(*(guess() for _ in range(50)), return_exceptions=True)
+
+    assert sum(isinstance(r, AuthenticationError) and r.status_code == 401 for r in results) == 3
+    assert sum(isinstance(r, LoginThrottledError) for r in results) == 47
+    assert get_hashing_executor().stats().completed - completed == 3
+
+
+@pytest.mark.asyncio
+async def test_successful_login_clears_account_failures(db, test_user):
+    from limits.storage import MemoryStorage
+    from app.core.login_throttle import LoginThrottle
+
+    throttle = LoginThrottle(MemoryStorage(), "moving-window", account_limit="2/minute", ip_limit="100/minute")
+    auth_service = AuthService(session=db, throttle=throttle)
+    db.add(test_user)
+    await db.commit()
+
+    for password in ["wrong", "password123", "wrong", "password123"]:
+        form = OAuth2PasswordRequestForm(username="test@example.com", password=password, scope="")
+        if password == "wrong":
+            with pytest.raises(AuthenticationError):
+                await auth_service.login_for_access_token(form, "10.0.0.1")
+        else:
+            assert (await auth_service.login_for_access_token(form, "10.0.0.1")).access_token
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_outdated_password_hash(db, test_user):
+    from pwdlib.hashers.argon2 import Argon2Hasher
+
+    auth_service = AuthService(session=db)
+    test_user.password_hash = Argon2Hasher(time_cost=1, memory_cost=19_456, parallelism=1).hash("password123")
+    db.add(test_user)
+    await db.commit()
+
+    assert await auth_service.authenticate_user("test@example.com", "password123")
+    stored = await db.scalar(select(User.password_hash).where(User.id == test_user.id))
+    assert f"m={settings.ARGON2_MEMORY_COST},t={settings.ARGON2_TIME_COST}" in stored
+    assert await auth_service.authenticate_user("test@example.com", "password123")
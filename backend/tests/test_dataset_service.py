@@ -0,0 +1,442 @@
+import hashlib
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Depends, UploadFile
+from httpx import ASGITransport, AsyncClient
+
+from app.core.settings import settings
+from app.core.storage import LocalFileStorage
+from app.db.core import get_db
+from app.db.schema import Dataset, IngestionJob
+from app.exceptions.dataset import DatasetNotFoundError, DatasetTooLargeError, DatasetValidationError
+from app.models.dataset import DatasetForm, FileType, JobStatus
+from app.services.auth_service import AuthService
+from app.services.dataset_service import DatasetService
+from app.services.ingestion_service import IngestionRunner
+from app.services.parsers import ParseError, parse_dataset, read_feature
+from .test_db import TestingSessionLocal
+
+CSV = b"name,lon,lat\nA,-58.38,-34.60\nB,-64.18,-31.42\n"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalFileStorage(tmp_path / "datasets")
+
+
+@pytest.fixture
+def ingestion(storage):
+    return IngestionRunner(TestingSessionLocal, storage, retry_delay=0.01)
+
+
+async def add_user(db, test_user):
+    db.add(test_user)
+    await db.commit()
+    return test_user.id
+
+
+@pytest.mark.asyncio
+async def test_create_dataset_streams_upload_to_storage(db, test_user, storage, ingestion, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 8)
+    user_id = await add_user(db, test_user)
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    form = DatasetForm(title="Cities", tags='["ar", "cities"]', category_ids="1, 2", file_type=FileType.csv)
+
+    dataset = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="cities.csv"))
+
+    assert dataset.owner_id == user_id
+    assert dataset.tags == ["ar", "cities"]
+    assert dataset.category_ids == [1, 2]
+    assert dataset.size_bytes == len(CSV)
+    assert dataset.checksum == hashlib.sha256(CSV).hexdigest()
+    stored_path = storage.path((await db.get(Dataset, dataset.id)).storage_key)
+    assert stored_path.read_bytes() == CSV
+
+
+@pytest.mark.asyncio
+async def test_create_dataset_rejects_uploads_over_the_limit(db, test_user, storage, ingestion, monkeypatch):
+    monkeypatch.setattr(settings, "DATASET_MAX_UPLOAD_BYTES", 16)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 8)
+    user_id = await add_user(db, test_user)
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    form = DatasetForm(title="Cities", file_type=FileType.csv)
+
+    with pytest.raises(DatasetTooLargeError):
+        await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="cities.csv"))
+    assert list((storage.root / "tmp").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_endpoint_stops_oversized_bodies_while_receiving(db, test_user, storage, ingestion, monkeypatch):
+    from app.main import app
+    import app.api.v1.datasets as datasets_api
+
+    monkeypatch.setattr(settings, "DATASET_MAX_UPLOAD_BYTES", 1024)
+    monkeypatch.setattr(settings, "UPLOAD_FORM_OVERHEAD_BYTES", 512)
+    user_id = await add_user(db, test_user)
+    headers = {"Authorization": f"Bearer {AuthService(session=db).create_access_token(test_user.email, user_id, timedelta(minutes=5))}"}
+    boundary = "limit-test"
+    head = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="title"\r\n\r\nBig\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file_type"\r\n\r\ncsv\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="big.csv"\r\n\r\n'
+    ).encode()
+    sent = 0
+
+    async def body():
+        nonlocal sent
+        yield head
+        for _ in range(100):
+            sent += 1
+            yield b"x" * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    app.dependency_overrides[datasets_api.get_dataset_service] = lambda: DatasetService(db, storage, ingestion)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            content_type = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+            # Declared too large: refused before the body is read
+            declared = await client.post(
+                "/api/v1/datasets", headers=headers | content_type | {"Content-Length": str(100 * 1024)}, content=b""
+            )
+            # Streamed without a length: the transfer stops once the limit is passed
+            streamed = await client.post("/api/v1/datasets", headers=headers | content_type, content=body())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert declared.status_code == 413, declared.text
+    assert streamed.status_code == 413, streamed.text
+    assert sent < 5
+    assert not (storage.root / "tmp").exists() or list((storage.root / "tmp").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_dataset_endpoint(db, test_user, storage, ingestion, monkeypatch):
+    from app.main import app
+    import app.api.v1.datasets as datasets_api
+
+    from app.db.schema import User
+
+    user_id = await add_user(db, test_user)
+    token = AuthService(session=db).create_access_token(test_user.email, user_id, timedelta(minutes=5))
+    other = User(email="other@example.com", first_name="O", last_name="U", password_hash="x")
+    db.add(other)
+    await db.commit()
+    form = DatasetForm(title="Other cities", file_type=FileType.csv)
+    await DatasetService(db, storage, ingestion).create_dataset(other.id, form, UploadFile(io.BytesIO(CSV), filename="c.csv"))
+
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[datasets_api.get_dataset_service] = lambda db=Depends(get_db): DatasetService(db, storage, ingestion)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/datasets",
+                headers={"Authorization": f"Bearer {token}"},
+                data={"title": "Cities", "file_type": "csv", "tags": "ar,cities"},
+                files={"file": ("cities.csv", CSV, "text/csv")},
+            )
+            dataset_id = response.json()["id"]
+            pending = await client.get(f"/api/v1/datasets/{dataset_id}/status", headers={"Authorization": f"Bearer {token}"})
+
+            ingestion.scheduler.start()
+            await ingestion.scheduler.join()
+            ready = await client.get(f"/api/v1/datasets/{dataset_id}/status", headers={"Authorization": f"Bearer {token}"})
+            profile = await client.get(f"/api/v1/datasets/{dataset_id}/profile", headers={"Authorization": f"Bearer {token}"})
+            revalidated = [
+                await client.get(
+                    f"/api/v1/datasets/{dataset_id}/{path}",
+                    headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+                )
+                for path, etag in [("status", ready.headers["etag"]), ("profile", profile.headers["etag"]), ("status", pending.headers["etag"])]
+            ]
+            missing = await client.get("/api/v1/datasets/999/status", headers={"Authorization": f"Bearer {token}"})
+            # Only the caller's own datasets are listed, an owner_id parameter is ignored
+            listed = await client.get(
+                "/api/v1/datasets", params={"owner_id": other.id}, headers={"Authorization": f"Bearer {token}"}
+            )
+            found = await client.get(
+                "/api/v1/datasets/search", params={"q": "cities"}, headers={"Authorization": f"Bearer {token}"}
+            )
+    finally:
+        await ingestion.stop()
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 201, response.text
+    assert response.json()["size_bytes"] == len(CSV)
+    assert response.json()["tags"] == ["ar", "cities"]
+    assert pending.json()["status"] == JobStatus.pending
+    assert ready.json()["status"] == JobStatus.ready
+    assert ready.json()["row_count"] == 2
+    assert ready.json()["columns"] == ["name", "lon", "lat"]
+    assert missing.status_code == 404
+    assert [d["id"] for d in listed.json()["items"]] == [dataset_id]
+    assert [d["id"] for d in found.json()["items"]] == [dataset_id]
+    assert profile.status_code == 200, profile.text
+    assert profile.json()["bbox"] == [-64.18, -34.6, -58.38, -31.42]
+    name, lon, lat = profile.json()["columns"]
+    assert (name["type"], name["max_length"]) == ("string", 1)
+    assert (lon["type"], lon["min"], lon["max"]) == ("number", -64.18, -58.38)
+    assert sum(lat["histogram"]["counts"]) == 2
+    assert pending.headers["etag"].startswith('W/"') and pending.headers["etag"] != ready.headers["etag"]
+    assert [r.status_code for r in revalidated] == [304, 304, 200]
+    assert revalidated[0].content == b"" and revalidated[0].headers["etag"] == ready.headers["etag"]
+
+
+def test_parse_dataset(tmp_path):
+    path = tmp_path / "points.geojson"
+    features_path = tmp_path / "features.tsv"
+    path.write_text('{"type": "FeatureCollection", "features": ['
+                    '{"type": "Feature", "geometry": null, "properties": {"name": "A"}},'
+                    '{"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[0, 1], [2, -1]]},'
+                    ' "properties": {"name": "B", "pop": 3}}]}')
+    result = parse_dataset(str(path), "geojson", str(features_path))
+    assert result == {"row_count": 2, "columns": ["name", "pop"], "bbox": [0.0, -1.0, 2.0, 1.0]}
+    rows = [read_feature(line) for line in features_path.open()]
+    assert rows[0]["min_x"] is None and rows[0]["geometry"] is None
+    assert (rows[1]["min_x"], rows[1]["min_y"], rows[1]["max_x"], rows[1]["max_y"]) == (0, -1, 2, 1)
+    assert rows[1]["properties"] == '{"name":"B","pop":3}'
+
+    path.write_text("not json")
+    with pytest.raises(ParseError):
+        parse_dataset(str(path), "geojson", str(features_path))
+
+
+def test_parse_csv_rejects_invalid_utf8(tmp_path):
+    path = tmp_path / "latin1.csv"
+    features_path = tmp_path / "features.tsv"
+    path.write_bytes("nombre,año\n".encode("latin-1"))
+    with pytest.raises(ParseError, match="not UTF-8"):
+        parse_dataset(str(path), "csv", str(features_path))
+
+    # Past the first read buffer, so the header decodes fine
+    path.write_bytes(("name,lon,lat\n" + "A,1,2\n" * 10000 + "São Paulo,-46.63,-23.55\n").encode("latin-1"))
+    with pytest.raises(ParseError, match="not UTF-8 encoded after line"):
+        parse_dataset(str(path), "csv", str(features_path))
+
+
+@pytest.mark.asyncio
+async def test_ingestion_start_recovers_only_stale_jobs(db, test_user, storage, ingestion):
+    from sqlalchemy import select, update
+
+    user_id = await add_user(db, test_user)
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    form = DatasetForm(title="Cities", file_type=FileType.csv)
+    live = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="live.csv"))
+    stale = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV + b"C,1,2\n"), filename="stale.csv"))
+    # Both claimed by workers, one of them still alive and parsing
+    now = datetime.utcnow()
+    for dataset_id, started_at in ((live.id, now), (stale.id, now - timedelta(seconds=settings.INGESTION_STALE_AFTER + 1))):
+        await db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.dataset_id == dataset_id)
+            .values(status=JobStatus.processing, attempts=1, started_at=started_at)
+        )
+    await db.commit()
+
+    await ingestion.start()
+    await ingestion.scheduler.join()
+    await ingestion.stop()
+
+    jobs = dict((await db.execute(
+        select(IngestionJob.dataset_id, IngestionJob.status).execution_options(populate_existing=True)
+    )).all())
+    assert jobs == {live.id: JobStatus.processing, stale.id: JobStatus.ready}
+
+
+@pytest.mark.asyncio
+async def test_ingestion_marks_unparseable_datasets_failed(db, test_user, storage, ingestion):
+    user_id = await add_user(db, test_user)
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    form = DatasetForm(title="Broken", file_type=FileType.geojson)
+    dataset = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(b"{oops"), filename="broken.geojson"))
+
+    await ingestion.start()
+    await ingestion.scheduler.join()
+    await ingestion.stop()
+
+    status = await service.get_status(user_id, dataset.id)
+    assert status.status == JobStatus.failed
+    assert status.attempts == 1
+    assert "Invalid GeoJSON" in status.error
+
+
+@pytest.mark.asyncio
+async def test_list_datasets_keyset_pagination_and_filters(db, test_user, storage, ingestion):
+    from app.db.schema import User
+
+    user_id = await add_user(db, test_user)
+    other = User(email="other@example.com", first_name="O", last_name="U", password_hash="x")
+    db.add(other)
+    await db.commit()
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    specs = [
+        (user_id, "a,b", "1", FileType.csv),
+        (user_id, "b", "2", FileType.geojson),
+        (other.id, "b,c", "1,2", FileType.csv),
+        (user_id, None, None, FileType.csv),
+        (other.id, "a", "2", FileType.geojson),
+    ]
+    ids = []
+    for owner, tags, categories, file_type in specs:
+        form = DatasetForm(title="d", tags=tags, category_ids=categories, file_type=file_type)
+        ids.append((await service.create_dataset(owner, form, UploadFile(io.BytesIO(CSV), filename="d.csv"))).id)
+
+    first = await service.list_datasets(user_id, limit=2)
+    last = await service.list_datasets(user_id, limit=2, cursor=first.next_cursor)
+    assert [d.id for d in first.items + last.items] == [ids[3], ids[1], ids[0]]
+    assert last.next_cursor is None
+
+    async def ids_for(owner=user_id, **filters):
+        return [d.id for d in (await service.list_datasets(owner, limit=10, **filters)).items]
+
+    # Filters never reach other users' datasets
+    assert await ids_for(tag="b") == [ids[1], ids[0]]
+    assert await ids_for(category_id=2) == [ids[1]]
+    assert await ids_for(tag="b", category_id=1) == [ids[0]]
+    assert await ids_for(file_type=FileType.geojson) == [ids[1]]
+    assert await ids_for(other.id, tag="b") == [ids[2]]
+    assert await ids_for(other.id, file_type=FileType.geojson) == [ids[4]]
+    page = await service.list_datasets(user_id, limit=1, tag="b")
+    assert [d.id for d in (await service.list_datasets(user_id, limit=5, tag="b", cursor=page.next_cursor)).items] == [ids[0]]
+
+    with pytest.raises(DatasetValidationError):
+        await service.list_datasets(user_id, limit=2, cursor="not a cursor!")
+
+    # Filtered pages are a range of the user's entries in the association index
+    from sqlalchemy import event
+    from .test_db import engine
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await service.list_datasets(user_id, limit=10, tag="b")
+        await service.list_datasets(user_id, limit=10, category_id=2)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    connection = await db.connection()
+    plans = [
+        " ".join(row[-1] for row in await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        for statement, parameters in statements
+    ]
+    assert "ix_dataset_tags_owner_id_tag_dataset_id (owner_id=? AND tag=?" in plans[0]
+    assert "ix_dataset_categories_owner_id_category_id_dataset_id (owner_id=? AND category_id=?" in plans[1]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_uploads_share_one_file_and_skip_parsing(db, test_user, storage, ingestion, monkeypatch):
+    from sqlalchemy import func, select
+    from app.db.schema import Blob, DatasetFeature
+    from app.services.blob_service import BlobService
+
+    user_id = await add_user(db, test_user)
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    form = DatasetForm(title="Cities", file_type=FileType.csv)
+    first = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="a.csv"))
+    await ingestion.start()
+    await ingestion.scheduler.join()
+
+    parsed = []
+    monkeypatch.setattr(ingestion.scheduler, "run_cpu", lambda *args: parsed.append(args))
+    second = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="b.csv"))
+    await ingestion.scheduler.join()
+    await ingestion.stop()
+
+    key = hashlib.sha256(CSV).hexdigest()
+    assert [p.name for p in storage.path(key).parent.iterdir()] == [key]
+    assert (await db.get(Blob, key)).ref_count == 2
+    assert parsed == []
+    status = await service.get_status(user_id, second.id)
+    assert (status.status, status.row_count, status.columns) == (JobStatus.ready, 2, ["name", "lon", "lat"])
+    features = (await db.execute(
+        select(DatasetFeature.dataset_id, func.count()).group_by(DatasetFeature.dataset_id)
+    )).all()
+    assert sorted(features) == [(first.id, 2), (second.id, 2)]
+
+    blobs = BlobService(db, storage)
+    await service.delete_dataset(user_id, first.id)
+    assert await blobs.collect_garbage(grace=0) == 0
+    await service.delete_dataset(user_id, second.id)
+    assert await blobs.collect_garbage(grace=3600) == 0
+    assert await blobs.collect_garbage(grace=0) == 1
+    assert not storage.path(key).exists()
+    assert await db.get(Blob, key) is None
+    with pytest.raises(DatasetNotFoundError):
+        await service.delete_dataset(user_id, second.id)
+
+
+@pytest.mark.asyncio
+async def test_failed_create_leaves_the_file_to_garbage_collection(db, test_user, storage, ingestion, monkeypatch):
+    from sqlalchemy import func, select
+    from app.db.schema import Blob
+    from app.services.blob_service import BlobService
+
+    user_id = await add_user(db, test_user)
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    form = DatasetForm(title="Cities", file_type=FileType.csv)
+
+    async def fail(self, key, size_bytes):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(BlobService, "acquire", fail)
+    with pytest.raises(RuntimeError):
+        await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="a.csv"))
+    monkeypatch.undo()
+
+    # A concurrent identical upload may be sharing the file, so it outlives the failed request
+    key = hashlib.sha256(CSV).hexdigest()
+    assert storage.path(key).exists()
+    assert (await db.get(Blob, key)).ref_count == 0
+    assert await db.scalar(select(func.count()).select_from(Dataset)) == 0
+
+    blobs = BlobService(db, storage)
+    assert await blobs.collect_garbage(grace=3600) == 0
+    assert await blobs.collect_garbage(grace=0) == 1
+    assert not storage.path(key).exists()
+
+
+@pytest.mark.asyncio
+async def test_garbage_collection_between_save_and_commit_keeps_the_file(db, test_user, storage, ingestion, monkeypatch):
+    from sqlalchemy import update
+    from app.db.schema import Blob
+    from app.services.blob_service import BlobService
+
+    user_id = await add_user(db, test_user)
+    service = DatasetService(session=db, storage=storage, ingestion=ingestion)
+    form = DatasetForm(title="Cities", file_type=FileType.csv)
+    first = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="a.csv"))
+    await service.delete_dataset(user_id, first.id)
+    key = hashlib.sha256(CSV).hexdigest()
+    # Unreferenced for longer than the grace period
+    await db.execute(update(Blob).where(Blob.key == key).values(updated_at=datetime.utcnow() - timedelta(hours=2)))
+    await db.commit()
+
+    save = storage.save
+    collected = []
+
+    async def save_then_collect(*args, **kwargs):
+        stored = await save(*args, **kwargs)
+        async with TestingSessionLocal() as session:
+            collected.append(await BlobService(session, storage).collect_garbage(grace=3600))
+        return stored
+
+    monkeypatch.setattr(storage, "save", save_then_collect)
+    second = await service.create_dataset(user_id, form, UploadFile(io.BytesIO(CSV), filename="b.csv"))
+
+    assert collected == [1]
+    assert storage.path(key).read_bytes() == CSV
+    assert (await db.get(Blob, key, populate_existing=True)).ref_count == 1
+    assert list((storage.root / "tmp").iterdir()) == []
+    await ingestion.start()
+    await ingestion.scheduler.join()
+    await ingestion.stop()
+    assert (await service.get_status(user_id, second.id)).status == JobStatus.ready
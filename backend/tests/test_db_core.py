@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+
+def test_create_engine_from_settings_pool_arguments():
+    from app.core.settings import Settings
+    from app.db.core import MeteredQueuePool, create_engine_from_settings
+
+    pool_options = dict(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2, DB_POOL_TIMEOUT=7, DB_POOL_RECYCLE=600, DB_STATEMENT_CACHE_SIZE=50)
+    postgres = create_engine_from_settings(Settings(DB_BACKEND="postgresql", **pool_options))
+    assert isinstance(postgres.pool, MeteredQueuePool)
+    assert postgres.url.query["prepared_statement_cache_size"] == "50"
+    assert (postgres.pool.size(), postgres.pool._max_overflow, postgres.pool._timeout) == (3, 2, 7)
+    assert postgres.pool._recycle == 600 and postgres.pool._pre_ping
+
+    sqlite_file = create_engine_from_settings(Settings(DB_BACKEND="sqlite", DB_NAME="pool_check", **pool_options))
+    assert isinstance(sqlite_file.pool, MeteredQueuePool)
+    assert "prepared_statement_cache_size" not in sqlite_file.url.query
+    assert sqlite_file.pool.size() == 3
+
+    # Separate engines meter their pools separately
+    assert postgres.pool.metrics is not sqlite_file.pool.metrics
+
+
+@pytest.mark.asyncio
+async def test_pool_status_counts_checkouts_and_timeouts(tmp_path):
+    from sqlalchemy import exc
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db.core import MeteredQueuePool, pool_status
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=MeteredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("select 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+            status = pool_status(engine)
+            assert (status["checkouts"], status["timeouts"]) == (1, 1)
+            assert (status["size"], status["checked_out"]) == (1, 1)
+    finally:
+        await engine.dispose()
+    # Metrics survive the pool being recreated by dispose()
+    assert pool_status(engine)["checkouts"] == 1
+
+    broken = create_async_engine("sqlite+aiosqlite:////nonexistent-dir/pool.db", poolclass=MeteredQueuePool)
+    with pytest.raises(exc.OperationalError):
+        async with broken.connect():
+            pass
+    assert pool_status(broken)["timeouts"] == 0
+    await broken.dispose()
@@ -0,0 +1,83 @@
+import io
+from datetime import timedelta
+
+import pytest
+from fastapi import Depends, UploadFile
+from httpx import ASGITransport, AsyncClient
+
+from app.core.settings import settings
+from app.core.storage import LocalFileStorage
+from app.db.core import get_db
+from app.models.dataset import DatasetForm, FileType
+from app.services.auth_service import AuthService
+from app.services.dataset_service import DatasetService
+from app.services.download import VariantBuilder, negotiate_encoding
+from app.services.ingestion_service import IngestionRunner
+from .test_db import TestingSessionLocal
+
+CSV = b"name,lon,lat\n" + b"".join(b"city %d,-58.38,-34.60\n" % i for i in range(200))
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None, ["br", "gzip"]) is None
+    assert negotiate_encoding("gzip, deflate", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("br;q=0, *", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("identity", ["br", "gzip"]) is None
+
+
+@pytest.mark.asyncio
+async def test_download_endpoint(db, test_user, tmp_path, monkeypatch):
+    from app.main import app
+    import app.api.v1.datasets as datasets_api
+
+    monkeypatch.setattr(settings, "DOWNLOAD_COMPRESS_MIN_BYTES", 1024)
+    storage = LocalFileStorage(tmp_path / "datasets")
+    variants = VariantBuilder()
+    db.add(test_user)
+    await db.commit()
+    token = AuthService(session=db).create_access_token(test_user.email, test_user.id, timedelta(minutes=5))
+    service = DatasetService(db, storage, IngestionRunner(TestingSessionLocal, storage), variants=variants)
+    form = DatasetForm(title="Cities", file_type=FileType.csv)
+    dataset = await service.create_dataset(test_user.id, form, UploadFile(io.BytesIO(CSV), filename="cities.csv"))
+
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[datasets_api.get_dataset_service] = lambda db=Depends(get_db): DatasetService(
+        db, storage, variants=variants
+    )
+    url = f"/api/v1/datasets/{dataset.id}/download"
+    auth = {"Authorization": f"Bearer {token}"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            full = await client.get(url, headers={**auth, "Accept-Encoding": "identity"})
+            partial = await client.get(url, headers={**auth, "Accept-Encoding": "identity", "Range": "bytes=13-30"})
+            by_etag = await client.get(url, headers={**auth, "Accept-Encoding": "identity", "If-None-Match": full.headers["etag"]})
+            by_date = await client.get(url, headers={**auth, "Accept-Encoding": "identity", "If-Modified-Since": full.headers["last-modified"]})
+            first_gzip = await client.get(url, headers={**auth, "Accept-Encoding": "gzip"})
+            await variants.join()
+            gzipped = await client.get(url, headers={**auth, "Accept-Encoding": "gzip"})
+            missing = await client.get("/api/v1/datasets/999/download", headers=auth)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert full.status_code == 200
+    assert full.content == CSV
+    assert full.headers["etag"] == f'"{dataset.checksum}"'
+    assert full.headers["accept-ranges"] == "bytes"
+    assert 'filename="cities.csv"' in full.headers["content-disposition"]
+    assert partial.status_code == 206
+    assert partial.content == CSV[13:31]
+    assert partial.headers["content-range"] == f"bytes 13-30/{len(CSV)}"
+    assert by_etag.status_code == 304
+    assert by_date.status_code == 304
+    assert "content-encoding" not in first_gzip.headers
+    assert first_gzip.content == CSV
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == f'"{dataset.checksum}-gzip"'
+    assert int(gzipped.headers["content-length"]) < len(CSV)
+    assert gzipped.content == CSV  # decoded by httpx
+    assert missing.status_code == 404
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import UploadFile
+from httpx import ASGITransport, AsyncClient
+
+from app.core.settings import settings
+from app.core.storage import LocalFileStorage
+from app.db.core import get_db
+from app.models.dataset import DatasetForm, ExportFormat, FileType
+from app.services.auth_service import AuthService
+from app.services.dataset_service import DatasetService
+from app.services.ingestion_service import IngestionRunner
+from .test_db import TestingSessionLocal
+
+CSV = b"name,lon,lat,note\nBA,-58.38,-34.60,\"capital, AR\"\nCordoba,-64.18,-31.42,\nnowhere,,,\n"
+
+
+@pytest_asyncio.fixture
+async def dataset(db, test_user, tmp_path):
+    db.add(test_user)
+    await db.commit()
+    storage = LocalFileStorage(tmp_path)
+    ingestion = IngestionRunner(TestingSessionLocal, storage)
+    service = DatasetService(db, storage, ingestion)
+    created = await service.create_dataset(
+        test_user.id, DatasetForm(title="Cities", file_type=FileType.csv), UploadFile(io.BytesIO(CSV), filename="c.csv")
+    )
+    await ingestion.start()
+    await ingestion.scheduler.join()
+    await ingestion.stop()
+    return created
+
+
+async def collect(chunks) -> str:
+    return b"".join([chunk async for chunk in chunks]).decode()
+
+
+@pytest.mark.asyncio
+async def test_export_formats_stream_in_batches(db, test_user, dataset, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    service = DatasetService(db)
+
+    chunks = [c async for c in await service.export_features(test_user.id, dataset.id, ExportFormat.ndjson)]
+    assert len(chunks) == 2  # 3 rows in partitions of 2
+    features = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [f["properties"]["name"] for f in features] == ["BA", "Cordoba", "nowhere"]
+    assert features[2]["geometry"] is None
+
+    collection = json.loads(await collect(await service.export_features(test_user.id, dataset.id, ExportFormat.geojson)))
+    assert collection["type"] == "FeatureCollection" and len(collection["features"]) == 3
+
+    rows = list(csv.reader(io.StringIO(await collect(await service.export_features(test_user.id, dataset.id, ExportFormat.csv)))))
+    assert rows[0] == ["id", "name", "lon", "lat", "note", "geometry"]
+    assert rows[1][1:5] == ["BA", "-58.38", "-34.60", "capital, AR"]
+    assert json.loads(rows[1][5]) == {"type": "Point", "coordinates": [-58.38, -34.6]}
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint(db, test_user, dataset):
+    from app.main import app
+
+    token = AuthService(session=db).create_access_token(test_user.email, test_user.id, timedelta(minutes=5))
+
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(f"/api/v1/datasets/{dataset.id}/export?format=geojson", headers=headers)
+            missing = await client.get("/api/v1/datasets/999/export", headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    assert response.headers["content-disposition"] == f'attachment; filename="dataset-{dataset.id}.geojson"'
+    assert len(response.json()["features"]) == 3
+    assert missing.status_code == 404
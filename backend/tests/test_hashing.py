@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+
+from app.core.hashing import HashingExecutor, get_password_hash, verify_password
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process", "inline"])
+async def test_executor_hash_and_verify(kind):
+    executor = HashingExecutor(kind=kind, max_workers=2, max_concurrency=2)
+    try:
+        hashed = await executor.hash("password123")
+        assert verify_password("password123", hashed)
+        assert await executor.verify("password123", hashed)
+        assert not await executor.verify("wrongpassword", hashed)
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_caps_concurrency_and_reports_queue_depth():
+    executor = HashingExecutor(kind="thread", max_workers=4, max_concurrency=1)
+    hashed = get_password_hash("password123")
+    try:
+        results = await asyncio.gather(*(executor.verify("password123", hashed) for _ in range(4)))
+        stats = executor.stats()
+        assert all(results)
+        assert stats.completed == 4
+        assert stats.in_flight == 0
+        assert stats.queue_depth == 0
+        assert stats.max_queue_depth >= 3
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_upgrades_outdated_parameters():
+    from pwdlib.hashers.argon2 import Argon2Hasher
+    from app.core.settings import settings
+
+    executor = HashingExecutor(kind="inline")
+    outdated = Argon2Hasher(time_cost=1, memory_cost=19_456, parallelism=1).hash("password123")
+    verified, updated = await executor.verify_and_update("password123", outdated)
+    assert verified
+    assert f"m={settings.ARGON2_MEMORY_COST},t={settings.ARGON2_TIME_COST},p={settings.ARGON2_PARALLELISM}" in updated
+
+    assert await executor.verify_and_update("password123", updated) == (True, None)
+    assert await executor.verify_and_update("wrongpassword", outdated) == (False, None)
+
+
+def test_calibrate_stays_within_target():
+    from app.core.calibrate_hashing import MIN_MEMORY_COST, calibrate
+
+    time_cost, memory_cost, seconds = calibrate(0.0, MIN_MEMORY_COST * 2, parallelism=1, repeat=1)
+    # Nothing fits in zero time: the cheapest parameters are returned
+    assert (time_cost, memory_cost) == (1, MIN_MEMORY_COST)
+    assert seconds > 0
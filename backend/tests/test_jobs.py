@@ -0,0 +1,157 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.jobs import JobScheduler
+
+
+class Permanent(Exception):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_concurrent_jobs():
+    running = 0
+    peak = 0
+
+    async def handler(job_id, attempt):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    scheduler = JobScheduler(handler, max_concurrent_jobs=2)
+    for job_id in range(6):
+        scheduler.submit(job_id)
+    scheduler.start()
+    await scheduler.join()
+    await scheduler.stop()
+
+    assert peak == 2
+    assert scheduler.stats().succeeded == 6
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_failed_jobs_with_backoff():
+    attempts = []
+    failures = []
+
+    async def handler(job_id, attempt):
+        attempts.append(attempt)
+        if attempt < 3:
+            raise RuntimeError("flaky")
+
+    async def on_failure(job_id, attempt, error, final):
+        failures.append((attempt, final))
+
+    scheduler = JobScheduler(handler, on_failure, max_attempts=3, retry_delay=0.01)
+    scheduler.start()
+    scheduler.submit(1)
+    await scheduler.join()
+    await scheduler.stop()
+
+    assert attempts == [1, 2, 3]
+    assert failures == [(1, False), (2, False)]
+    assert scheduler.stats().retried == 2
+    assert scheduler.stats().succeeded == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_gives_up_on_permanent_errors():
+    failures = []
+
+    async def handler(job_id, attempt):
+        raise Permanent("bad input")
+
+    async def on_failure(job_id, attempt, error, final):
+        failures.append((attempt, final))
+
+    scheduler = JobScheduler(handler, on_failure, max_attempts=3, retry_delay=0.01, permanent_errors=(Permanent,))
+    scheduler.start()
+    scheduler.submit(1)
+    await scheduler.join()
+    await scheduler.stop()
+
+    assert failures == [(1, True)]
+    assert scheduler.stats().failed == 1
+
+
+@pytest.mark.asyncio
+async def test_run_cpu_uses_the_executor():
+    async def handler(job_id, attempt):
+        pass
+
+    scheduler = JobScheduler(handler, executor_factory=lambda n: ThreadPoolExecutor(n))
+    assert await scheduler.run_cpu(sum, [1, 2, 3]) == 6
+    await scheduler.stop()
+
+
+class BrokenExecutor(ThreadPoolExecutor):
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("a worker process died")
+
+
+@pytest.mark.asyncio
+async def test_run_cpu_replaces_a_broken_pool_and_retries_once():
+    async def handler(job_id, attempt):
+        pass
+
+    executors = []
+
+    def factory(n):
+        executors.append(BrokenExecutor(n) if len(executors) != 1 else ThreadPoolExecutor(n))
+        return executors[-1]
+
+    scheduler = JobScheduler(handler, executor_factory=factory)
+    assert await scheduler.run_cpu(sum, [1, 2, 3]) == 6
+    assert len(executors) == 2 and executors[0]._shutdown
+    assert await scheduler.run_cpu(sum, [4]) == 4
+    assert len(executors) == 2
+
+    # The retry runs on a new pool too; when that one is broken as well the error surfaces
+    scheduler._executor = BrokenExecutor(1)
+    with pytest.raises(BrokenProcessPool):
+        await scheduler.run_cpu(sum, [1])
+    assert len(executors) == 3 and scheduler._executor is None
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_submit_ignores_jobs_already_queued():
+    seen = []
+
+    async def handler(job_id, attempt):
+        seen.append(job_id)
+
+    scheduler = JobScheduler(handler)
+    scheduler.submit(1)
+    scheduler.submit(1)
+    scheduler.start()
+    await scheduler.join()
+    await scheduler.stop()
+
+    assert seen == [1]
+
+
+@pytest.mark.asyncio
+async def test_join_wakes_when_the_last_job_finishes():
+    release = asyncio.Event()
+
+    async def handler(job_id, attempt):
+        await release.wait()
+
+    scheduler = JobScheduler(handler)
+    scheduler.start()
+    await scheduler.join()  # nothing outstanding
+
+    scheduler.submit(1)
+    joined = asyncio.create_task(scheduler.join())
+    await asyncio.sleep(0)
+    assert not joined.done()
+
+    release.set()
+    await asyncio.wait_for(joined, timeout=1)
+    await scheduler.stop()
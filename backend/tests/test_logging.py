@@ -0,0 +1,88 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app.core.logging import DeferredQueueHandler, JsonFormatter, RequestIdFilter, SamplingFilter, request_id_var
+
+
+def test_sampling_filter_keeps_one_in_n_for_listed_templates():
+    sampling = SamplingFilter({"Successfully retrieved user with ID: %s": 0.25, "noisy": 0})
+    make = lambda msg: logging.LogRecord("app", logging.INFO, __file__, 1, msg, (1,), None)
+
+    kept = [sampling.filter(make("Successfully retrieved user with ID: %s")) for _ in range(8)]
+    assert kept.count(True) == 2
+    assert not sampling.filter(make("noisy"))
+    assert sampling.filter(make("User not found with ID: %s"))
+
+
+def test_queue_handler_formats_json_off_thread_with_request_id():
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(RequestIdFilter())
+    listener = QueueListener(handler.queue, output)
+    logger = logging.getLogger("tests.logging.queue")
+    logger.propagate = False
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    listener.start()
+    token = request_id_var.set("req-123")
+    try:
+        logger.info("Successfully retrieved user with ID: %s", 42)
+    finally:
+        request_id_var.reset(token)
+        listener.stop()
+        logger.removeHandler(handler)
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "Successfully retrieved user with ID: 42"
+    assert entry["request_id"] == "req-123"
+    assert entry["level"] == "INFO"
+
+
+def test_queue_handler_merges_arguments_on_the_emitting_side():
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    logger = logging.getLogger("tests.logging.args")
+    logger.propagate = False
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    tags = ["a"]
+    try:
+        logger.info("Tags: %s", tags)
+        tags.append("b")
+    finally:
+        logger.removeHandler(handler)
+    listener = QueueListener(handler.queue, output)
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue() == "Tags: ['a']\n"
+
+
+def test_configure_logging_starts_no_listener_when_root_is_configured(monkeypatch):
+    import app.core.logging as app_logging
+
+    root = logging.getLogger()
+    existing = logging.StreamHandler(io.StringIO())
+    monkeypatch.setattr(root, "handlers", [existing])
+    monkeypatch.setattr(root, "level", root.level)
+    try:
+        app_logging.configure_logging("INFO", use_queue=True)
+        assert root.handlers == [existing]
+        assert app_logging._listener is None
+
+        app_logging.configure_logging("INFO", use_queue=True, stream=io.StringIO(), force=True)
+        assert isinstance(root.handlers[0], DeferredQueueHandler)
+        assert app_logging._listener is not None
+    finally:
+        app_logging.stop_logging()
+        for handler in root.handlers:
+            handler.close()
+    assert app_logging._listener is None
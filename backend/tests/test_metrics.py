@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, exc, text
+
+from app.core.metrics import Histogram, RequestTimings, instrument_engine, request_timings
+from app.db.core import get_db
+from app.services.auth_service import AuthService
+from .test_db import engine, TestingSessionLocal
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(("/a",), 0.05)
+    histogram.observe(("/a",), 0.5)
+    histogram.observe(("/a",), 5)
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_latency_and_phases(db):
+    from app.main import app
+
+    instrument_engine(engine)
+
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    token = AuthService(session=db).create_access_token("ghost@example.com", 404, timedelta(minutes=5))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 404
+            body = (await client.get("/metrics")).text
+    finally:
+        app.dependency_overrides.clear()
+
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/users/me",status="404"}' in body
+    for phase in ("dependencies", "db", "jwt"):
+        assert f'http_request_phase_seconds_count{{route="/api/v1/users/me",phase="{phase}"}}' in body
+    assert 'db_pool{stat="checkouts"}' in body
+
+
+def test_instrument_engine_once_and_clears_failed_queries():
+    sync_engine = create_engine("sqlite://")
+    instrument_engine(sync_engine)
+    instrument_engine(sync_engine)
+
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        with sync_engine.connect() as conn:
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            assert conn.info["query_started"] == []
+            conn.execute(text("SELECT 1"))
+            assert conn.info["query_started"] == []
+    finally:
+        request_timings.reset(token)
+    assert timings.phases["db"] > 0
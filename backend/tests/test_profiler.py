@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+
+import app.services.profiler as profiler
+from app.services.profiler import Histogram, TableProfiler
+
+
+def profile(columns, rows, coordinates=None):
+    table = TableProfiler(columns, coordinates)
+    for row in rows:
+        table.add_row(row)
+    return table.result()
+
+
+def test_column_types_and_stats():
+    result = profile(
+        ["id", "price", "active", "name", "notes", "mixed"],
+        [
+            ["1", "2.5", "true", "Ana", "", "3"],
+            ["2", "", "false", "Bautista", "NA", "x"],
+            ["3", "-1", "True", "", "", "4"],
+            ["4"],  # short row
+        ],
+    )
+    columns = {c["name"]: c for c in result["columns"]}
+    assert columns["id"] == {
+        "name": "id", "type": "integer", "count": 4, "null_count": 0, "min": 1.0, "max": 4.0,
+        "histogram": columns["id"]["histogram"],
+    }
+    assert sum(columns["id"]["histogram"]["counts"]) == 4
+    assert (columns["price"]["type"], columns["price"]["null_count"]) == ("number", 2)
+    assert (columns["price"]["min"], columns["price"]["max"]) == (-1.0, 2.5)
+    assert (columns["active"]["type"], columns["active"]["true_count"]) == ("boolean", 2)
+    assert (columns["name"]["type"], columns["name"]["min_length"], columns["name"]["max_length"]) == ("string", 3, 8)
+    assert (columns["notes"]["type"], columns["notes"]["null_count"]) == ("empty", 4)
+    assert columns["mixed"]["type"] == "string"
+    assert result["bbox"] is None
+
+
+def test_chunked_profile_matches_single_pass(monkeypatch):
+    rng = random.Random(1)
+    rows = [[f"{rng.gauss(0, 10):.3f}", str(rng.randint(0, 5)), f"{rng.uniform(-60, -50)}", f"{rng.uniform(-40, -30)}"]
+            for _ in range(1000)]
+    # A later chunk widens both the range and the type
+    rows += [["1000", "2.5", "bad", "-35"]]
+    columns = ["value", "small", "lon", "lat"]
+
+    whole = profile(columns, rows, (2, 3))
+    monkeypatch.setattr(profiler, "PROFILE_CHUNK_ROWS", 64)
+    chunked = profile(columns, rows, (2, 3))
+
+    # Bins depend on the first chunk's range, everything else must not depend on chunking
+    histograms = [c.pop("histogram", None) for c in chunked["columns"]]
+    whole_histograms = [c.pop("histogram", None) for c in whole["columns"]]
+    assert chunked == whole
+    assert [sum(h["counts"]) for h in histograms if h] == [sum(h["counts"]) for h in whole_histograms if h]
+    value = chunked["columns"][0]
+    assert value["max"] == 1000.0
+    assert sum(histograms[0]["counts"]) == len(rows)
+    assert chunked["columns"][1]["type"] == "number"
+    lons = [float(r[2]) for r in rows[:-1]]
+    lats = [float(r[3]) for r in rows[:-1]]
+    assert chunked["bbox"] == [min(lons), min(lats), max(lons), max(lats)]
+
+
+def test_histogram_grows_in_both_directions():
+    values = np.array([0.0, 1.0, 2.0, 10.0])
+    histogram = Histogram(bins=4)
+    histogram.add(values[:2])
+    histogram.add(values[2:])
+    histogram.add(np.array([-5.0]))
+    result = histogram.to_dict()
+    assert sum(result["counts"]) == 5
+    assert len(result["edges"]) == len(result["counts"]) + 1
+    assert result["edges"][0] <= -5.0 and result["edges"][-1] > 10.0
+    # every value lands in the bin whose edges enclose it
+    for value in [0.0, 1.0, 2.0, 10.0, -5.0]:
+        index = np.searchsorted(result["edges"], value, side="right") - 1
+        assert result["counts"][index] > 0
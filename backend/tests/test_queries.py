@@ -0,0 +1,56 @@
+import pytest
+
+from app.db.queries import (
+    UserCredentialsRow,
+    UserIdentityRow,
+    UserProfileRow,
+    fetch_user_credentials,
+    fetch_user_identity,
+    fetch_user_profile,
+    fetch_user_version,
+)
+
+
+@pytest.mark.asyncio
+async def test_fetch_user_profile(db, test_user):
+    db.add(test_user)
+    await db.commit()
+
+    profile = await fetch_user_profile(db, test_user.id)
+    assert profile == UserProfileRow(
+        id=test_user.id,
+        email="test@example.com",
+        first_name="Test",
+        last_name="User",
+        updated_at=test_user.updated_at,
+    )
+    assert await fetch_user_version(db, test_user.id) == test_user.updated_at
+
+    assert await fetch_user_profile(db, test_user.id + 1) is None
+    assert await fetch_user_version(db, test_user.id + 1) is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_user_credentials(db, test_user):
+    db.add(test_user)
+    await db.commit()
+
+    credentials = await fetch_user_credentials(db, "test@example.com")
+    assert credentials == UserCredentialsRow(
+        id=test_user.id, email="test@example.com", password_hash=test_user.password_hash
+    )
+
+    assert await fetch_user_credentials(db, "missing@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_user_identity(db, test_user):
+    db.add(test_user)
+    await db.commit()
+
+    identity = await fetch_user_identity(db, test_user.id, "test@example.com")
+    assert identity == UserIdentityRow(id=test_user.id, email="test@example.com")
+
+    # Both the id and the email must match, a token for a changed email is stale
+    assert await fetch_user_identity(db, test_user.id, "other@example.com") is None
+    assert await fetch_user_identity(db, test_user.id + 1, "test@example.com") is None
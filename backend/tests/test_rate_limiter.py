@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from limits import parse
+from limits.strategies import SlidingWindowCounterRateLimiter
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+
+from app.core.rate_limit_storage import SQLiteStorage
+from app.core.rate_limiter import Limiter
+
+
+def test_sqlite_storage_shares_sliding_window_between_workers(tmp_path):
+    uri = f"sqlite:///{tmp_path}/ratelimit.db"
+    worker_a = SlidingWindowCounterRateLimiter(SQLiteStorage(uri))
+    worker_b = SlidingWindowCounterRateLimiter(SQLiteStorage(uri))
+    limit = parse("3/hour")
+
+    assert worker_a.hit(limit, "register", "127.0.0.1")
+    assert worker_b.hit(limit, "register", "127.0.0.1")
+    assert worker_a.hit(limit, "register", "127.0.0.1")
+    assert not worker_b.hit(limit, "register", "127.0.0.1")
+    assert worker_a.hit(limit, "register", "10.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_limiter_checks_sqlite_storage_off_the_event_loop(tmp_path, monkeypatch):
+    limiter = Limiter(key_func=get_remote_address, storage_uri=f"sqlite:///{tmp_path}/ratelimit.db", strategy="sliding-window-counter")
+    # Record the thread of every storage call the sliding-window strategy makes
+    storage_threads = []
+    for name in ("get_sliding_window", "acquire_sliding_window_entry"):
+        def recording(*args, _original=getattr(limiter._storage, name), **kwargs):
+            storage_threads.append(threading.get_ident())
+            return _original(*args, **kwargs)
+        monkeypatch.setattr(limiter._storage, name, recording)
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.post("/register")
+    @limiter.limit("2/hour")
+    async def register(request: Request):
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        statuses = [(await client.post("/register")).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    assert storage_threads
+    assert threading.get_ident() not in storage_threads
@@ -0,0 +1,42 @@
+import datetime
+import json
+import time
+
+from starlette.responses import Response
+
+from app.core.responses import FastJSONResponse, trusted_response, version_tag, weak_etag
+from app.core.settings import settings
+from app.models.auth import Token
+
+
+def test_fast_json_response_renders_models_and_plain_data():
+    assert json.loads(FastJSONResponse(Token(access_token="abc", token_type="bearer")).body) == {
+        "access_token": "abc",
+        "token_type": "bearer",
+    }
+    assert json.loads(FastJSONResponse({"detail": "ok", 1: [1, 2]}).body) == {"detail": "ok", "1": [1, 2]}
+
+
+def test_trusted_response_keeps_cookies_from_the_injected_response(monkeypatch):
+    sub_response = Response()
+    sub_response.set_cookie("app_refresh_token", "refresh")
+    token = Token(access_token="abc", token_type="bearer")
+
+    response = trusted_response(token, sub_response)
+    assert isinstance(response, FastJSONResponse)
+    assert "app_refresh_token=refresh" in response.headers["set-cookie"]
+
+    monkeypatch.setattr(settings, "FAST_JSON", False)
+    assert trusted_response(token, sub_response) is token
+
+
+def test_version_tags_do_not_depend_on_the_server_time_zone(monkeypatch):
+    updated_at = datetime.datetime(2026, 10, 18, 12, 30, 0, 250)
+    expected = f"{(int(datetime.datetime(2026, 10, 18, 12, 30, tzinfo=datetime.timezone.utc).timestamp()) * 1_000_000 + 250):x}"
+    for tz in ("UTC", "America/Argentina/Cordoba", "Asia/Tokyo"):
+        monkeypatch.setenv("TZ", tz)
+        time.tzset()
+        assert version_tag(updated_at) == expected
+        assert weak_etag(updated_at, updated_at) == f'W/"{expected}-{expected}"'
+    monkeypatch.undo()
+    time.tzset()
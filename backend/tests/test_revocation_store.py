@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.bloom import BloomFilter
+from app.db.schema import RevokedToken
+from app.services.revocation_store import RevocationStore
+from .test_db import TestingSessionLocal
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(10_000, 0.01)
+    keys = [f"key-{i}" for i in range(10_000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    assert len(bloom) == 10_000
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+@pytest.mark.asyncio
+async def test_unrevoked_check_skips_the_database(db):
+    store = RevocationStore(session_factory=TestingSessionLocal, capacity=1000)
+    expires_at = datetime.datetime.utcnow() + datetime.timedelta(minutes=5)
+
+    assert await store.revoke(db, "revoked", expires_at)
+    assert not await store.revoke(db, "revoked", expires_at)
+    await db.commit()
+
+    assert await store.is_revoked(db, "revoked")
+    assert not await store.is_revoked(db, "unknown")
+    stats = store.stats()
+    assert stats.checks == 2
+    assert stats.lookups == 1
+    assert datetime.datetime.utcnow() - await store.revoked_at(db, "revoked") < datetime.timedelta(seconds=5)
+    assert await store.revoked_at(db, "unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_sync_and_cleanup(db):
+    now = datetime.datetime.utcnow()
+    db.add_all(
+        [RevokedToken(jti=f"expired-{i}", expires_at=now - datetime.timedelta(minutes=1), revoked_at=now) for i in range(7)]
+        + [RevokedToken(jti="live", expires_at=now + datetime.timedelta(minutes=5), revoked_at=now)]
+    )
+    await db.commit()
+
+    # Rows revoked by other workers reach the filter through sync
+    store = RevocationStore(session_factory=TestingSessionLocal, capacity=1000, batch_size=3)
+    assert await store.sync() == 1
+    assert await store.is_revoked(db, "live")
+
+    assert await store.cleanup() == 7
+    assert await db.scalar(select(func.count()).select_from(RevokedToken)) == 1
+    assert await store.is_revoked(db, "live")
+    assert "expired-0" not in store._filter
+
+
+@pytest.mark.asyncio
+async def test_checks_during_cleanup_see_a_complete_filter(db):
+    import asyncio
+
+    now = datetime.datetime.utcnow()
+    expires_at = now + datetime.timedelta(minutes=5)
+    db.add_all([RevokedToken(jti=f"sid{i}", expires_at=expires_at, revoked_at=now) for i in range(200)])
+    await db.commit()
+    store = RevocationStore(session_factory=TestingSessionLocal, capacity=1000, batch_size=10)
+    await store.sync()
+
+    cleanup = asyncio.create_task(store.cleanup())
+    checks = []
+    revoked_meanwhile = False
+    while not cleanup.done():
+        checks.append(await store.is_revoked(db, "sid199"))
+        if not revoked_meanwhile:
+            await store.revoke(db, "logged-out", expires_at)
+            revoked_meanwhile = True
+        await asyncio.sleep(0)
+    await cleanup
+
+    assert len(checks) > 1 and all(checks)
+    # A revocation made during the rebuild is in the filter swapped in
+    assert "logged-out" in store._filter
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import delete, update
+
+from app.db.schema import Dataset, User
+from app.db.search import search_terms
+from app.exceptions.dataset import DatasetValidationError
+from app.services.dataset_service import DatasetService
+
+
+async def add_datasets(db, test_user, *specs):
+    db.add(test_user)
+    await db.commit()
+    datasets = [
+        Dataset(owner_id=test_user.id, title=title, description=description, tags=tags,
+                file_type="csv", storage_key=str(i), size_bytes=0, checksum="")
+        for i, (title, description, tags) in enumerate(specs)
+    ]
+    db.add_all(datasets)
+    await db.commit()
+    return [d.id for d in datasets]
+
+
+def test_search_terms_drop_operators():
+    assert search_terms('Ríos "de" OR title:Córdoba*') == ["ríos", "de", "or", "title", "córdoba"]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_matches_first(db, test_user):
+    rivers, roads, lakes = await add_datasets(
+        db, test_user,
+        ("Ríos de Córdoba", "Red hídrica provincial", ["hidrografía"]),
+        ("Rutas nacionales", "Trazado de rutas que cruzan ríos", ["transporte"]),
+        ("Lagos", "Espejos de agua", ["Córdoba", "hidrografía"]),
+    )
+    user_id = test_user.id
+    service = DatasetService(db)
+
+    assert [d.id for d in (await service.search_datasets(user_id, "rios", limit=10)).items] == [rivers, roads]
+    # accents are folded, tags are searchable, the last word is a prefix
+    assert {d.id for d in (await service.search_datasets(user_id, "cordoba", limit=10)).items} == {rivers, lakes}
+    assert {d.id for d in (await service.search_datasets(user_id, "hidrog", limit=10)).items} == {rivers, lakes}
+    assert (await service.search_datasets(user_id, "rutas rios", limit=10)).items[0].id == roads
+
+    first = await service.search_datasets(user_id, "de", limit=2)
+    rest = await service.search_datasets(user_id, "de", limit=2, cursor=first.next_cursor)
+    everything = await service.search_datasets(user_id, "de", limit=10)
+    assert [d.id for d in first.items + rest.items] == [d.id for d in everything.items]
+    assert first.items[0].id == rivers
+    assert rest.next_cursor is None
+
+    with pytest.raises(DatasetValidationError):
+        await service.search_datasets(user_id, "!!", limit=10)
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(db, test_user):
+    [dataset_id] = await add_datasets(db, test_user, ("Escuelas", None, ["educación"]))
+    user_id = test_user.id
+    service = DatasetService(db)
+
+    await db.execute(update(Dataset).where(Dataset.id == dataset_id).values(title="Hospitales", tags=["salud"]))
+    await db.commit()
+    assert (await service.search_datasets(user_id, "escuelas", limit=10)).items == []
+    assert [d.id for d in (await service.search_datasets(user_id, "salud", limit=10)).items] == [dataset_id]
+
+    await db.execute(delete(Dataset).where(Dataset.id == dataset_id))
+    await db.commit()
+    assert (await service.search_datasets(user_id, "hospitales", limit=10)).items == []
+
+
+@pytest.mark.asyncio
+async def test_search_only_finds_the_users_datasets(db, test_user):
+    [mine] = await add_datasets(db, test_user, ("Escuelas", None, None))
+    other = User(email="other@example.com", first_name="O", last_name="U", password_hash="x")
+    db.add(other)
+    await db.commit()
+    db.add(Dataset(owner_id=other.id, title="Escuelas rurales", file_type="csv", storage_key="x", size_bytes=0, checksum=""))
+    await db.commit()
+    service = DatasetService(db)
+
+    assert [d.id for d in (await service.search_datasets(test_user.id, "escuelas", limit=10)).items] == [mine]
+    assert len((await service.search_datasets(other.id, "escuelas", limit=10)).items) == 1
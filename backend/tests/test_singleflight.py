@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run():
+    group = SingleFlight("test_share")
+    runs = []
+
+    async def fetch(key):
+        runs.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    results = await asyncio.gather(*(group.do(k, lambda k=k: fetch(k)) for k in [1, 1, 1, 2]))
+    assert runs == [1, 2]
+    assert results[0] is results[1] is results[2]
+    assert results[3] == {"key": 2}
+    assert (group.stats().calls, group.stats().coalesced) == (4, 2)
+
+    # Nothing is kept once the call is done
+    await group.do(1, lambda: fetch(1))
+    assert runs == [1, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_exceptions_reach_every_caller():
+    group = SingleFlight("test_errors")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise LookupError("gone")
+
+    results = await asyncio.gather(group.do("k", fail), group.do("k", fail), return_exceptions=True)
+    assert all(isinstance(r, LookupError) for r in results)
+    assert group.stats().coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_leader_is_cancelled():
+    group = SingleFlight("test_cancel")
+    runs = 0
+
+    async def fetch():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        return runs
+
+    leader = asyncio.create_task(group.do("k", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(group.do("k", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await follower == 2
+    assert leader.cancelled()
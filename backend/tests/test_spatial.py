@@ -0,0 +1,114 @@
+import io
+import json
+import random
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import insert
+
+from app.core.storage import LocalFileStorage
+from app.db.schema import DatasetFeature
+from app.db.spatial import query_bbox
+from app.exceptions.dataset import DatasetValidationError
+from app.models.dataset import DatasetForm, FileType
+from app.services.dataset_service import DatasetService
+from app.services.geometry import geometry_bbox, intersects_bbox
+from app.services.ingestion_service import IngestionRunner
+from .test_db import TestingSessionLocal
+
+SQUARE = {"type": "Polygon", "coordinates": [[[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]]}
+DONUT = {"type": "Polygon", "coordinates": [
+    [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+    [[3, 3], [7, 3], [7, 7], [3, 7], [3, 3]],
+]}
+DIAGONAL = {"type": "LineString", "coordinates": [[0, 0], [10, 10]]}
+
+
+def test_geometry_bbox():
+    assert geometry_bbox(SQUARE) == (0, 0, 10, 10)
+    assert geometry_bbox({"type": "Point", "coordinates": [1.5, -2]}) == (1.5, -2, 1.5, -2)
+    assert geometry_bbox(None) is None
+
+
+def test_intersects_bbox_is_exact():
+    # bboxes overlap in every case, only the geometry decides
+    assert intersects_bbox(DIAGONAL, (4, 4, 6, 6))
+    assert not intersects_bbox(DIAGONAL, (6, 0, 10, 3))
+    assert intersects_bbox(SQUARE, (2, 2, 3, 3))  # fully inside the polygon
+    assert not intersects_bbox(DONUT, (4, 4, 6, 6))  # inside the hole
+    assert intersects_bbox(DONUT, (6, 6, 8, 8))  # crosses the hole's edge
+    assert not intersects_bbox({"type": "Point", "coordinates": [5, 5]}, (6, 6, 7, 7))
+
+
+async def add_user(db, test_user):
+    db.add(test_user)
+    await db.commit()
+    return test_user.id
+
+
+@pytest.mark.asyncio
+async def test_rtree_query_matches_a_full_scan(db, test_user, tmp_path):
+    user_id = await add_user(db, test_user)
+    storage = LocalFileStorage(tmp_path)
+    service = DatasetService(db, storage, IngestionRunner(TestingSessionLocal, storage))
+    datasets = [
+        await service.create_dataset(user_id, DatasetForm(title=f"d{i}", file_type=FileType.csv), UploadFile(io.BytesIO(b"a\n")))
+        for i in range(2)
+    ]
+    rng = random.Random(7)
+    rows = []
+    for dataset in datasets:
+        for _ in range(500):
+            x, y = rng.uniform(-180, 180), rng.uniform(-90, 90)
+            rows.append(dict(dataset_id=dataset.id, min_x=x, min_y=y, max_x=x + 1, max_y=y + 1))
+    await db.execute(insert(DatasetFeature), rows)
+    await db.commit()
+
+    bbox = (-30.0, -20.0, 45.5, 33.3)
+    indexed = await query_bbox(db, datasets[0].id, bbox, limit=1000)
+    scanned = await query_bbox(db, datasets[0].id, bbox, limit=1000, use_index=False)
+    assert indexed and [r.id for r in indexed] == [r.id for r in scanned]
+
+    page = await query_bbox(db, datasets[0].id, bbox, limit=5, after_id=indexed[4].id)
+    assert [r.id for r in page] == [r.id for r in indexed[5:10]]
+
+
+@pytest.mark.asyncio
+async def test_query_features_after_ingestion(db, test_user, tmp_path):
+    user_id = await add_user(db, test_user)
+    storage = LocalFileStorage(tmp_path)
+    ingestion = IngestionRunner(TestingSessionLocal, storage)
+    service = DatasetService(db, storage, ingestion)
+    csv = b"name,longitude,latitude\nBA,-58.38,-34.60\nCordoba,-64.18,-31.42\nMadrid,-3.70,40.41\nnowhere,,\n"
+    dataset = await service.create_dataset(
+        user_id, DatasetForm(title="Cities", file_type=FileType.csv), UploadFile(io.BytesIO(csv), filename="cities.csv")
+    )
+    await ingestion.start()
+    await ingestion.scheduler.join()
+    await ingestion.stop()
+
+    body = json.loads(await service.query_features(user_id, dataset.id, "-70,-40,-50,-30", limit=10))
+    assert [f["properties"]["name"] for f in body["features"]] == ["BA", "Cordoba"]
+    assert body["features"][0]["geometry"] == {"type": "Point", "coordinates": [-58.38, -34.6]}
+    assert body["next"] is None
+
+    page = json.loads(await service.query_features(user_id, dataset.id, "-180,-90,180,90", limit=2))
+    assert page["numberReturned"] == 2 and page["next"] is not None
+
+    with pytest.raises(DatasetValidationError):
+        await service.query_features(user_id, dataset.id, "1,2,3", limit=10)
+
+
+@pytest.mark.asyncio
+async def test_rtree_query_keeps_to_its_dataset_past_float32_precision(db):
+    # Neighbouring ids above 2^24 share one float32 value in the R*Tree
+    first, second = 2**24 + 1, 2**24 + 2
+    await db.execute(insert(DatasetFeature), [
+        dict(dataset_id=dataset_id, min_x=0.0, min_y=0.0, max_x=1.0, max_y=1.0, properties=str(dataset_id))
+        for dataset_id in (first, second)
+    ])
+    await db.commit()
+
+    for dataset_id in (first, second):
+        rows = await query_bbox(db, dataset_id, (0, 0, 1, 1), limit=10)
+        assert [row.properties for row in rows] == [str(dataset_id)]
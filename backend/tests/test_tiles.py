@@ -0,0 +1,182 @@
+import io
+from datetime import timedelta
+
+import pytest
+from fastapi import Depends, UploadFile
+from httpx import ASGITransport, AsyncClient
+
+from app.core.cache import TTLCache
+from app.core.storage import LocalFileStorage
+from app.db.core import get_db
+from app.models.dataset import DatasetForm, FileType
+from app.services.auth_service import AuthService
+from app.services.dataset_service import DatasetService
+from app.services.ingestion_service import IngestionRunner
+from app.services.mvt import encode_tile, tile_bounds
+from app.services.tile_cache import TileCache
+from .test_db import TestingSessionLocal
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def decode(data: bytes) -> dict[int, list]:
+    """Minimal protobuf reader: field number -> list of raw values"""
+    fields: dict[int, list] = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        else:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        fields.setdefault(number, []).append(value)
+    return fields
+
+
+def packed(data: bytes) -> list[int]:
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_geometry(commands: list[int]) -> list[list[tuple[int, int]]]:
+    parts, x, y, i = [], 0, 0, 0
+    while i < len(commands):
+        command, count = commands[i] & 7, commands[i] >> 3
+        i += 1
+        if command == 7:
+            continue
+        if command == 1:
+            parts.append([])
+        for _ in range(count):
+            x, y = x + unzigzag(commands[i]), y + unzigzag(commands[i + 1])
+            parts[-1].append((x, y))
+            i += 2
+    return parts
+
+
+def test_encode_point_tile():
+    tile = encode_tile([(7, {"type": "Point", "coordinates": [0, 0]}, {"name": "origin", "pop": 3})], 1, 0, 0)
+
+    layer = decode(decode(tile)[3][0])
+    assert layer[1] == [b"features"] and layer[15] == [2] and layer[5] == [4096]
+    assert layer[3] == [b"name", b"pop"]
+    feature = decode(layer[2][0])
+    assert feature[1] == [7] and feature[3] == [1]
+    command, x, y = packed(feature[4][0])
+    # lon/lat 0,0 is the bottom right corner of tile 1/0/0
+    assert command == (1 | 1 << 3) and (unzigzag(x), unzigzag(y)) == (4096, 4096)
+
+
+def test_encode_polygon_is_clipped_to_the_buffered_tile():
+    world = {"type": "Polygon", "coordinates": [[[-170, -80], [170, -80], [170, 80], [-170, 80], [-170, -80]]]}
+    tile = encode_tile([(1, world, None)], 4, 8, 5, buffer=64)
+
+    feature = decode(decode(decode(tile)[3][0])[2][0])
+    commands = packed(feature[4][0])
+    assert feature[3] == [3]
+    assert commands[0] == (1 | 1 << 3) and commands[3] == (2 | 3 << 3) and commands[-1] == (7 | 1 << 3)
+    [ring] = decode_geometry(commands)
+    assert sorted(ring) == [(-64, -64), (-64, 4160), (4160, -64), (4160, 4160)]
+    area = sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(ring, ring[1:] + ring[:1]))
+    assert area > 0  # exterior rings are clockwise in tile space
+
+
+def test_empty_tile():
+    far = {"type": "Point", "coordinates": [120, -40]}
+    assert encode_tile([(1, far, None)], 3, 0, 0) == b""
+
+
+def test_tile_bounds():
+    assert tile_bounds(0, 0, 0) == pytest.approx((-180, -85.0511, 180, 85.0511), abs=1e-4)
+    assert tile_bounds(1, 1, 0) == pytest.approx((0, 0, 180, 85.0511), abs=1e-4)
+
+
+@pytest.mark.asyncio
+async def test_tile_endpoint_caches_and_revalidates(db, test_user, tmp_path):
+    from app.main import app
+    import app.api.v1.datasets as datasets_api
+
+    db.add(test_user)
+    await db.commit()
+    token = AuthService(session=db).create_access_token(test_user.email, test_user.id, timedelta(minutes=5))
+    storage = LocalFileStorage(tmp_path / "datasets")
+    ingestion = IngestionRunner(TestingSessionLocal, storage)
+    tiles = TileCache(TTLCache(16), tmp_path / "tiles")
+    service = DatasetService(db, storage, ingestion, tiles)
+    csv = b"name,lon,lat\nBA,-58.38,-34.60\nMadrid,-3.70,40.41\n"
+    dataset = await service.create_dataset(
+        test_user.id, DatasetForm(title="Cities", file_type=FileType.csv), UploadFile(io.BytesIO(csv), filename="c.csv")
+    )
+    await ingestion.start()
+    await ingestion.scheduler.join()
+    await ingestion.stop()
+
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[datasets_api.get_dataset_service] = (
+        lambda db=Depends(get_db): DatasetService(db, storage, ingestion, tiles)
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/datasets/{dataset.id}/tiles/1/0/1.mvt"
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get(url, headers=headers)
+            second = await client.get(url, headers=headers)
+            revalidated = await client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]})
+            out_of_range = await client.get(f"/api/v1/datasets/{dataset.id}/tiles/1/2/0.mvt", headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    layer = decode(decode(first.content)[3][0])
+    assert len(layer[2]) == 1  # only Buenos Aires is in the south-west quadrant
+    assert second.content == first.content and tiles.stats().hits == 1
+    assert list((tmp_path / "tiles").rglob("*.mvt"))
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert out_of_range.status_code == 400
+
+    await service.delete_dataset(test_user.id, dataset.id)
+    assert not (tmp_path / "tiles" / str(dataset.id)).exists()
+
+
+@pytest.mark.asyncio
+async def test_tile_cache_keeps_one_version_per_dataset_on_disk(tmp_path):
+    tiles = TileCache(TTLCache(16), tmp_path)
+    await tiles.set((1, "v1", 0, 0, 0), b"old")
+    await tiles.set((1, "v1", 1, 0, 0), b"old")
+    await tiles.set((2, "v1", 0, 0, 0), b"other")
+    await tiles.set((1, "v2", 0, 0, 0), b"new")
+    await tiles.set((1, "v2", 1, 1, 0), b"new")
+
+    assert [p.name for p in (tmp_path / "1").iterdir()] == ["v2"]
+    assert len(list((tmp_path / "1").rglob("*.mvt"))) == 2
+    assert (tmp_path / "2" / "v1").exists()
+
+    await tiles.discard(1)
+    assert not (tmp_path / "1").exists()
+    assert (tmp_path / "2" / "v1").exists()
+    await tiles.discard(1)
@@ -1,6 +1,8 @@
+import asyncio
 import pytest
 
 from app.services.user_service import UserService
+from app.services.user_cache import user_cache
 from app.services.auth_service import AuthService
 from app.models.user import PasswordChange
 from app.core.exceptions import UserNotFoundError, InvalidPasswordError, PasswordMismatchError
@@ -71,3 +73,92 @@ async def test_change_password_mismatch(db, test_user):
             new_password_confirm="differentpassword"
         )
         await user_service.change_password(test_user.id, password_change) 
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_is_served_from_cache(db, test_user):
+    user_service = UserService(session=db)
+    db.add(test_user)
+    await db.commit()
+
+    first = await user_service.get_user_by_id(test_user.id)
+    hits = user_cache.stats().hits
+    await db.delete(test_user)
+    await db.commit()
+
+    cached = await user_service.get_user_by_id(test_user.id)
+    assert cached == first
+    assert user_cache.stats().hits == hits + 1
+
+@pytest.mark.asyncio
+async def test_change_password_invalidates_cached_user(db, test_user):
+    user_service = UserService(session=db)
+    db.add(test_user)
+    await db.commit()
+
+    await user_service.get_user_by_id(test_user.id)
+    await user_service.change_password(test_user.id, PasswordChange(
+        current_password="password123",
+        new_password="newpassword123",
+        new_password_confirm="newpassword123"
+    ))
+    assert await user_cache.get(test_user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_user_by_id_share_one_query(db, test_user):
+    from app.services.user_service import user_profile_reads
+
+    db.add(test_user)
+    await db.commit()
+    user_cache.clear()
+    stats = user_profile_reads.stats()
+
+    users = await asyncio.gather(*(UserService(db).get_user_by_id(test_user.id) for _ in range(5)))
+    assert {user.email for user in users} == {test_user.email}
+    after = user_profile_reads.stats()
+    assert after.calls - stats.calls == 5
+    assert after.coalesced - stats.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_get_me_conditional_get(db, test_user):
+    from datetime import timedelta
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+    from app.db.core import get_db
+    from .test_db import TestingSessionLocal
+
+    db.add(test_user)
+    await db.commit()
+    user_cache.clear()
+    token = AuthService(session=db).create_access_token(test_user.email, test_user.id, timedelta(minutes=5))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/api/v1/users/me", headers=headers)
+            etag = first.headers["etag"]
+            unchanged = await client.get("/api/v1/users/me", headers={**headers, "If-None-Match": etag})
+
+            test_user.first_name = "Renamed"
+            await db.commit()
+            await user_cache.invalidate(test_user.id)
+            changed = await client.get("/api/v1/users/me", headers={**headers, "If-None-Match": etag})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert first.json()["email"] == test_user.email
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["etag"] == etag
+    assert changed.status_code == 200
+    assert changed.json()["first_name"] == "Renamed"
+    assert changed.headers["etag"] != etag